@@ -1,11 +1,43 @@
-"""Game entry point - Run this file to start the game."""
+"""Game entry point - Run this file to start the game.
+
+    python run_game.py                        # play (replay saved to replays/)
+    python run_game.py --seed 42              # seed every run with 42
+    python run_game.py --replay FILE          # watch a recorded run
+    python run_game.py --replay FILE --headless   # verify it without a window
+"""
+import argparse
 import sys
 import os
 
 # Add src to path for proper imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from main import main
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the game or play back a replay.")
+    parser.add_argument('--seed', type=int, default=None, help="seed every run with this value")
+    parser.add_argument('--replay', help="replay file recorded by a previous session")
+    parser.add_argument('--headless', action='store_true', help="verify the replay without a display")
+    parser.add_argument('--step-delay', type=float, default=0.3, help="seconds between replayed commands")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.replay and args.headless:
+        from engine.replay import ReplayLog, ReplayMismatch, replay_headless
+        log = ReplayLog.load(args.replay)
+        try:
+            run = replay_headless(log)
+        except ReplayMismatch as ex:
+            print(f"✗ {ex}")
+            sys.exit(1)
+        print(f"✓ Replay matches: {log.battle_count} battles, {run.total_run_turns} turns, "
+              f"level {run.player_stats['level']}")
+    else:
+        from main import main
+        log = None
+        if args.replay:
+            from engine.replay import ReplayLog
+            log = ReplayLog.load(args.replay)
+        main(seed=args.seed, replay=log, step_delay=args.step_delay)
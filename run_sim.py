@@ -0,0 +1,11 @@
+"""Simulation entry point - headless balance runs (see src/sim/runner.py)."""
+import sys
+import os
+
+# Add src to path for proper imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from sim.runner import main
+
+if __name__ == "__main__":
+    main()
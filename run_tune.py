@@ -0,0 +1,11 @@
+"""Tuning entry point - fuzzy membership parameters (see src/sim/tuner.py)."""
+import sys
+import os
+
+# Add src to path for proper imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from sim.tuner import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""Determinism check entry point - replays seeded runs across processes (see src/sim/determinism.py)."""
+import sys
+import os
+
+# Add src to path for proper imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from sim.determinism import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Batched fuzzy scoring over NumPy arrays.
+
+Each function takes equal-length arrays of inputs and returns a float64
+array of scores that is bit-for-bit equal to calling the scalar scorer in
+fuzzy_logic element by element: memberships use the same interpolation
+and rules are accumulated in the same order.
+
+Mamdani has no closed vectorized form in skfuzzy, so batch_mamdani_* only
+evaluates the distinct input rows of a batch and memoizes them.
+"""
+import numpy as np
+
+from ai import fuzzy_logic as fl
+
+CENTROIDS = {'weak': 20.0, 'mid': 50.0, 'strong': 80.0}
+
+
+def _f(a):
+    return np.asarray(a, dtype=np.float64)
+
+
+# -------------------- fallback heuristics --------------------
+
+def batch_fallback_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p):
+    hp_p, hp_b, mana_b, cd_p = _f(hp_p), _f(hp_b), _f(mana_b), _f(cd_p)
+    score = np.full(hp_p.shape, 50.0)
+    score += (100 - hp_p) * 0.2
+    score += (hp_b - 50) * 0.2
+    score += (mana_b - 50) * 0.1
+    score += (cd_p) * 1.2
+    score = np.where(hp_b < 30, score - 35, score)
+    return np.clip(score, 0, 100)
+
+
+def batch_fallback_no_mana(hp_p, hp_b, cd_p):
+    hp_p, hp_b, cd_p = _f(hp_p), _f(hp_b), _f(cd_p)
+    score = np.full(hp_p.shape, 50.0)
+    score += (100 - hp_p) * 0.25
+    score += (hp_b - 50) * 0.25
+    score += (cd_p) * 1.5
+    score = np.where(hp_b < 30, score - 40, score)
+    return np.clip(score, 0, 100)
+
+
+# -------------------- membership degrees --------------------
+
+def interp(x, xp, fp):
+    """np.interp with zero outside the universe, as fuzz.interp_membership."""
+    return np.interp(x, xp, fp, left=0.0, right=0.0)
+
+
+def _degrees_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p):
+    return {
+        'hp_p_low': interp(hp_p, fl.x_hp, fl.hp_p_low),
+        'hp_p_med': interp(hp_p, fl.x_hp, fl.hp_p_med),
+        'hp_p_high': interp(hp_p, fl.x_hp, fl.hp_p_high),
+        'hp_b_low': interp(hp_b, fl.x_hp, fl.hp_b_low),
+        'hp_b_med': interp(hp_b, fl.x_hp, fl.hp_b_med),
+        'hp_b_high': interp(hp_b, fl.x_hp, fl.hp_b_high),
+        'mana_p_low': interp(mana_p, fl.x_mana, fl.mana_p_low),
+        'mana_p_med': interp(mana_p, fl.x_mana, fl.mana_p_med),
+        'mana_p_high': interp(mana_p, fl.x_mana, fl.mana_p_high),
+        'mana_b_low': interp(mana_b, fl.x_mana, fl.mana_b_low),
+        'mana_b_med': interp(mana_b, fl.x_mana, fl.mana_b_med),
+        'mana_b_high': interp(mana_b, fl.x_mana, fl.mana_b_high),
+        'cd_ready': interp(cd_p, fl.x_cd, fl.cd_ready),
+        'cd_mid': interp(cd_p, fl.x_cd, fl.cd_mid),
+        'cd_long': interp(cd_p, fl.x_cd, fl.cd_long),
+    }
+
+
+def _degrees_no_mana(hp_p, hp_b, cd_p):
+    return {
+        'hp_p_low': interp(hp_p, fl.x_hp, fl.hp_l),
+        'hp_p_med': interp(hp_p, fl.x_hp, fl.hp_m),
+        'hp_p_high': interp(hp_p, fl.x_hp, fl.hp_h),
+        'hp_b_low': interp(hp_b, fl.x_hp, fl.hp_l),
+        'hp_b_med': interp(hp_b, fl.x_hp, fl.hp_m),
+        'hp_b_high': interp(hp_b, fl.x_hp, fl.hp_h),
+        'cd_ready': interp(cd_p, fl.x_cd, fl.cd_r),
+        'cd_mid': interp(cd_p, fl.x_cd, fl.cd_m),
+        'cd_long': interp(cd_p, fl.x_cd, fl.cd_l),
+    }
+
+
+def _firing(deg, conds, shape):
+    # unknown labels count as 0.0, exactly like deg.get(c, 0.0) in fuzzy_logic
+    if not conds:
+        return np.zeros(shape)
+    zero = np.zeros(shape)
+    firing = deg.get(conds[0], zero)
+    for c in conds[1:]:
+        firing = np.minimum(firing, deg.get(c, zero))
+    return firing
+
+
+def _sugeno(deg, specs, shape):
+    num = np.zeros(shape)
+    den = np.zeros(shape)
+    for conds, out in specs:
+        firing = _firing(deg, conds, shape)
+        num += firing * CENTROIDS[out]
+        den += firing
+    return num, den
+
+
+def _tsukamoto(deg, specs, shape):
+    num = np.zeros(shape)
+    den = np.zeros(shape)
+    for conds, out in specs:
+        firing = _firing(deg, conds, shape)
+        z = fl.tsukamoto_z(out, firing)
+        num += firing * z
+        den += firing
+    return num, den
+
+
+def _ratio_or(num, den, fallback_fn):
+    """num/den where den is significant, fallback_fn(mask) elsewhere."""
+    ok = den > 1e-9
+    out = np.empty(num.shape)
+    out[ok] = num[ok] / den[ok]
+    if not ok.all():
+        out[~ok] = fallback_fn(~ok)
+    return out
+
+
+# -------------------- Sugeno / Tsukamoto --------------------
+
+def batch_sugeno_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p):
+    hp_p, hp_b, mana_p, mana_b, cd_p = map(_f, (hp_p, hp_b, mana_p, mana_b, cd_p))
+    if not fl.SKFUZZY:
+        return np.clip(batch_fallback_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p) * 0.95, 0, 100)
+    num, den = _sugeno(_degrees_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p), fl.rule_specs, hp_p.shape)
+    return _ratio_or(num, den, lambda m: batch_fallback_with_mana(hp_p[m], hp_b[m], mana_p[m], mana_b[m], cd_p[m]))
+
+
+def batch_sugeno_no_mana(hp_p, hp_b, cd_p):
+    hp_p, hp_b, cd_p = map(_f, (hp_p, hp_b, cd_p))
+    if not fl.SKFUZZY:
+        return np.clip(batch_fallback_no_mana(hp_p, hp_b, cd_p) * 0.95, 0, 100)
+    num, den = _sugeno(_degrees_no_mana(hp_p, hp_b, cd_p), fl.rule_specs_z, hp_p.shape)
+    return _ratio_or(num, den, lambda m: batch_fallback_no_mana(hp_p[m], hp_b[m], cd_p[m]))
+
+
+def batch_tsukamoto_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p):
+    hp_p, hp_b, mana_p, mana_b, cd_p = map(_f, (hp_p, hp_b, mana_p, mana_b, cd_p))
+    if not fl.SKFUZZY:
+        return np.clip(batch_fallback_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p) * 1.05, 0, 100)
+    num, den = _tsukamoto(_degrees_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p), fl.rule_specs, hp_p.shape)
+    return _ratio_or(num, den, lambda m: batch_mamdani_with_mana(hp_p[m], hp_b[m], mana_p[m], mana_b[m], cd_p[m]))
+
+
+def batch_tsukamoto_no_mana(hp_p, hp_b, cd_p):
+    hp_p, hp_b, cd_p = map(_f, (hp_p, hp_b, cd_p))
+    if not fl.SKFUZZY:
+        return np.clip(batch_fallback_no_mana(hp_p, hp_b, cd_p) * 1.05, 0, 100)
+    num, den = _tsukamoto(_degrees_no_mana(hp_p, hp_b, cd_p), fl.rule_specs_z, hp_p.shape)
+    return _ratio_or(num, den, lambda m: batch_mamdani_no_mana(hp_p[m], hp_b[m], cd_p[m]))
+
+
+# -------------------- Mamdani (memoized) --------------------
+
+_mamdani_cache = {}
+_cache_version = fl.params_version
+
+
+def _memoized(fn, columns):
+    global _cache_version
+    if _cache_version != fl.params_version:
+        _mamdani_cache.clear()  # scores of the previous apply_params()
+        _cache_version = fl.params_version
+    rows = np.stack([_f(c) for c in columns], axis=1)
+    if len(rows) == 0:
+        return np.zeros(0)
+    unique, inverse = np.unique(rows, axis=0, return_inverse=True)
+    values = np.empty(len(unique))
+    for i, row in enumerate(unique):
+        key = (fn.__name__,) + tuple(row.tolist())
+        v = _mamdani_cache.get(key)
+        if v is None:
+            v = _mamdani_cache[key] = float(fn(*key[1:]))
+        values[i] = v
+    return values[inverse.reshape(-1)]
+
+
+def batch_mamdani_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p):
+    return _memoized(fl.mamdani_with_mana, (hp_p, hp_b, mana_p, mana_b, cd_p))
+
+
+def batch_mamdani_no_mana(hp_p, hp_b, cd_p):
+    return _memoized(fl.mamdani_no_mana, (hp_p, hp_b, cd_p))
+
+
+# scorer pairs per method, mirroring fuzzy_logic.SCORERS
+BATCH_SCORERS = {
+    'mamdani': (batch_mamdani_no_mana, batch_mamdani_with_mana),
+    'sugeno': (batch_sugeno_no_mana, batch_sugeno_with_mana),
+    'tsukamoto': (batch_tsukamoto_no_mana, batch_tsukamoto_with_mana),
+    'fallback': (batch_fallback_no_mana, batch_fallback_with_mana),
+}
+
+
+def batch_action_scores(uses_mana, hp_p, hp_b, mana_p, mana_b, cd_p, method=None):
+    """Score a batch of bots; `uses_mana` selects the with-mana FIS per row."""
+    no_mana, with_mana = BATCH_SCORERS[method or 'mamdani']
+    uses_mana = np.asarray(uses_mana, dtype=bool)
+    out = np.empty(uses_mana.shape)
+    m = uses_mana
+    if m.any():
+        out[m] = with_mana(_f(hp_p)[m], _f(hp_b)[m], _f(mana_p)[m], _f(mana_b)[m], _f(cd_p)[m])
+    m = ~uses_mana
+    if m.any():
+        out[m] = no_mana(_f(hp_p)[m], _f(hp_b)[m], _f(cd_p)[m])
+    return out
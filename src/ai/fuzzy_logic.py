@@ -17,30 +17,76 @@ x_mana = np.arange(0, 101, 1)
 x_cd = np.arange(0, 11, 1)
 x_action = np.arange(0, 101, 1)
 
-# Build FIS (Mamdani) same seperti sebelumnya
-if SKFUZZY:
+# Tunable shape of the FIS: membership breakpoints (same as cb.ipynb) per
+# set, and the Tsukamoto inversion constants (weak: z = top * (1 - w),
+# mid/strong: z = base + span * w). sim/tuner.py searches over these;
+# apply_params() swaps a set in.
+MEMBERSHIPS = {
+    # name: (shape, universe)
+    'hp_p_low': ('trapmf', 'hp'), 'hp_p_med': ('trapmf', 'hp'), 'hp_p_high': ('trapmf', 'hp'),
+    'hp_b_low': ('trapmf', 'hp'), 'hp_b_med': ('trapmf', 'hp'), 'hp_b_high': ('trapmf', 'hp'),
+    'mana_p_low': ('trimf', 'mana'), 'mana_p_med': ('trimf', 'mana'), 'mana_p_high': ('trimf', 'mana'),
+    'mana_b_low': ('trimf', 'mana'), 'mana_b_med': ('trimf', 'mana'), 'mana_b_high': ('trimf', 'mana'),
+    'cd_ready': ('trapmf', 'cd'), 'cd_mid': ('trapmf', 'cd'), 'cd_long': ('trapmf', 'cd'),
+    'act_weak': ('trapmf', 'action'), 'act_mid': ('trapmf', 'action'), 'act_strong': ('trapmf', 'action'),
+    # no-mana FIS (Zombie/Skeleton): one HP partition for both players
+    'hp_l': ('trapmf', 'hp'), 'hp_m': ('trapmf', 'hp'), 'hp_h': ('trapmf', 'hp'),
+    'cd_r': ('trapmf', 'cd'), 'cd_m': ('trapmf', 'cd'), 'cd_l': ('trapmf', 'cd'),
+}
+UNIVERSES = {'hp': x_hp, 'mana': x_mana, 'cd': x_cd, 'action': x_action}
+
+DEFAULT_PARAMS = {
+    'hp_p_low': [0, 0, 20, 50], 'hp_p_med': [20, 40, 60, 80], 'hp_p_high': [50, 80, 100, 100],
+    'hp_b_low': [0, 0, 30, 60], 'hp_b_med': [30, 50, 70, 90], 'hp_b_high': [70, 90, 100, 100],
+    'mana_p_low': [0, 0, 40], 'mana_p_med': [20, 50, 80], 'mana_p_high': [60, 100, 100],
+    'mana_b_low': [0, 0, 30], 'mana_b_med': [30, 50, 70], 'mana_b_high': [70, 100, 100],
+    'cd_ready': [0, 0, 1, 3], 'cd_mid': [2, 4, 6, 8], 'cd_long': [6, 9, 10, 10],
+    'act_weak': [0, 0, 20, 40], 'act_mid': [20, 40, 60, 80], 'act_strong': [60, 80, 100, 100],
+    'hp_l': [0, 0, 20, 50], 'hp_m': [20, 40, 60, 80], 'hp_h': [50, 80, 100, 100],
+    'cd_r': [0, 0, 1, 3], 'cd_m': [2, 4, 6, 8], 'cd_l': [6, 9, 10, 10],
+    'tsukamoto_weak': [40.0],
+    'tsukamoto_mid': [40.0, 20.0],
+    'tsukamoto_strong': [60.0, 40.0],
+}
+
+# parameters in effect; bumped on every apply_params() so caches can tell
+params = {k: list(v) for k, v in DEFAULT_PARAMS.items()}
+params_version = 0
+
+
+def validate_params(overrides):
+    """Check names, lengths and ordering of FIS parameter overrides.
+
+    Raises:
+        KeyError: On an unknown parameter name.
+        ValueError: On a wrong length or unordered breakpoints.
+    """
+    for name, value in overrides.items():
+        if name not in DEFAULT_PARAMS:
+            raise KeyError(f"Unknown fuzzy parameter: {name}")
+        if len(value) != len(DEFAULT_PARAMS[name]):
+            raise ValueError(f"{name} needs {len(DEFAULT_PARAMS[name])} values, got {len(value)}")
+        if name in MEMBERSHIPS and list(value) != sorted(value):
+            raise ValueError(f"{name} breakpoints must be ascending: {value}")
+
+
+def _build_systems():
+    """(Re)build the membership arrays and Mamdani systems from `params`."""
+    global hp_p_low, hp_p_med, hp_p_high, hp_b_low, hp_b_med, hp_b_high
+    global mana_p_low, mana_p_med, mana_p_high, mana_b_low, mana_b_med, mana_b_high
+    global cd_ready, cd_mid, cd_long, act_weak, act_mid, act_strong
+    global hp_l, hp_m, hp_h, cd_r, cd_m, cd_l
+    global bot_ctrl, bot_simulasi, system_z, sim_z
+    mf = {name: getattr(fuzz, shape)(UNIVERSES[universe], params[name])
+          for name, (shape, universe) in MEMBERSHIPS.items()}
+
     # membership arrays (same as cb.ipynb)
-    hp_p_low = fuzz.trapmf(x_hp, [0, 0, 20, 50])
-    hp_p_med = fuzz.trapmf(x_hp, [20, 40, 60, 80])
-    hp_p_high = fuzz.trapmf(x_hp, [50, 80, 100, 100])
-    hp_b_low = fuzz.trapmf(x_hp, [0, 0, 30, 60])
-    hp_b_med = fuzz.trapmf(x_hp, [30, 50, 70, 90])
-    hp_b_high = fuzz.trapmf(x_hp, [70, 90, 100, 100])
-
-    mana_p_low = fuzz.trimf(x_mana, [0, 0, 40])
-    mana_p_med = fuzz.trimf(x_mana, [20, 50, 80])
-    mana_p_high = fuzz.trimf(x_mana, [60, 100, 100])
-    mana_b_low = fuzz.trimf(x_mana, [0, 0, 30])
-    mana_b_med = fuzz.trimf(x_mana, [30, 50, 70])
-    mana_b_high = fuzz.trimf(x_mana, [70, 100, 100])
-
-    cd_ready = fuzz.trapmf(x_cd, [0, 0, 1, 3])
-    cd_mid = fuzz.trapmf(x_cd, [2, 4, 6, 8])
-    cd_long = fuzz.trapmf(x_cd, [6, 9, 10, 10])
-
-    act_weak = fuzz.trapmf(x_action, [0, 0, 20, 40])
-    act_mid = fuzz.trapmf(x_action, [20, 40, 60, 80])
-    act_strong = fuzz.trapmf(x_action, [60, 80, 100, 100])
+    hp_p_low, hp_p_med, hp_p_high = mf['hp_p_low'], mf['hp_p_med'], mf['hp_p_high']
+    hp_b_low, hp_b_med, hp_b_high = mf['hp_b_low'], mf['hp_b_med'], mf['hp_b_high']
+    mana_p_low, mana_p_med, mana_p_high = mf['mana_p_low'], mf['mana_p_med'], mf['mana_p_high']
+    mana_b_low, mana_b_med, mana_b_high = mf['mana_b_low'], mf['mana_b_med'], mf['mana_b_high']
+    cd_ready, cd_mid, cd_long = mf['cd_ready'], mf['cd_mid'], mf['cd_long']
+    act_weak, act_mid, act_strong = mf['act_weak'], mf['act_mid'], mf['act_strong']
 
     # Antecedents / Consequents (with-mana)
     hp_p = ctrl.Antecedent(x_hp, 'HP_Player')
@@ -57,33 +103,6 @@ if SKFUZZY:
     cd_p['ready'], cd_p['mid'], cd_p['long'] = cd_ready, cd_mid, cd_long
     action['weak'], action['mid'], action['strong'] = act_weak, act_mid, act_strong
 
-    # rule specs (mirror cb.ipynb rules) as condition labels for Sugeno/Tsukamoto
-    rule_specs = [
-        (['hp_bot_low','hp_p_high'], 'weak'),
-        (['hp_bot_high','hp_p_low'], 'strong'),
-        (['hp_bot_low','mana_b_low'], 'weak'),
-        (['mana_b_high','hp_p_low'], 'strong'),
-        (['cd_ready','hp_bot_med'], 'weak'),
-
-        (['cd_long','hp_bot_high'], 'strong'),
-        (['hp_bot_med','hp_p_med'], 'mid'),
-        (['mana_p_low','cd_mid'], 'strong'),
-        (['mana_b_low','hp_bot_med'], 'weak'),
-        (['hp_p_high','mana_b_low'], 'weak'),
-
-        (['hp_bot_high','mana_p_high'], 'mid'),
-        (['hp_bot_low','mana_p_high'], 'weak'),
-        (['mana_b_high','mana_p_low'], 'strong'),
-        (['cd_ready','hp_p_high'], 'mid'),
-        (['cd_long','mana_b_med'], 'mid'),
-
-        (['hp_bot_high','hp_p_med'], 'strong'),
-        (['hp_bot_med','hp_p_low'], 'strong'),
-        (['mana_p_high','mana_b_low'], 'weak'),
-        (['cd_long','hp_p_med'], 'mid'),
-        (['hp_bot_high','mana_b_high'], 'strong'),
-    ]
-
     # Build Mamdani ControlSystem (existing)
     rules = [
         ctrl.Rule(hp_bot['low'] & hp_p['high'], action['weak']),
@@ -119,12 +138,8 @@ if SKFUZZY:
     CD_P_z = ctrl.Antecedent(x_cd, 'CD_Player_Z')
     ACTION_z = ctrl.Consequent(x_action, 'Action_Strength_Z')
 
-    hp_l = fuzz.trapmf(x_hp, [0, 0, 20, 50])
-    hp_m = fuzz.trapmf(x_hp, [20, 40, 60, 80])
-    hp_h = fuzz.trapmf(x_hp, [50, 80, 100, 100])
-    cd_r = fuzz.trapmf(x_cd, [0, 0, 1, 3])
-    cd_m = fuzz.trapmf(x_cd, [2, 4, 6, 8])
-    cd_l = fuzz.trapmf(x_cd, [6, 9, 10, 10])
+    hp_l, hp_m, hp_h = mf['hp_l'], mf['hp_m'], mf['hp_h']
+    cd_r, cd_m, cd_l = mf['cd_r'], mf['cd_m'], mf['cd_l']
 
     ACTION_z['weak'], ACTION_z['mid'], ACTION_z['strong'] = act_weak, act_mid, act_strong
     HP_P_z['low'], HP_P_z['med'], HP_P_z['high'] = hp_l, hp_m, hp_h
@@ -140,6 +155,81 @@ if SKFUZZY:
     system_z = ctrl.ControlSystem(rules_z)
     sim_z = ctrl.ControlSystemSimulation(system_z)
 
+
+def apply_params(overrides=None):
+    """Use DEFAULT_PARAMS with `overrides` applied for all scoring from now on.
+
+    Args:
+        overrides: Optional dict of {name: list of values}; None restores
+            the defaults.
+    """
+    global params, params_version
+    overrides = overrides or {}
+    validate_params(overrides)
+    params = {k: list(overrides.get(k, v)) for k, v in DEFAULT_PARAMS.items()}
+    params_version += 1
+    if SKFUZZY:
+        _build_systems()
+
+
+def load_params(path):
+    """Apply the parameter file written by sim/tuner.py.
+
+    Returns:
+        The applied overrides dict.
+    """
+    import json
+    with open(path, 'r', encoding='utf-8') as f:
+        overrides = json.load(f)['params']
+    apply_params(overrides)
+    return overrides
+
+
+def save_params(path, overrides, **info):
+    """Write `overrides` (plus JSON-friendly `info`) as a parameter file."""
+    import json
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'params': overrides, **info}, f, indent=2)
+
+
+if SKFUZZY:
+    _build_systems()
+
+    # rule specs (mirror cb.ipynb rules) as condition labels for Sugeno/Tsukamoto
+    rule_specs = [
+        (['hp_bot_low','hp_p_high'], 'weak'),
+        (['hp_bot_high','hp_p_low'], 'strong'),
+        (['hp_bot_low','mana_b_low'], 'weak'),
+        (['mana_b_high','hp_p_low'], 'strong'),
+        (['cd_ready','hp_bot_med'], 'weak'),
+
+        (['cd_long','hp_bot_high'], 'strong'),
+        (['hp_bot_med','hp_p_med'], 'mid'),
+        (['mana_p_low','cd_mid'], 'strong'),
+        (['mana_b_low','hp_bot_med'], 'weak'),
+        (['hp_p_high','mana_b_low'], 'weak'),
+
+        (['hp_bot_high','mana_p_high'], 'mid'),
+        (['hp_bot_low','mana_p_high'], 'weak'),
+        (['mana_b_high','mana_p_low'], 'strong'),
+        (['cd_ready','hp_p_high'], 'mid'),
+        (['cd_long','mana_b_med'], 'mid'),
+
+        (['hp_bot_high','hp_p_med'], 'strong'),
+        (['hp_bot_med','hp_p_low'], 'strong'),
+        (['mana_p_high','mana_b_low'], 'weak'),
+        (['cd_long','hp_p_med'], 'mid'),
+        (['hp_bot_high','mana_b_high'], 'strong'),
+    ]
+
+# subset of rules_z as condition labels, used by the no-mana Sugeno/Tsukamoto
+rule_specs_z = [
+    (['hp_b_high','cd_long'], 'strong'),
+    (['hp_p_low'], 'strong'),
+    (['hp_b_low'], 'weak'),
+    (['cd_ready','hp_b_med'], 'mid'),
+]
+
 # Fallback scorers (simple heuristics)
 def fallback_score_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p):
     score = 50.0
@@ -211,6 +301,8 @@ def mamdani_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p):
             bot_simulasi.compute()
             return float(bot_simulasi.output['Action_Strength'])
         except Exception:
+            # a failed compute leaves stale state that leaks into later calls
+            bot_simulasi.reset()
             return fallback_score_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p)
     else:
         return fallback_score_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p)
@@ -224,6 +316,8 @@ def mamdani_no_mana(hp_p, hp_b, cd_p):
             sim_z.compute()
             return float(sim_z.output['Action_Strength_Z'])
         except Exception:
+            # a failed compute leaves stale state that leaks into later calls
+            sim_z.reset()
             return fallback_score_no_mana(hp_p, hp_b, cd_p)
     else:
         return fallback_score_no_mana(hp_p, hp_b, cd_p)
@@ -252,13 +346,6 @@ def sugeno_no_mana(hp_p, hp_b, cd_p):
         return max(0, min(100, base * 0.95))
     deg = _compute_degrees_no_mana(hp_p, hp_b, cd_p)
     centroids = {'weak': 20.0, 'mid': 50.0, 'strong': 80.0}
-    # use subset of rules_z approximated as rule_specs_z
-    rule_specs_z = [
-        (['hp_b_high','cd_long'], 'strong'),
-        (['hp_p_low'], 'strong'),
-        (['hp_b_low'], 'weak'),
-        (['cd_ready','hp_b_med'], 'mid'),
-    ]
     num = 0.0; den = 0.0
     for conds, out in rule_specs_z:
         vals = [deg.get(c, 0.0) for c in conds]
@@ -268,6 +355,18 @@ def sugeno_no_mana(hp_p, hp_b, cd_p):
     return float(num/den) if den > 1e-9 else float(fallback_score_no_mana(hp_p,hp_b,cd_p))
 
 # Tsukamoto approximator: invert monotonic consequents to get z per rule then weighted average
+def tsukamoto_z(out, firing):
+    """Crisp output of a rule with consequent `out` firing at `firing`.
+
+    With the default params: weak 0..40, mid 40..60, strong 60..100.
+    Works on floats and NumPy arrays alike.
+    """
+    if out == 'weak':
+        top, = params['tsukamoto_weak']
+        return top * (1.0 - firing)
+    base, span = params['tsukamoto_mid' if out == 'mid' else 'tsukamoto_strong']
+    return base + span * firing
+
 def tsukamoto_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p):
     if not SKFUZZY:
         base = fallback_score_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p)
@@ -278,12 +377,7 @@ def tsukamoto_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p):
         vals = [deg.get(c, 0.0) for c in conds]
         firing = min(vals) if vals else 0.0
         # invert monotonic consequent approx:
-        if out == 'weak':
-            z = 40.0 * (1.0 - firing)       # range 0..40
-        elif out == 'mid':
-            z = 40.0 + 20.0 * firing       # range 40..60
-        else:  # 'strong'
-            z = 60.0 + 40.0 * firing       # range 60..100
+        z = tsukamoto_z(out, firing)
         num += firing * z
         den += firing
     return float(num/den) if den > 1e-9 else float(mamdani_with_mana(hp_p,hp_b,mana_p,mana_b,cd_p))
@@ -293,34 +387,32 @@ def tsukamoto_no_mana(hp_p, hp_b, cd_p):
         base = fallback_score_no_mana(hp_p, hp_b, cd_p)
         return max(0, min(100, base * 1.05))
     deg = _compute_degrees_no_mana(hp_p, hp_b, cd_p)
-    rule_specs_z = [
-        (['hp_b_high','cd_long'], 'strong'),
-        (['hp_p_low'], 'strong'),
-        (['hp_b_low'], 'weak'),
-        (['cd_ready','hp_b_med'], 'mid'),
-    ]
     num = 0.0; den = 0.0
     for conds, out in rule_specs_z:
         vals = [deg.get(c, 0.0) for c in conds]
         firing = min(vals) if vals else 0.0
-        if out == 'weak':
-            z = 40.0 * (1.0 - firing)
-        elif out == 'mid':
-            z = 40.0 + 20.0 * firing
-        else:
-            z = 60.0 + 40.0 * firing
+        z = tsukamoto_z(out, firing)
         num += firing * z
         den += firing
     return float(num/den) if den > 1e-9 else float(mamdani_no_mana(hp_p,hp_b,cd_p))
 
 # -------------------- aggregator helpers --------------------
 
+# per-type AI profile (mana use, behaviours, heal interrupt) lives in the
+# enemy archetype table
+from entities.registry import ENEMY_ARCHETYPES
+
+def uses_mana(bot_type):
+    """True if `bot_type` is scored with the with-mana FIS (unknown types are)."""
+    arch = ENEMY_ARCHETYPES.get(bot_type)
+    return arch is None or arch.uses_mana
+
 def get_all_scores(bot_type, hp_p, hp_b, mana_p, mana_b, cd_p):
     """
     Return dict with three inference scores: {'mamdani':..,'sugeno':..,'tsukamoto':..}
     Use no-mana versions for Zombie/Skeleton; with-mana for Enderman/Boss.
     """
-    if bot_type in ('Zombie','Skeleton'):
+    if not uses_mana(bot_type):
         m = mamdani_no_mana(hp_p,hp_b,cd_p)
         s = sugeno_no_mana(hp_p,hp_b,cd_p)
         t = tsukamoto_no_mana(hp_p,hp_b,cd_p)
@@ -330,6 +422,21 @@ def get_all_scores(bot_type, hp_p, hp_b, mana_p, mana_b, cd_p):
         t = tsukamoto_with_mana(hp_p,hp_b,mana_p,mana_b,cd_p)
     return {'mamdani': float(m), 'sugeno': float(s), 'tsukamoto': float(t)}
 
+# scorer pairs per inference method: (no-mana for Zombie/Skeleton, with-mana)
+SCORERS = {
+    'mamdani': (mamdani_no_mana, mamdani_with_mana),
+    'sugeno': (sugeno_no_mana, sugeno_with_mana),
+    'tsukamoto': (tsukamoto_no_mana, tsukamoto_with_mana),
+    'fallback': (fallback_score_no_mana, fallback_score_with_mana),
+}
+
+def get_action_score(bot_type, hp_p, hp_b, mana_p, mana_b, cd_p, method=None):
+    """Score one bot with a single inference method (default Mamdani)."""
+    no_mana, with_mana = SCORERS[method or 'mamdani']
+    if not uses_mana(bot_type):
+        return no_mana(hp_p, hp_b, cd_p)
+    return with_mana(hp_p, hp_b, mana_p, mana_b, cd_p)
+
 # Backwards-compatible wrappers (keep default behaviour using Mamdani scorers)
 def get_bot_action_score(hp_p_val, hp_b_val, mana_p_val, mana_b_val, cd_p_val):
     return mamdani_with_mana(hp_p_val, hp_b_val, mana_p_val, mana_b_val, cd_p_val)
@@ -340,29 +447,16 @@ def get_zombie_action_score(hp_p_val, hp_b_val, cd_p_val):
 # existing high-level API unchanged: map -> behavior + actions
 def map_fuzzy_score_to_behavior(score, bot_type):
     if score < 40:
-        strength = "Weak"
+        strength = 0  # Weak
     elif score < 70:
-        strength = "Mid"
+        strength = 1  # Mid
     else:
-        strength = "Strong"
-
-    if bot_type == "Zombie":
-        if strength == "Weak":   return "MOVE_RETREAT"
-        if strength == "Mid":    return "MOVE_CLOSE"
-        if strength == "Strong": return "MOVE_CLOSE"
-    if bot_type == "Skeleton":
-        if strength == "Weak":   return "MOVE_RETREAT"
-        if strength == "Mid":    return "RANGED_ATTACK"
-        if strength == "Strong": return "RANGED_ATTACK"
-    if bot_type == "Enderman":
-        if strength == "Weak":   return "TELEPORT_FAR"
-        if strength == "Mid":    return "TELEPORT_CLOSE"
-        if strength == "Strong": return "TELEPORT_CLOSE"
-    if bot_type == "Boss":
-        if strength == "Weak":   return "MOVE_RETREAT"
-        if strength == "Mid":    return "RANGED_ATTACK"
-        if strength == "Strong": return "MOVE_CLOSE"
-    return "WAIT"
+        strength = 2  # Strong
+
+    arch = ENEMY_ARCHETYPES.get(bot_type)
+    if arch is None:
+        return "WAIT"
+    return arch.behaviors[strength]
 
 # --- Movement & utility helpers (dipakai oleh get_final_action) ---
 
@@ -401,43 +495,61 @@ def pick_adjacent_for_farther(zpos, ppos, occupied, grid_w, grid_h):
                 best = (nx, ny)
     return best
 
+def _step_closer(pos, player_pos, occupied, grid_w, grid_h, influence=None):
+    if influence is not None:
+        return influence.step_toward(pos, occupied)
+    return pick_adjacent_for_closer(pos, player_pos, occupied, grid_w, grid_h)
+
+def _step_farther(pos, player_pos, occupied, grid_w, grid_h, influence=None):
+    if influence is not None:
+        return influence.step_away(pos, occupied)
+    return pick_adjacent_for_farther(pos, player_pos, occupied, grid_w, grid_h)
+
 # --- Heal-priority interrupt (Enderman / Boss) ---
 def heal_priority_check(bot_type, hp_b_val, mana_b_val):
-    if bot_type == "Enderman":
-        if hp_b_val <= 40 and mana_b_val >= 30:
-            return ("HEAL", True)
-    if bot_type == "Boss":
-        if hp_b_val <= 50 and mana_b_val >= 40:
-            return ("HEAL", True)
+    arch = ENEMY_ARCHETYPES.get(bot_type)
+    heal_at = arch.heal_at if arch is not None else None
+    if heal_at is not None and hp_b_val <= heal_at[0] and mana_b_val >= heal_at[1]:
+        return ("HEAL", True)
     return (None, False)
 
 # keep get_final_action / wrappers from previous file (unchanged)
 def get_final_action(bot_type, hp_p, hp_b, mana_p, mana_b, cd_p,
-                     pos, player_pos, occupied, grid_w=8, grid_h=6):
+                     pos, player_pos, occupied, grid_w=8, grid_h=6, influence=None,
+                     inference=None, score=None):
+    """Decide (action, target) for one bot.
+
+    When `influence` (an ai.influence_maps.InfluenceMaps for this turn) is
+    given, movement targets are picked from the whole board instead of only
+    the bot's four neighbours. `inference` selects a key of SCORERS; the
+    default keeps the Mamdani behaviour. A precomputed `score` (e.g. from
+    ai.fuzzy_batch) is used instead of scoring the bot here.
+    """
     if hp_b <= 0:
         return ("WAIT", None)
     heal_act, do_heal = heal_priority_check(bot_type, hp_b, mana_b)
     if do_heal:
-        tgt = pick_adjacent_for_farther(pos, player_pos, occupied, grid_w, grid_h)
+        tgt = _step_farther(pos, player_pos, occupied, grid_w, grid_h, influence)
         return ("HEAL", tgt)
     if manhattan(pos, player_pos) == 1:
         return ("ATTACK", player_pos)
 
     # default uses Mamdani mapping (keeps previous behavior)
-    if bot_type in ('Zombie','Skeleton'):
-        score = mamdani_no_mana(hp_p, hp_b, cd_p)
-    else:
-        score = mamdani_with_mana(hp_p, hp_b, mana_p, mana_b, cd_p)
+    if score is None:
+        score = get_action_score(bot_type, hp_p, hp_b, mana_p, mana_b, cd_p, inference)
 
     behavior = map_fuzzy_score_to_behavior(score, bot_type)
 
     if behavior == "RANGED_ATTACK":
         if manhattan(pos, player_pos) <= 2:
             return ("RANGED_ATTACK", player_pos)
-        tgt = pick_adjacent_for_closer(pos, player_pos, occupied, grid_w, grid_h)
+        tgt = _step_closer(pos, player_pos, occupied, grid_w, grid_h, influence)
         return ("MOVE_CLOSE", tgt) if tgt else ("WAIT", None)
 
     if behavior == "TELEPORT_CLOSE":
+        if influence is not None:
+            tgt = influence.teleport_close(occupied)
+            return ("TELEPORT", tgt) if tgt else ("WAIT", None)
         for dx,dy in [(1,0),(-1,0),(0,1),(0,-1)]:
             tx,ty = player_pos[0]+dx, player_pos[1]+dy
             if 0 <= tx < grid_w and 0 <= ty < grid_h and (tx,ty) not in occupied and (tx,ty) not in MAP_BLOCKED_TILES:
@@ -445,15 +557,18 @@ def get_final_action(bot_type, hp_p, hp_b, mana_p, mana_b, cd_p,
         return ("WAIT", None)
 
     if behavior == "TELEPORT_FAR":
-        tgt = pick_adjacent_for_farther(pos, player_pos, occupied, grid_w, grid_h)
+        if influence is not None:
+            tgt = influence.teleport_far(occupied)
+        else:
+            tgt = pick_adjacent_for_farther(pos, player_pos, occupied, grid_w, grid_h)
         return ("TELEPORT", tgt) if tgt else ("WAIT", None)
 
     if behavior == "MOVE_CLOSE":
-        tgt = pick_adjacent_for_closer(pos, player_pos, occupied, grid_w, grid_h)
+        tgt = _step_closer(pos, player_pos, occupied, grid_w, grid_h, influence)
         return ("MOVE_CLOSE", tgt) if tgt else ("WAIT", None)
 
     if behavior == "MOVE_RETREAT":
-        tgt = pick_adjacent_for_farther(pos, player_pos, occupied, grid_w, grid_h)
+        tgt = _step_farther(pos, player_pos, occupied, grid_w, grid_h, influence)
         return ("MOVE_RETREAT", tgt) if tgt else ("WAIT", None)
 
     return ("WAIT", None)
@@ -465,6 +580,6 @@ def get_zombie_action(hp_player, hp_zombie, mana_player, mana_zombie, cd_player,
                             zombie_pos, player_pos, occupied_positions, grid_w, grid_h)
 
 def get_bot_action(bot_type, hp_player, hp_bot, mana_player, mana_bot, cd_player,
-                   bot_pos, player_pos, occupied_positions, grid_w=8, grid_h=6):
+                   bot_pos, player_pos, occupied_positions, grid_w=8, grid_h=6, influence=None):
     return get_final_action(bot_type, hp_player, hp_bot, mana_player, mana_bot, cd_player,
-                            bot_pos, player_pos, occupied_positions, grid_w, grid_h)
\ No newline at end of file
+                            bot_pos, player_pos, occupied_positions, grid_w, grid_h, influence)
\ No newline at end of file
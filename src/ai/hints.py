@@ -0,0 +1,209 @@
+"""Background best-command hints for the player.
+
+HintEngine searches the player's commands on a worker thread while the
+player is thinking. The root is a snapshot of the live engine; every node
+is a scratch BattleEngine restored from a BattleState, the player's MOVE
+tiles come from bfs_reachable (engine.move_targets) and each command is
+answered by the enemies' fuzzy logic through the normal enemy phase.
+
+The search deepens one player turn at a time and publishes the best
+command after every finished depth, so a hint shows up quickly and
+improves until the time budget runs out. Values are kept in the shared
+transposition table under the player's perspective key, next to the enemy
+search's entries.
+
+The live engine is only read on the calling thread (request takes the
+snapshot), so handle_event/draw never wait on the search. A new request or
+cancel() abandons the running search; its thread notices within one node
+and its result is dropped. Enemy responses use Sugeno inference: the
+Mamdani scorer shares one skfuzzy simulation object and is not safe to run
+beside the game thread.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from config import HINT_BUDGET_MS, HINT_MAX_DEPTH
+from engine.zobrist import shared_table
+
+Hint = namedtuple('Hint', 'command value depth nodes ms')
+Hint.__doc__ = """Best command found so far.
+
+Attributes:
+    command: Player command tuple, e.g. ('ATTACK', (3, 2)).
+    value: Search value in [-1, 1] from the player's point of view.
+    depth: Player turns searched.
+    nodes: Positions visited.
+    ms: Search time so far.
+"""
+
+
+class _Cancelled(Exception):
+    """Raised inside the search when it is cancelled or out of time."""
+
+
+class HintEngine:
+    """Cancellable background search for the player's best command.
+
+    Args:
+        budget_ms: Search time per position.
+        max_depth: Deepest search, in player turns.
+        inference: Fuzzy scorer for the simulated enemies.
+        table: TranspositionTable to use (default: the shared one).
+    """
+
+    def __init__(self, budget_ms=HINT_BUDGET_MS, max_depth=HINT_MAX_DEPTH, inference='sugeno',
+                 table=None):
+        self.budget_ms = budget_ms
+        self.max_depth = max_depth
+        self.inference = inference
+        self.table = table if table is not None else shared_table()
+        self._lock = threading.Lock()
+        self._key = None
+        self._hint = None
+        self._cancel = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def position_key(engine):
+        return engine.hash, engine.turn_count
+
+    def request(self, engine):
+        """Start searching `engine`'s position unless it is already searched.
+
+        Cheap to call every frame: returns at once when the position has not
+        changed since the last request.
+        """
+        key = self.position_key(engine)
+        with self._lock:
+            if key == self._key:
+                return
+            self._cancel.set()
+            self._cancel = cancel = threading.Event()
+            self._key = key
+            self._hint = None
+        state = engine.snapshot_state(with_rng=False)
+        self._thread = threading.Thread(target=self._search,
+                                        args=(key, state, engine.params, engine.grid, cancel),
+                                        name='hint-search', daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """Abandon the current search and forget its hint (does not wait)."""
+        with self._lock:
+            self._cancel.set()
+            self._key = None
+            self._hint = None
+
+    def hint_for(self, engine):
+        """Latest Hint for `engine`'s current position, or None."""
+        with self._lock:
+            return self._hint if self._key == self.position_key(engine) else None
+
+    @property
+    def busy(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    # ---------------------------------------------------------------- search
+
+    def _publish(self, key, hint):
+        with self._lock:
+            if self._key == key:
+                self._hint = hint
+
+    def _search(self, key, state, params, grid, cancel):
+        from engine.battle_engine import BattleEngine
+
+        started = time.perf_counter()
+        deadline = started + self.budget_ms / 1000.0
+        scratch = BattleEngine.from_state(state, params=params, forced_inference=self.inference, grid=grid)
+        perspective = scratch.zobrist.perspective(0)
+        self.table.new_search()
+        nodes = [0]  # per search: an abandoned thread may still be unwinding
+
+        def check():
+            nodes[0] += 1
+            if cancel.is_set() or time.perf_counter() > deadline:
+                raise _Cancelled
+            if nodes[0] % 16 == 0:
+                time.sleep(0)  # let the game thread have the GIL
+
+        def value(node, depth, ply):
+            check()
+            scratch.restore_state(node)
+            if scratch.is_over or depth == 0:
+                return self._evaluate(scratch, ply)
+            leaf = scratch.hash ^ perspective
+            entry = self.table.probe(leaf)
+            if entry is not None and entry.depth >= depth:
+                return entry.value
+            best, best_command = -2.0, None
+            for command in self._ordered(scratch, entry):
+                scratch.restore_state(node)
+                if not scratch.submit(command):
+                    continue
+                v = value(scratch.snapshot_state(with_rng=False), depth - 1, ply + 1)
+                if v > best:
+                    best, best_command = v, command
+            self.table.store(leaf, depth, best, best_command)
+            return best
+
+        root_moves = None
+        try:
+            for depth in range(1, self.max_depth + 1):
+                scored = []
+                scratch.restore_state(state)
+                for command in root_moves or self._ordered(scratch, None):
+                    scratch.restore_state(state)
+                    if not scratch.submit(command):
+                        continue
+                    scored.append((value(scratch.snapshot_state(with_rng=False), depth - 1, 1), command))
+                if not scored:
+                    return
+                # stable: equal values keep the previous depth's order
+                scored.sort(key=lambda vc: -vc[0])
+                root_moves = [c for _, c in scored]
+                best_value, best_command = scored[0]
+                self._publish(key, Hint(best_command, best_value, depth, nodes[0],
+                                        (time.perf_counter() - started) * 1000.0))
+        except _Cancelled:
+            pass
+
+    @staticmethod
+    def _commands(engine):
+        """Every command the player could give: attacks, heal, moves, end."""
+        px, py = engine.player.x, engine.player.y
+        commands = [('ATTACK', (e.x, e.y)) for e in engine.enemies
+                    if e.alive and abs(e.x - px) + abs(e.y - py) == 1]
+        p = engine.player
+        if p.hp < p.max_hp and p.mana >= engine.params['PLAYER_HEAL_COST']:
+            commands.append(('HEAL', None))
+        commands += [('MOVE', t) for t in sorted(engine.move_targets()) if t != (px, py)]
+        commands.append(('END', None))
+        return commands
+
+    def _ordered(self, engine, entry):
+        """_commands with the table's best move for this position first."""
+        commands = self._commands(engine)
+        if entry is not None and entry.move in commands:
+            commands.remove(entry.move)
+            commands.insert(0, entry.move)
+        return commands
+
+    @staticmethod
+    def _evaluate(engine, ply):
+        """Value for the player in [-1, 1]; sooner wins score higher."""
+        if engine.outcome == 'victory':
+            return 1.0 - 0.01 * ply
+        if engine.outcome == 'defeat':
+            return -1.0 + 0.01 * ply
+        if engine.outcome == 'escape':
+            return 0.0
+        p = engine.player
+        health = max(0, p.hp) / max(1, p.max_hp)
+        foes = sum(max(0, e.hp) / max(1, e.max_hp) for e in engine.enemies if e.alive)
+        foes /= max(1, len(engine.enemies))
+        if engine.stages:
+            # stages still to come count as full-health enemies
+            foes = (foes + len(engine.stages) - engine.stage_index - 1) / len(engine.stages)
+        return 0.4 * health - 0.6 * foes  # a hunt is only won by dealing damage
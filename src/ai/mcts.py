@@ -0,0 +1,277 @@
+"""Anytime Monte Carlo tree search for enemy decisions.
+
+An MCTSController plugs into BattleEngine.controllers for selected enemy
+types. For each decision it searches over the enemy's own behaviours
+(attack, heal, step or teleport) on a scratch engine restored from a
+BattleState:
+
+- the tree is open-loop: nodes are action sequences, and every iteration
+  replays the path from the root state;
+- the player is modelled by the scripted aggressive policy with a share of
+  random moves, and the other enemies act through the fuzzy scorer;
+- the fuzzy choice is the prior of every node and the rollout policy;
+- rollout results are averaged per position in the shared transposition
+  table (engine.zobrist), so positions reached again - by another action
+  order or in a later decision - reuse them instead of rolling out.
+
+Search stops at a hard wall-clock budget. The most visited root action is
+played, and node count and time are kept in `last_stats`.
+"""
+import math
+import random
+import time
+
+from config import MCTS_BUDGET_MS, MCTS_BOT_TYPES
+from ai import fuzzy_logic as fuzzy
+from engine.actions import Action
+from engine.zobrist import shared_table
+from entities.registry import ENEMY_ARCHETYPES
+
+BOT_TYPES = tuple(ENEMY_ARCHETYPES)
+# behaviours the fuzzy mapping can choose per type; the search may use the
+# same moves (plus melee, healing for heal-priority types, and waiting)
+TYPE_BEHAVIORS = {
+    t: tuple(sorted({fuzzy.map_fuzzy_score_to_behavior(score, t) for score in (0, 40, 70)}))
+    for t in BOT_TYPES
+}
+HEALERS = tuple(t for t in BOT_TYPES if fuzzy.heal_priority_check(t, 0, 100)[1])
+
+
+def controllers_for(difficulty, bot_types=MCTS_BOT_TYPES, **kwargs):
+    """BattleEngine controllers for a difficulty name ({} when None/unknown)."""
+    budget = MCTS_BUDGET_MS.get(difficulty) if difficulty else None
+    if not budget:
+        return {}
+    controller = MCTSController(budget_ms=budget, **kwargs)
+    return {t: controller for t in bot_types}
+
+
+class _Node:
+    __slots__ = ('visits', 'value', 'children')
+
+    def __init__(self):
+        self.visits = 0
+        self.value = 0.0
+        self.children = {}
+
+
+class _Cursor:
+    """Scratch-engine controller that walks the tree for one iteration."""
+
+    def __init__(self, search):
+        self.search = search
+        self.unit = None
+        self.node = None
+        self.path = []
+        self.in_tree = False
+
+    def start(self, root, unit):
+        self.unit = unit
+        self.node = root
+        self.path = [root]
+        self.in_tree = True
+
+    def decide(self, engine, e):
+        if not self.in_tree or e is not self.unit:
+            return engine.fuzzy_action(e)
+        legal = self.search.legal_actions(engine, e)
+        prior = self.search.prior_label(engine, e, legal)
+        label = self.search.select(self.node, legal, prior)
+        child = self.node.children.get(label)
+        if child is None:
+            child = self.node.children[label] = _Node()
+            self.search.nodes += 1
+            self.in_tree = False  # newly expanded: roll out from here
+        self.node = child
+        self.path.append(child)
+        return legal[label]
+
+
+class MCTSController:
+    """Enemy decider with a per-decision wall-clock budget.
+
+    Args:
+        budget_ms: Hard search time per decision.
+        rollout_turns: Turns simulated after the tree before evaluating.
+        exploration: PUCT exploration constant.
+        player_noise: Share of random player moves in the player model.
+        rollout_inference: Fuzzy scorer for rollouts ('sugeno' is fastest
+            of the real FIS scorers).
+        seed: Seed of the search's own RNG (not the run RNG).
+        table: TranspositionTable for rollout values (default: the shared
+            one).
+        reuse_visits: Rollouts a cached position needs before its mean
+            value replaces a new rollout.
+    """
+
+    def __init__(self, budget_ms=40, rollout_turns=6, exploration=1.4, player_noise=0.2,
+                 rollout_inference='sugeno', seed=0, table=None, reuse_visits=4):
+        self.budget_ms = budget_ms
+        self.rollout_turns = rollout_turns
+        self.exploration = exploration
+        self.player_noise = player_noise
+        self.rollout_inference = rollout_inference
+        self.rng = random.Random(seed)
+        self.table = table if table is not None else shared_table()
+        self.reuse_visits = reuse_visits
+        self.table_hits = 0
+        self.nodes = 0
+        self.last_stats = None
+        self.decisions = 0
+        self.total_nodes = 0
+        self.total_ms = 0.0
+
+    # ---------------------------------------------------------- action space
+
+    def legal_actions(self, engine, e):
+        """{label: Action} of the moves `e` can make right now."""
+        kind = type(e).__name__
+        pos, ppos = (e.x, e.y), (engine.player.x, engine.player.y)
+        dist = abs(pos[0] - ppos[0]) + abs(pos[1] - ppos[1])
+        occupied = engine.enemy_occupied()
+        maps = engine.influence or engine._build_influence_maps()
+        legal = {'WAIT': Action(e, 'WAIT', None)}
+        if dist <= 1:  # a stage spawn can land on the player's tile
+            legal['ATTACK'] = Action(e, 'ATTACK', ppos)
+        if kind in HEALERS and e.hp < e.max_hp and e.mana >= engine.params['ENEMY_HEAL_COST']:
+            legal['HEAL'] = Action(e, 'HEAL', None)
+        for label in TYPE_BEHAVIORS.get(kind, ()):
+            if label == 'RANGED_ATTACK':
+                if dist <= 2:
+                    legal[label] = Action(e, 'RANGED_ATTACK', ppos)
+                continue
+            if label == 'MOVE_CLOSE':
+                target = maps.step_toward(pos, occupied)
+            elif label == 'MOVE_RETREAT':
+                target = maps.step_away(pos, occupied)
+            elif label == 'TELEPORT_CLOSE':
+                target = maps.teleport_close(occupied)
+            elif label == 'TELEPORT_FAR':
+                target = maps.teleport_far(occupied)
+            else:
+                continue
+            if target is not None:
+                legal[label] = Action(e, 'TELEPORT' if label.startswith('TELEPORT') else label, target)
+        return legal
+
+    def prior_label(self, engine, e, legal):
+        """Label of `legal` matching what the fuzzy controller would do."""
+        fuzzy_choice = engine.fuzzy_action(e)
+        for label, action in legal.items():
+            if action.kind == fuzzy_choice.kind and (action.kind == 'HEAL' or action.target == fuzzy_choice.target):
+                return label
+        return 'WAIT'
+
+    def select(self, node, legal, prior):
+        """PUCT choice; unexpanded legal labels first, the prior one leading."""
+        untried = [label for label in legal if label not in node.children]
+        if untried:
+            return prior if prior in untried else untried[0]
+        share = 0.5 / len(legal)
+        sqrt_n = math.sqrt(node.visits + 1)
+        best, best_score = None, -math.inf
+        for label in legal:
+            child = node.children[label]
+            p = share + (0.5 if label == prior else 0.0)
+            score = child.value / child.visits + self.exploration * p * sqrt_n / (1 + child.visits)
+            if score > best_score:
+                best, best_score = label, score
+        return best
+
+    # ---------------------------------------------------------------- search
+
+    def _player_command(self, engine):
+        from sim.policies import aggressive
+        if self.rng.random() >= self.player_noise:
+            return aggressive(engine)
+        options = [('END', None), ('HEAL', None)]
+        options += [('MOVE', t) for t in sorted(engine.move_targets())]
+        px, py = engine.player.x, engine.player.y
+        options += [('ATTACK', (e.x, e.y)) for e in engine.enemies
+                    if e.alive and abs(e.x - px) + abs(e.y - py) == 1]
+        return self.rng.choice(options)
+
+    def _rollout(self, scratch, unit, cursor, deadline):
+        """Play on from the tree's leaf and return the value for `unit`.
+
+        The first position after the cursor leaves the tree is the leaf; its
+        running mean in the table is updated, or used directly once it has
+        `reuse_visits` rollouts behind it.
+        """
+        perspective = scratch.zobrist.perspective(scratch.enemies.index(unit) + 1)
+        leaf = None
+        turns = 0
+        while not scratch.is_over and turns < self.rollout_turns and time.perf_counter() < deadline:
+            if leaf is None and not cursor.in_tree:
+                leaf = scratch.hash ^ perspective
+                entry = self.table.probe(leaf)
+                if entry is not None and entry.depth >= self.reuse_visits:
+                    self.table_hits += 1
+                    return entry.value
+            if not scratch.submit(self._player_command(scratch)):
+                scratch.submit(('END', None))
+            turns += 1
+        value = self._evaluate(scratch, unit)
+        if leaf is not None:
+            entry = self.table.probe(leaf)
+            n = entry.depth if entry is not None else 0
+            mean = entry.value if entry is not None else 0.0
+            self.table.store(leaf, n + 1, mean + (value - mean) / (n + 1))
+        return value
+
+    @staticmethod
+    def _evaluate(engine, unit):
+        """Value for the controlled enemy in [-1, 1]."""
+        if engine.outcome in ('defeat', 'escape'):
+            return 1.0
+        if not unit.alive:
+            return -1.0
+        p = engine.player
+        player_loss = 1.0 - max(0, p.hp) / max(1, p.max_hp)
+        own_loss = 1.0 - max(0, unit.hp) / max(1, unit.max_hp)
+        return 0.5 * (player_loss - own_loss)
+
+    def decide(self, engine, e):
+        """Search from the live engine's position and return the Action to play."""
+        from engine.battle_engine import BattleEngine
+
+        started = time.perf_counter()
+        deadline = started + self.budget_ms / 1000.0
+        unit_index = engine.enemies.index(e)
+        root_state = engine.snapshot_state(with_rng=False)
+        scratch = BattleEngine.from_state(root_state, params=engine.params,
+                                          forced_inference=self.rollout_inference, grid=engine.grid)
+        cursor = _Cursor(self)
+        scratch.controllers = {type(e).__name__: cursor}
+        root = _Node()
+        self.nodes = 1
+        self.table_hits = 0
+        self.table.new_search()
+        iterations = 0
+
+        while time.perf_counter() < deadline:
+            scratch.restore_state(root_state)
+            scratch.influence = engine.influence
+            unit = scratch.enemies[unit_index]
+            cursor.start(root, unit)
+            scratch.continue_enemy_phase(unit_index)
+            value = self._rollout(scratch, unit, cursor, deadline)
+            for node in cursor.path:
+                node.visits += 1
+                node.value += value
+            iterations += 1
+
+        legal = self.legal_actions(engine, e)
+        if root.children:
+            label = max(root.children, key=lambda k: (root.children[k].visits, root.children[k].value))
+            choice = legal.get(label) or engine.fuzzy_action(e)
+        else:
+            label, choice = 'FUZZY', engine.fuzzy_action(e)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        self.last_stats = {'nodes': self.nodes, 'iterations': iterations,
+                           'ms': elapsed_ms, 'choice': label, 'table_hits': self.table_hits}
+        self.decisions += 1
+        self.total_nodes += self.nodes
+        self.total_ms += elapsed_ms
+        return choice
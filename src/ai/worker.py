@@ -0,0 +1,241 @@
+"""Enemy decisions computed off the game loop.
+
+Search (ai.mcts) and skfuzzy Mamdani scoring cost milliseconds per enemy,
+so the battle view does not run them inside a frame. AIWorker sends each
+such decision to a one-worker concurrent.futures pool and the view polls
+it once per frame:
+
+- a request is an immutable BattleState of the live engine plus the
+  phase's influence maps; the worker restores a scratch engine to it and
+  decides exactly as the live engine would;
+- only one request is in flight, because every enemy acts on the position
+  its predecessors left;
+- a decision that is not back within AI_WORKER_TIMEOUT_MS is replaced by
+  the cheap 'fallback' fuzzy scorer, so the game loop never waits.
+
+Offloaded decisions (fallbacks included) are recorded in the replay like a
+planner's choices, so a recorded run plays back exactly.
+
+A 'process' pool sidesteps the GIL. It is started with the spawn method,
+as forking the running game would copy its display and audio state; its
+process builds the fuzzy systems with the game's parameters and runs every
+scorer once before the first request. A 'thread' pool has no start-up cost
+but shares the interpreter with the frame.
+"""
+import multiprocessing
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from config import AI_WORKER_TIMEOUT_MS
+from ai import fuzzy_logic as fuzzy
+from ai.mcts import MCTSController
+
+DecisionRequest = namedtuple('DecisionRequest',
+                             'state index influence params inference grid planner fuzzy_params')
+DecisionRequest.__doc__ = """One enemy decision for the worker.
+
+Attributes:
+    state: BattleState of the live engine when the enemy's turn came.
+    index: The enemy's index in state.enemies.
+    influence: The phase's InfluenceMaps.
+    params: The engine's game params.
+    inference: The engine's forced_inference.
+    grid: The engine's grid override.
+    planner: MCTSController settings (values of PLANNER_ARGS), or None for
+        fuzzy logic.
+    fuzzy_params: fuzzy_logic.params to apply first, or None when the
+        worker already uses them.
+"""
+
+# MCTSController arguments a planner is rebuilt from in the worker
+PLANNER_ARGS = ('budget_ms', 'rollout_turns', 'exploration', 'player_noise',
+                'rollout_inference', 'reuse_visits')
+
+_Pending = namedtuple('_Pending', 'engine unit future expires')
+
+# ------------------------------------------------------------- worker side
+
+_scratch = None  # (params, inference, grid) and the scratch engine for them
+_planners = {}  # planner settings -> MCTSController
+
+
+def _warm_up(fuzzy_params=None):
+    """Pool initializer: use the game's fuzzy parameters and run every scorer once."""
+    if fuzzy_params is not None:
+        fuzzy.apply_params(fuzzy_params)
+    for method in fuzzy.SCORERS:
+        for bot_type in ('Zombie', 'Boss'):
+            fuzzy.get_action_score(bot_type, 50, 50, 50, 50, 0, method)
+
+
+def _decide(request):
+    """Pool entry point: (kind, target, stats) of the requested enemy's action."""
+    global _scratch
+    from engine.battle_engine import BattleEngine
+
+    if request.fuzzy_params is not None:
+        fuzzy.apply_params(request.fuzzy_params)
+    key = (request.params, request.inference, request.grid)
+    if _scratch is not None and _scratch[0] == key:
+        engine = _scratch[1]
+        engine.restore_state(request.state)
+    else:
+        engine = BattleEngine.from_state(request.state, params=request.params,
+                                         forced_inference=request.inference, grid=request.grid)
+        _scratch = (key, engine)
+    engine.influence = request.influence
+    e = engine.enemies[request.index]
+    if request.planner is None:
+        action = engine.fuzzy_action(e)
+        return action.kind, action.target, None
+    planner = _planners.get(request.planner)
+    if planner is None:
+        planner = _planners[request.planner] = MCTSController(**dict(zip(PLANNER_ARGS, request.planner)))
+    action = planner.decide(engine, e)
+    return action.kind, action.target, planner.last_stats
+
+# --------------------------------------------------------------- game side
+
+
+class AIWorker:
+    """Plays deferred enemy phases with expensive decisions made in a pool.
+
+    step_phase() replaces BattleEngine.step_enemy_phase in the battle view.
+    Cheap decisions (sugeno/tsukamoto scoring, batch scores, replayed
+    choices) are still made in the frame; see offloads().
+
+    Args:
+        mode: 'process' or 'thread'.
+        timeout_ms: Time a decision may take before the fallback is played.
+    """
+
+    def __init__(self, mode='process', timeout_ms=AI_WORKER_TIMEOUT_MS):
+        if mode not in ('process', 'thread'):
+            raise ValueError(f"Unknown AI worker mode: {mode!r}")
+        self.mode = mode
+        self.timeout_ms = timeout_ms
+        self._pool = None
+        self._pending = None
+        self._fuzzy_version = None  # fuzzy_logic.params_version the worker uses
+        self.decisions = 0
+        self.fallbacks = 0
+
+    def start(self):
+        """Start the pool (and warm its process) without waiting for it."""
+        if self._pool is not None:
+            return
+        if self.mode == 'thread':
+            self._pool = ThreadPoolExecutor(1, thread_name_prefix='ai-worker')
+            self._fuzzy_version = fuzzy.params_version
+            return
+        self._pool = ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn'),
+                                         initializer=_warm_up, initargs=(fuzzy.params,))
+        self._fuzzy_version = fuzzy.params_version
+        self._pool.submit(int)  # any task starts the process now, not at the first decision
+
+    def close(self):
+        """Stop the pool; a decision still running is abandoned."""
+        self._pending = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def cancel(self):
+        """Forget the decision in flight, e.g. when the battle is left."""
+        self._pending = None
+
+    @staticmethod
+    def offloads(engine, e):
+        """True if `e`'s decisions are worth sending to the worker.
+
+        The answer is the same for every enemy of a type in a battle, so a
+        type's decisions are either all recorded in the replay or none.
+        """
+        controller = engine.controllers.get(type(e).__name__)
+        if controller is not None:
+            return isinstance(controller, MCTSController)
+        return (fuzzy.SKFUZZY and not engine.batch_ai
+                and engine.forced_inference in (None, 'mamdani'))
+
+    def _request(self, engine, e):
+        controller = engine.controllers.get(type(e).__name__)
+        planner = tuple(getattr(controller, name) for name in PLANNER_ARGS) if controller else None
+        fuzzy_params = None
+        if self._fuzzy_version != fuzzy.params_version:
+            self._fuzzy_version = fuzzy.params_version
+            fuzzy_params = fuzzy.params if self.mode == 'process' else None
+        return DecisionRequest(engine.snapshot_state(with_rng=False), engine.enemies.index(e),
+                               engine.influence, engine.params, engine.forced_inference,
+                               engine.grid, planner, fuzzy_params)
+
+    def _submit(self, engine, e):
+        self.start()
+        request = self._request(engine, e)
+        try:
+            future = self._pool.submit(_decide, request)
+        except RuntimeError as ex:  # BrokenProcessPool: the process could not start or died
+            print(f"✗ AI worker unavailable ({ex}); using a thread")
+            self.close()
+            self.mode = 'thread'
+            self.start()
+            future = self._pool.submit(_decide, request)
+        expires = time.perf_counter() + self.timeout_ms / 1000.0
+        self._pending = _Pending(engine, e, future, expires)
+        return self._pending
+
+    def _collect(self, pending):
+        """`pending`'s decision as (action, stats), or None while it runs."""
+        from engine.actions import Action
+
+        if pending.future.done():
+            try:
+                kind, target, stats = pending.future.result()
+                return Action(pending.unit, kind, target), stats
+            except Exception as ex:
+                print(f"✗ AI worker decision failed: {ex!r}")
+                if self.mode == 'process':  # e.g. its process died: go on in a thread
+                    self.close()
+                    self.mode = 'thread'
+        elif time.perf_counter() < pending.expires:
+            return None
+        else:
+            print(f"✗ AI worker: no decision for {type(pending.unit).__name__} within "
+                  f"{self.timeout_ms} ms, playing the fallback")
+        self.fallbacks += 1
+        return pending.engine.fuzzy_action(pending.unit, inference='fallback'), None
+
+    def step_phase(self, engine, budget_ms=None):
+        """Play `engine`'s pending enemy phase for up to `budget_ms` milliseconds.
+
+        Like BattleEngine.step_enemy_phase, but an offloaded decision is
+        submitted and the call returns; later calls apply it once it is
+        back (or its fallback once it timed out) and go on.
+
+        Returns:
+            True once no phase is pending.
+        """
+        pending = self._pending
+        if pending is not None and (pending.engine is not engine or not engine.enemy_phase_pending):
+            self._pending = pending = None  # left over from another battle
+        if not engine.enemy_phase_pending:
+            return True
+        deadline = time.perf_counter() + budget_ms / 1000.0 if budget_ms is not None else None
+        while True:
+            if pending is not None:
+                decided = self._collect(pending)
+                if decided is None:
+                    return False
+                unit, self._pending = pending.unit, None
+                pending = None
+                self.decisions += 1
+                engine.act_enemy(unit, *decided)
+            if deadline is not None and time.perf_counter() >= deadline:
+                return not engine.enemy_phase_pending
+            e = engine.phase_enemy()
+            if e is None:
+                return True
+            if self.offloads(engine, e):
+                pending = self._submit(engine, e)
+            else:
+                engine.act_enemy(e)
@@ -1,5 +1,4 @@
 """Game configuration constants."""
-import pygame
 import os
 
 # Grid & Window
@@ -7,6 +6,7 @@ GRID_W, GRID_H = 8, 6
 TILE = 80
 WIDTH, HEIGHT = 1200, 800
 FPS = 60
+TEXT_CACHE_MAX_BYTES = 8 * 1024 * 1024  # rendered text kept by ui/text_cache.py
 
 # Map Collision Tiles (fences and stones that block movement)
 # These coordinates represent impassable terrain on the battlefield
@@ -53,6 +53,42 @@ BOSS_HP = 120
 BOSS_ATK = 40
 BOSS_MANA = 100
 
+# Enemy planning AI (ai/mcts.py): None keeps the plain fuzzy enemies
+AI_DIFFICULTY = None
+MCTS_BUDGET_MS = {'easy': 15, 'normal': 40, 'hard': 120}  # per decision
+MCTS_BOT_TYPES = ('Enderman', 'Boss')
+
+# Player hints (ai/hints.py): T toggles them in battle
+HINTS_ENABLED = False
+HINT_BUDGET_MS = 300  # search time per position
+HINT_MAX_DEPTH = 4  # player turns
+
+# Enemy phase in the battle view: played in slices of this many ms per frame
+ENEMY_PHASE_BUDGET_MS = 6
+MOVE_ANIM_MS = 150  # sprite slide to the new tile
+ATTACK_ANIM_MS = 200  # lunge toward the target and back
+
+# AI worker (ai/worker.py): search and Mamdani enemy decisions run in a
+# 'process' or 'thread' pool off the game loop; None decides them in-frame
+AI_WORKER = 'process'
+AI_WORKER_TIMEOUT_MS = 250  # then the enemy plays a cheap fallback decision
+
+# Campfire auto-resolve / fast-forward hunts (policies from sim/policies.py)
+AUTO_RESOLVE_POLICY = 'aggressive'
+AUTO_RESOLVE_MAX_TURNS = 200  # unfinished auto hunts open as a normal battle
+FAST_FORWARD_EVERY = 5  # fast-forward draws only every Nth turn
+
+# Wave battles (campfire "Wave Battle"): an open field with hundreds of enemies
+WAVE_GRID_W, WAVE_GRID_H = 32, 20
+WAVE_ENEMY_COUNT = 240
+WAVE_ENEMY_MIX = {'Zombie': 6, 'Skeleton': 3, 'Enderman': 1}  # relative share per type
+WAVE_REWARD_LEVELS = 2
+FRAME_REPORT_SECONDS = 5.0  # wave battles print frame-time percentiles this often
+
+# Fuzzy membership parameters found by run_tune.py (sim/tuner.py); the game
+# uses them when this file exists, else the defaults in ai/fuzzy_logic.py
+FUZZY_PARAMS_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'fuzzy_params.json'))
+
 # Sprite Offsets
 ZOMBIE_Y_OFFSET = 27
 SKELETON_Y_OFFSET = 27
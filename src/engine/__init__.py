@@ -0,0 +1,5 @@
+"""Headless battle engine package (no pygame imports)."""
+from engine.battle_engine import BattleEngine
+from engine.grid import bfs_reachable
+
+__all__ = ['BattleEngine', 'bfs_reachable']
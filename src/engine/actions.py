@@ -0,0 +1,20 @@
+"""Action objects: what one unit does, decided before anything changes.
+
+Player commands and enemy decisions (fuzzy logic, MCTS, replayed choices)
+are all expressed as Action tuples and applied by BattleEngine.resolve,
+the single place where damage, movement and heals happen and where their
+events - and through them the view's sounds and messages - come from.
+"""
+from collections import namedtuple
+
+Action = namedtuple('Action', 'actor kind target')
+Action.__doc__ = """One unit's action.
+
+Attributes:
+    actor: The acting unit (the player or an enemy).
+    kind: One of PLAYER_ACTIONS or ENEMY_ACTIONS.
+    target: (x, y) tile for moves and attacks, else None.
+"""
+
+PLAYER_ACTIONS = ('MOVE', 'ATTACK', 'HEAL', 'END')
+ENEMY_ACTIONS = ('WAIT', 'ATTACK', 'RANGED_ATTACK', 'MOVE_CLOSE', 'MOVE_RETREAT', 'TELEPORT', 'HEAL')
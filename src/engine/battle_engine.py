@@ -0,0 +1,659 @@
+"""Headless turn-based battle rules, independent of pygame.
+
+The engine owns the grid, the units and the turn loop. Player actions are
+passed in as command tuples and everything that happens is reported as event
+dicts, which a view (TurnBasedGrid) or a simulator can consume.
+
+Commands:
+    ('MOVE', (x, y))    move the player to a reachable tile
+    ('ATTACK', (x, y))  melee an adjacent enemy
+    ('HEAL', None)      spend mana to heal
+    ('END', None)       end the player turn without acting
+
+Commands and enemy decisions both become engine.actions.Action objects and
+are applied by BattleEngine.resolve; each enemy decides once per turn.
+With `defer_enemy_phase` set, ending the player turn only prepares the
+enemy phase and the caller plays it in slices with step_enemy_phase().
+
+Living units are indexed by tile (`_tiles`), so unit_at and the enemies'
+occupancy checks stay O(1) with hundreds of units on the field.
+"""
+import time
+
+import numpy as np
+
+from config import GRID_W, GRID_H, MAP_BLOCKED_TILES
+from entities.player import Player
+from entities.registry import spawn_enemy
+from entities.store import EntityStore, HP, MAX_HP, MANA, ALIVE, KIND
+from ai import fuzzy_logic as fuzzy
+from ai.influence_maps import InfluenceMaps
+from engine.actions import Action, PLAYER_ACTIONS
+from engine.grid import bfs_reachable, find_player_spawn, find_enemy_spawn
+from engine.params import game_params
+from engine.state import BattleState
+from engine.zobrist import zobrist_keys
+
+
+class BattleEngine:
+    """Grid state, units and turn logic for one battle.
+
+    `run` is the object that keeps progress across battles (ScreenManager in
+    the game). It must expose `player_stats`, `total_run_turns`,
+    `miniboss_defeated`, `level_up(amount)` and `update_player_state(hp, mana)`.
+    Gameplay numbers come from `params` (see engine.params), defaulting to
+    `run.params` and then to config.py. `forced_inference` picks the fuzzy
+    scorer ('mamdani', 'sugeno', 'tsukamoto' or 'fallback').
+
+    `grid` = (width, height) plays on an open field of that size instead of
+    the fenced GRID_W x GRID_H map. With `batch_ai` all fuzzy-controlled
+    enemies are scored in one ai.fuzzy_batch call at the start of each
+    enemy phase (see _batch_scores), which is what keeps wave battles with
+    hundreds of enemies fast.
+    """
+
+    def __init__(self, run, enemies: list[dict] = None, stages: list[str] = None,
+                 forced_inference=None, reward_levels=0, is_miniboss=False, params=None,
+                 controllers=None, grid=None, batch_ai=False):
+        self.run = run
+        # optional per-type enemy deciders, e.g. {'Boss': MCTSController(...)}
+        self.controllers = dict(controllers or {})
+        self.replay = getattr(run, 'replay', None)  # recorder, see engine.replay
+        if params is None:
+            params = getattr(run, 'params', None) or game_params()
+        self.params = params
+        self.reward_levels = reward_levels
+        self.is_miniboss = is_miniboss
+        self.forced_inference = forced_inference
+
+        self.batch_ai = batch_ai
+        # leave the enemy phase to step_enemy_phase() (set by the game view)
+        self.defer_enemy_phase = False
+        self._phase_next = None  # index of the next enemy to act while a phase is pending
+        self._scores = {}  # id(enemy) -> fuzzy score for this phase (batch_ai)
+
+        self.grid = tuple(grid) if grid is not None else None
+        if self.grid is None:
+            self.grid_w, self.grid_h = GRID_W, GRID_H
+            self.blocked_tiles = MAP_BLOCKED_TILES
+        else:
+            self.grid_w, self.grid_h = self.grid
+            self.blocked_tiles = frozenset()  # the fences belong to the 8x6 map art
+        self.zobrist = zobrist_keys(self.grid_w)
+        # unit attributes as parallel arrays, see entities.store
+        self.store = EntityStore()
+
+        player_x, player_y = find_player_spawn(self.grid_w, self.grid_h, self.blocked_tiles)
+        # player - use persistent stats from the run
+        self.player = Player(player_x, player_y, stats=self.run.player_stats, store=self.store)
+
+        # boss damage boost
+        if stages and 'Boss' in stages:
+            self.player.atk += 5  # boost +5 ATK for boss fight
+        self.is_boss_fight = bool(stages and 'Boss' in stages)
+
+        # support either simultaneous enemies or sequential stages
+        self.stages = stages
+        self.stage_index = 0
+
+        self.events = []
+        self.enemies = []
+        if stages and len(stages) > 0:
+            # start with first stage as a single enemy
+            ex, ey = self._find_valid_enemy_spawn()
+            self.enemies.append(self._make_enemy(stages[0], ex, ey))
+        else:
+            for e in enemies or []:
+                ex = e.get('x', self.grid_w-2)
+                ey = e.get('y', self.grid_h//2)
+                # Validate spawn position against blocked tiles
+                if (ex, ey) in self.blocked_tiles:
+                    ex, ey = self._find_valid_enemy_spawn()
+                self.enemies.append(self._make_enemy(e.get('type'), ex, ey))
+
+        self.turn = 'PLAYER'
+        self.move_range = 2
+        self.turn_count = 0  # track turn number for current battle
+        self.outcome = None  # 'victory', 'defeat' or 'escape' once finished
+        self.influence = None
+        self._set_units()
+
+        # Use fuzzy logic module (already imported at module level)
+        self.fuzzy = fuzzy
+
+        for e in self.enemies:
+            self._emit('spawn', unit=e)
+        if self.replay is not None:
+            self.replay.checkpoint(self)
+
+    # ------------------------------------------------------------------ setup
+
+    def _make_enemy(self, etype, x, y):
+        """Construct an enemy unit from its type name, using self.params stats."""
+        return spawn_enemy(etype, x, y, self.params, self.store)
+
+    def _set_units(self):
+        """Rebuild `units` (player first) and recompute the position hash."""
+        self.units = [self.player] + self.enemies
+        self._rows = np.array([u._row for u in self.units], dtype=np.intp)
+        self._enemy_rows = self._rows[1:]
+        self._slots = {id(u): slot for slot, u in enumerate(self.units)}
+        # tile -> living unit; on a shared tile the lowest slot wins, like store.find
+        self._tiles = {}
+        living = 0
+        for u in reversed(self.units):
+            if u.alive:
+                self._tiles[(u.x, u.y)] = u
+                living += 1
+        self._stacked = len(self._tiles) < living  # spawns may share a tile
+        self.hash = self.zobrist.position(self.units, self.turn, self.turn_count, self.stage_index)
+
+    # ------------------------------------------------------------- occupancy
+    # Every move or death calls _retile, so `_tiles` always matches the store.
+
+    def _retile(self, unit, old):
+        """Update `_tiles` after `unit` left tile `old` (moved or died)."""
+        if self._tiles.get(old) is unit:
+            del self._tiles[old]
+            if self._stacked:
+                index = self.store.find(self._rows, *old)  # another unit on the same tile
+                if index >= 0:
+                    self._tiles[old] = self.units[index]
+        if unit.alive:
+            pos = (unit.x, unit.y)
+            other = self._tiles.get(pos)
+            if other is None:
+                self._tiles[pos] = unit
+            else:
+                self._stacked = True
+                if self._slots[id(unit)] < self._slots[id(other)]:
+                    self._tiles[pos] = unit
+
+    # ---------------------------------------------------------------- hashing
+    # Every unit change goes through _unit_key (before) and _rehash (after),
+    # so `self.hash` stays equal to a full recompute at O(1) per change.
+
+    def _unit_key(self, unit):
+        return self.zobrist.unit(self._slots[id(unit)], unit)
+
+    def _rehash(self, unit, before):
+        self.hash ^= before ^ self.zobrist.unit(self._slots[id(unit)], unit)
+
+    def _set_turn(self, turn):
+        self.hash ^= self.zobrist.side(self.turn) ^ self.zobrist.side(turn)
+        self.turn = turn
+
+    def _set_turn_count(self, turn_count):
+        self.hash ^= self.zobrist.turn_count(self.turn_count) ^ self.zobrist.turn_count(turn_count)
+        self.turn_count = turn_count
+
+    def _find_valid_enemy_spawn(self):
+        return find_enemy_spawn(self.grid_w, self.grid_h, self.blocked_tiles)
+
+    @classmethod
+    def from_state(cls, state, params=None, forced_inference=None, grid=None):
+        """Scratch engine for lookahead, positioned at `state`.
+
+        It runs on a private RunState and records nothing, so it can be
+        restored and stepped any number of times (see restore_state).
+        `grid` is the live engine's `grid`.
+        """
+        from engine.run_state import RunState
+        if state.stages:
+            engine = cls(RunState(), stages=list(state.stages), params=params,
+                         forced_inference=forced_inference, grid=grid)
+        else:
+            enemies = [{'type': u.kind, 'x': u.x, 'y': u.y} for u in state.enemies]
+            engine = cls(RunState(), enemies=enemies, params=params,
+                         forced_inference=forced_inference, grid=grid)
+        engine.replay = None
+        engine.restore_state(state)
+        return engine
+
+    # ---------------------------------------------------------------- snapshots
+
+    def snapshot_state(self, with_rng=True):
+        """Immutable BattleState of the current position (see engine.state).
+
+        Battles draw no random numbers, so lookahead can pass
+        with_rng=False to skip copying the run RNG state.
+        """
+        rng = getattr(self.run, 'rng', None) if with_rng else None
+        return BattleState(
+            self.store.unit_states(self._rows), self.turn, self.turn_count, self.stage_index,
+            self.stages, self.outcome, self.run.total_run_turns, self.run.player_stats['level'],
+            rng.getstate() if rng is not None else None)
+
+    def restore_state(self, state):
+        """Put the engine (and its run's counters/RNG) back at `state`.
+
+        Unit objects are reused when the enemy kinds match, so restoring in
+        a search loop does not allocate; otherwise the old enemies' store
+        rows are recycled.
+        """
+        kinds = [u.kind for u in state.enemies]
+        if kinds != [type(e).__name__ for e in self.enemies]:
+            for e in self.enemies:
+                self.store.release(e)
+            self.enemies = [self._make_enemy(u.kind, u.x, u.y) for u in state.enemies]
+            self._set_units()
+        self.store.load_states(self._rows, state.units)
+
+        self.turn = state.turn
+        self.turn_count = state.turn_count
+        self.stage_index = state.stage_index
+        self.stages = list(state.stages) if state.stages is not None else None
+        self.is_boss_fight = bool(self.stages and 'Boss' in self.stages)
+        self.outcome = state.outcome
+        self.influence = None
+        self._phase_next = None
+        self.events = []
+        self.run.total_run_turns = state.total_run_turns
+        self.run.player_stats['level'] = state.player_level
+        rng = getattr(self.run, 'rng', None)
+        if rng is not None and state.rng_state is not None:
+            rng.setstate(state.rng_state)
+        self._set_units()
+
+    # ----------------------------------------------------------------- events
+
+    def _emit(self, etype, message=None, **data):
+        event = {'type': etype, 'message': message}
+        event.update(data)
+        self.events.append(event)
+        if self.replay is not None:
+            self.replay.event(event)
+        return event
+
+    def drain_events(self):
+        """Return and clear all events emitted since the last call."""
+        events, self.events = self.events, []
+        return events
+
+    # ---------------------------------------------------------------- queries
+
+    @property
+    def is_over(self):
+        return self.outcome is not None
+
+    def unit_at(self, pos):
+        return self._tiles.get(tuple(pos))
+
+    def move_targets(self):
+        """Tiles the player can move to this turn."""
+        return bfs_reachable((self.player.x, self.player.y), self.move_range,
+                             set(self.store.positions(self._enemy_rows)),
+                             self.grid_w, self.grid_h, self.blocked_tiles)
+
+    # --------------------------------------------------------------- commands
+
+    def submit(self, command):
+        """Apply a player command tuple. Returns True if it was accepted."""
+        kind, target = command
+        if kind not in PLAYER_ACTIONS:
+            raise ValueError(f"Unknown command: {kind}")
+        if self.replay is not None and not self.is_over:
+            self.replay.command(command)
+        return self.resolve(Action(self.player, kind, target))
+
+    # ------------------------------------------------------------- resolution
+
+    def resolve(self, action):
+        """Apply one Action and emit its events. Returns True if accepted.
+
+        Every player command and every enemy decision ends up here, so each
+        effect has exactly one code path.
+        """
+        if action.actor is self.player:
+            return self._PLAYER_RESOLVERS[action.kind](self, action)
+        return self._ENEMY_RESOLVERS.get(action.kind, BattleEngine._enemy_wait)(self, action)
+
+    def _player_move(self, action):
+        if self.turn != 'PLAYER' or self.is_over:
+            return False
+        cx, cy = action.target
+        if (cx, cy) in self.move_targets() and self.unit_at((cx, cy)) is None:
+            before = self._unit_key(self.player)
+            old = (self.player.x, self.player.y)
+            self.player.x, self.player.y = cx, cy
+            self._retile(self.player, old)
+            self._rehash(self.player, before)
+            self._emit('player_move', f'Player moved to {cx},{cy}.', pos=(cx, cy), from_pos=old)
+            self.end_turn()
+            return True
+        self._emit('invalid', 'Lokasi tidak valid untuk MOVE.', command='MOVE')
+        return False
+
+    def _player_attack(self, action):
+        if self.turn != 'PLAYER' or self.is_over:
+            return False
+        cx, cy = action.target
+        target = self.unit_at((cx, cy))
+        if target and target.team != 'PLAYER' and abs(self.player.x-cx)+abs(self.player.y-cy) == 1:
+            damage = self.player.atk
+            before = self._unit_key(target)
+            target.take_damage(damage)
+            if target.hp <= 0:
+                target.alive = False
+                self._retile(target, (cx, cy))
+                # increment player damage on enemy defeat
+                player_before = self._unit_key(self.player)
+                self.player.atk += 1
+                self._rehash(self.player, player_before)
+                message = f'Enemy {type(target).__name__} defeated. ATK +1 (now {self.player.atk}).'
+            else:
+                message = f'Attack! Enemy HP: {max(0,target.hp)}.'
+            self._rehash(target, before)
+            self._emit('player_attack', message, target=target, damage=damage,
+                       defeated=not target.alive)
+            self.end_turn()
+            return True
+        self._emit('invalid', 'Target tidak valid untuk ATTACK.', command='ATTACK')
+        return False
+
+    def _player_heal(self, action):
+        if self.turn != 'PLAYER' or self.is_over:
+            return False
+        old_hp = self.player.hp
+        before = self._unit_key(self.player)
+        if self.player.heal(self.params['PLAYER_HEAL_AMOUNT'], self.params['PLAYER_HEAL_COST']):
+            healed = self.player.hp - old_hp
+            self._rehash(self.player, before)
+            self._emit('player_heal',
+                       f'Player healed +{healed} HP. HP: {self.player.hp}/{self.player.max_hp}. Mana: {self.player.mana}.',
+                       amount=healed)
+            self.end_turn()
+            return True
+        self._emit('invalid', f'Not enough Mana! Need {self.params["PLAYER_HEAL_COST"]}, have {self.player.mana}.',
+                   command='HEAL')
+        return False
+
+    def _player_end(self, action):
+        return self.end_turn()
+
+    def _enemy_attack(self, action):
+        e = action.actor
+        if abs(e.x - self.player.x) + abs(e.y - self.player.y) > 2:
+            return False
+        before = self._unit_key(self.player)
+        self.player.hp -= e.atk
+        self._rehash(self.player, before)
+        self._emit('enemy_attack', unit=e, action=action.kind, damage=e.atk)
+        return True
+
+    def _enemy_move(self, action):
+        e, target = action.actor, action.target
+        if not target or target in self.enemy_occupied() or target in self.blocked_tiles:
+            return False
+        before = self._unit_key(e)
+        old = (e.x, e.y)
+        e.x, e.y = target
+        self._retile(e, old)
+        self._rehash(e, before)
+        self._emit('enemy_move', unit=e, action=action.kind, pos=target, from_pos=old)
+        return True
+
+    def _enemy_heal(self, action):
+        # STEP 3.2: Enemy Heal with Mana cost check
+        e = action.actor
+        heal_cost = self.params['ENEMY_HEAL_COST']
+        if e.mana < heal_cost:
+            return False
+        heal_amount = self.params['ENEMY_HEAL_AMOUNT']
+        before = self._unit_key(e)
+        e.hp = min(e.max_hp, e.hp + heal_amount)
+        e.mana -= heal_cost
+        self._rehash(e, before)
+        self._emit('enemy_heal', unit=e, amount=heal_amount)
+        return True
+
+    def _enemy_wait(self, action):
+        return True
+
+    _PLAYER_RESOLVERS = {'MOVE': _player_move, 'ATTACK': _player_attack,
+                         'HEAL': _player_heal, 'END': _player_end}
+    _ENEMY_RESOLVERS = {'ATTACK': _enemy_attack, 'RANGED_ATTACK': _enemy_attack,
+                        'MOVE_CLOSE': _enemy_move, 'MOVE_RETREAT': _enemy_move,
+                        'TELEPORT': _enemy_move, 'HEAL': _enemy_heal}
+
+    # ------------------------------------------------------------- turn logic
+
+    def end_turn(self):
+        if self.turn != 'PLAYER' or self.is_over:
+            return False
+        self._set_turn('ENEMY')
+        self._set_turn_count(self.turn_count + 1)  # increment local turn counter
+        self.run.total_run_turns += 1  # increment global turn counter
+        self._emit('turn_end', 'Giliran ENEMY.', turn_count=self.turn_count)
+
+        # auto-win for Enderman at escape turn threshold
+        escape_turn = self.params['ENDERMAN_ESCAPE_TURN']
+        if self.turn_count >= escape_turn and self.stages and any(type(e).__name__ == 'Enderman' for e in self.enemies if e.alive):
+            for e in self.enemies:
+                if type(e).__name__ == 'Enderman':
+                    before = self._unit_key(e)
+                    e.alive = False
+                    self._retile(e, (e.x, e.y))
+                    self._rehash(e, before)
+            self._finish('escape', f'Turn {escape_turn} reached! Enderman auto-defeated!')
+            if self.replay is not None:
+                self.replay.checkpoint(self)
+            return True
+
+        if self.defer_enemy_phase:
+            self._phase_next = -1  # step_enemy_phase() prepares and plays it
+            return True
+        self._begin_enemy_phase()
+        self.continue_enemy_phase()
+        return True
+
+    def _begin_enemy_phase(self):
+        # influence maps are shared by every enemy acting this phase
+        self.influence = self._build_influence_maps()
+        if self.batch_ai:
+            self._scores = self._batch_scores()
+
+    @property
+    def enemy_phase_pending(self):
+        """True while a deferred enemy phase still has enemies to play."""
+        return self._phase_next is not None
+
+    def step_enemy_phase(self, budget_ms=None):
+        """Play the pending enemy phase for up to `budget_ms` milliseconds.
+
+        The first call builds the phase's influence maps (and batch scores);
+        then enemies act in order until the budget is used. Every call makes
+        progress and no enemy is interrupted; after the last one the turn is
+        resolved. The result is the same as playing the whole phase at once.
+
+        Returns:
+            True once no phase is pending.
+        """
+        if self._phase_next is None:
+            return True
+        deadline = time.perf_counter() + budget_ms / 1000.0 if budget_ms is not None else None
+        progressed = self._phase_next < 0
+        while True:
+            e = self.phase_enemy()
+            if e is None:
+                return True
+            if progressed and deadline is not None and time.perf_counter() >= deadline:
+                return False
+            self.act_enemy(e)
+            progressed = True
+
+    def phase_enemy(self):
+        """The enemy whose turn it is in the pending phase.
+
+        The first call of a phase prepares it (see step_enemy_phase). When
+        every enemy has acted the turn is resolved and None is returned.
+        """
+        i = self._phase_next
+        if i is None:
+            return None
+        if i < 0:
+            self._begin_enemy_phase()
+            i = 0
+        enemies = self.enemies
+        while i < len(enemies) and not enemies[i].alive:
+            i += 1
+        if i < len(enemies):
+            self._phase_next = i
+            return enemies[i]
+        self._phase_next = None
+        self._scores = {}
+        self._resolve_turn()
+        if self.replay is not None:
+            self.replay.checkpoint(self)
+        return None
+
+    def act_enemy(self, e, action=None, stats=None):
+        """Resolve the turn of `e`, the current phase_enemy().
+
+        Without `action` the enemy decides here (enemy_action). An `action`
+        decided elsewhere, e.g. by ai.worker, is kept in the replay like a
+        planner's choice, and `stats` of its search become an 'enemy_plan'
+        event.
+        """
+        if action is None:
+            self.enemy_action(e)
+        else:
+            if self.replay is not None:
+                self.replay.decision(type(e).__name__, action.kind, action.target)
+            if stats is not None:
+                self._emit('enemy_plan', unit=e, action=action.kind, **stats)
+            self.resolve(action)
+        self._phase_next += 1
+        if self.player.hp <= 0:
+            self._phase_next = len(self.enemies)
+
+    def continue_enemy_phase(self, start=0):
+        """Let the enemies from index `start` act in order, then resolve the turn.
+
+        end_turn starts at 0; lookahead resumes a phase part-way through.
+        """
+        self._phase_next = start
+        self.step_enemy_phase()
+
+    def _resolve_turn(self):
+        """Check defeat/victory after the enemy phase, advance stages."""
+        if self.player.hp <= 0:
+            # Sync the death state (HP <= 0) so EndMenu knows we died
+            self.run.update_player_state(self.player.hp, self.player.mana)
+            self._finish('defeat', 'Player defeated.')
+            return
+        if not self.store.any_alive(self._enemy_rows):
+            # if sequential stages were provided, advance to next stage
+            if self.stages and self.stage_index < len(self.stages) - 1:
+                self._advance_stage()
+                return
+            # All stages complete - victory!
+            self.run.total_run_turns -= 1  # Refund the killing blow turn
+            self.run.update_player_state(self.player.hp, self.player.mana)
+            self.run.level_up(self.reward_levels)
+            if self.is_miniboss:
+                self.run.miniboss_defeated = True
+            self._finish('victory', 'Victory!')
+            return
+        # back to player
+        self._set_turn('PLAYER')
+        self._emit('player_turn', 'Giliran PLAYER. Tekan M untuk move, A untuk attack, E untuk end turn.')
+
+    def _advance_stage(self):
+        self.stage_index += 1
+        # spawn next single enemy at valid position
+        ex, ey = self._find_valid_enemy_spawn()
+        # the defeated enemies' rows are reused (they keep their values, see EntityStore.release)
+        for e in self.enemies:
+            self.store.release(e)
+        self.enemies = [self._make_enemy(self.stages[self.stage_index], ex, ey)]
+        # Player HP persists between stages (no auto-heal)
+        self.turn = 'PLAYER'
+        # update self.units to include new enemy (fix for unit_at check)
+        self._set_units()
+        self._emit('stage_advance',
+                   f'Stage {self.stage_index+1}: {type(self.enemies[0]).__name__}. ATK={self.player.atk}. M:move A:attack H:heal',
+                   stage_index=self.stage_index, enemies=self.enemies)
+        for e in self.enemies:
+            self._emit('spawn', unit=e)
+
+    def _finish(self, outcome, message):
+        self.outcome = outcome
+        if self.replay is not None:
+            self.replay.result(outcome, self.turn_count, self.run.total_run_turns,
+                               self.player.hp, self.player.mana)
+        self._emit(outcome, message)
+
+    def _build_influence_maps(self):
+        """Build the per-turn threat/ally/safety maps for the enemy phase."""
+        allies = self.store.positions(self._enemy_rows)
+        return InfluenceMaps((self.player.x, self.player.y), allies, self.grid_w, self.grid_h,
+                             self.blocked_tiles)
+
+    def enemy_occupied(self):
+        """Tiles enemies may not move onto: living enemies and the player.
+
+        This is the live tile index, only test membership with it.
+        """
+        return self._tiles
+
+    def _batch_scores(self):
+        """Fuzzy score of every living enemy, from one fuzzy_batch call.
+
+        Every enemy is scored on the state at the start of the phase; the
+        scalar path scores each one after the previous enemies have acted.
+
+        Returns:
+            Dict {id(enemy): score}.
+        """
+        from ai.fuzzy_batch import batch_action_scores
+        rows = self._enemy_rows
+        d = self.store.data[rows]
+        living = np.flatnonzero(d[:, ALIVE])
+        if not len(living):
+            return {}
+        d = d[living]
+        n = len(living)
+        p = self.player
+        kinds = EntityStore.kinds
+        uses_mana = [self.fuzzy.uses_mana(kinds[k]) for k in d[:, KIND].tolist()]
+        hp_b = np.trunc(100 * d[:, HP] / np.maximum(1, d[:, MAX_HP]))
+        scores = batch_action_scores(uses_mana, np.full(n, int(100 * p.hp / max(1, p.max_hp))), hp_b,
+                                     np.full(n, int(p.mana)), d[:, MANA], np.zeros(n), self.forced_inference)
+        return {id(self.enemies[i]): s for i, s in zip(living.tolist(), scores.tolist())}
+
+    def enemy_action(self, e):
+        """Decide and resolve one enemy's action."""
+        self.resolve(self.decide_enemy_action(e))
+
+    def decide_enemy_action(self, e):
+        """Action for `e`, from its type's controller or fuzzy logic."""
+        controller = self.controllers.get(type(e).__name__)
+        if controller is None:
+            return self.fuzzy_action(e)
+        action = controller.decide(self, e)
+        if self.replay is not None:
+            # planners are not deterministic (time budgets): keep their choices
+            self.replay.decision(type(e).__name__, action.kind, action.target)
+        stats = getattr(controller, 'last_stats', None)
+        if stats is not None:
+            self._emit('enemy_plan', unit=e, action=action.kind, **stats)
+        return action
+
+    def fuzzy_action(self, e, inference=None):
+        # simple enemy action using fuzzy.get_final_action when available;
+        # `inference` overrides forced_inference for this one decision
+        occupied = self.enemy_occupied()
+        hp_p = int(100 * self.player.hp / max(1, self.player.max_hp))
+        hp_b = int(100 * e.hp / max(1, e.max_hp))
+        mana_p = int(self.player.mana)
+        mana_b = int(e.mana)
+        cd_p = 0
+        if self.fuzzy:
+            try:
+                action, target = self.fuzzy.get_final_action(type(e).__name__, hp_p, hp_b, mana_p, mana_b, cd_p, (e.x, e.y), (self.player.x, self.player.y), occupied, self.grid_w, self.grid_h, influence=self.influence, inference=inference or self.forced_inference, score=self._scores.get(id(e)))
+            except Exception:
+                action, target = ('MOVE_CLOSE', None)
+        else:
+            action, target = ('MOVE_CLOSE', None)
+        return Action(e, action, target)
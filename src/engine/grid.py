@@ -0,0 +1,78 @@
+"""Grid helpers shared by the battle engine and the scenes (no pygame)."""
+from collections import deque
+
+
+def bfs_reachable(start, max_dist, obstacles, grid_w=8, grid_h=6, blocked_tiles=None):
+    """Find all grid positions reachable within max_dist steps using BFS.
+    
+    Args:
+        start: tuple (x, y) starting position
+        max_dist: maximum distance/steps allowed
+        obstacles: set of (x, y) positions that block movement (e.g., other units)
+        grid_w: grid width
+        grid_h: grid height
+        blocked_tiles: set of (x, y) map tiles that are impassable (fences, stones)
+        
+    Returns:
+        set of (x, y) positions reachable from start
+    """
+    # Import here to avoid circular import
+    from config import MAP_BLOCKED_TILES
+    
+    # Use provided blocked_tiles or default to config
+    if blocked_tiles is None:
+        blocked_tiles = MAP_BLOCKED_TILES
+    
+    q = deque()
+    q.append((start, 0))
+    visited = {start}
+    results = set()
+    while q:
+        (x, y), d = q.popleft()
+        if d > max_dist:
+            continue
+        results.add((x, y))
+        for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < grid_w and 0 <= ny < grid_h):
+                continue
+            if (nx, ny) in visited:
+                continue
+            if (nx, ny) in obstacles:
+                continue
+            if (nx, ny) in blocked_tiles:
+                continue
+            visited.add((nx, ny))
+            q.append(((nx, ny), d+1))
+    return results
+
+
+def find_player_spawn(grid_w, grid_h, blocked_tiles):
+    """Return the player spawn tile, avoiding blocked tiles."""
+    player_x, player_y = 1, grid_h // 2
+    if (player_x, player_y) in blocked_tiles:
+        # Find nearest valid position
+        for px in range(grid_w):
+            for py in range(grid_h):
+                if (px, py) not in blocked_tiles:
+                    return px, py
+    return player_x, player_y
+
+
+def find_enemy_spawn(grid_w, grid_h, blocked_tiles):
+    """Find a valid spawn position for enemies (avoiding blocked tiles)."""
+    # Try default position first (right side of grid)
+    preferred_x = grid_w - 2
+    preferred_y = grid_h // 2
+    
+    if (preferred_x, preferred_y) not in blocked_tiles:
+        return preferred_x, preferred_y
+    
+    # Search for valid position from right side of grid
+    for x in range(grid_w - 1, -1, -1):
+        for y in range(grid_h):
+            if (x, y) not in blocked_tiles:
+                return x, y
+    
+    # Fallback to center if all else fails
+    return grid_w // 2, grid_h // 2
@@ -0,0 +1,49 @@
+"""Tunable gameplay numbers with per-run overrides.
+
+The defaults are read from config.py; simulations pass overrides such as
+{'ZOMBIE_ATK': 7} instead of editing the module.
+"""
+import config
+
+TUNABLE_PARAMS = (
+    'PLAYER_MAX_HP', 'PLAYER_ATK', 'PLAYER_MANA',
+    'PLAYER_HEAL_AMOUNT', 'PLAYER_HEAL_COST',
+    'ENEMY_HEAL_COST', 'ENEMY_HEAL_AMOUNT',
+    'ZOMBIE_HP', 'ZOMBIE_ATK', 'ZOMBIE_MANA',
+    'SKELETON_HP', 'SKELETON_ATK', 'SKELETON_MANA',
+    'ENDERMAN_HP', 'ENDERMAN_ATK', 'ENDERMAN_MANA', 'ENDERMAN_ESCAPE_TURN',
+    'BOSS_HP', 'BOSS_ATK', 'BOSS_MANA',
+)
+
+
+def game_params(overrides=None):
+    """Return a dict of all tunable params, with `overrides` applied.
+
+    Args:
+        overrides: Optional dict of {name: value}.
+
+    Returns:
+        Dict of {name: value} for every name in TUNABLE_PARAMS.
+
+    Raises:
+        KeyError: If an override names an unknown parameter.
+    """
+    params = {name: getattr(config, name) for name in TUNABLE_PARAMS}
+    for name, value in (overrides or {}).items():
+        if name not in params:
+            raise KeyError(f"Unknown game parameter: {name}")
+        params[name] = value
+    return params
+
+
+def default_player_stats(params=None):
+    """Starting player stats for a new run."""
+    params = params or game_params()
+    return {
+        'level': 1,
+        'hp': params['PLAYER_MAX_HP'],
+        'max_hp': params['PLAYER_MAX_HP'],
+        'atk': params['PLAYER_ATK'],
+        'mana': params['PLAYER_MANA'],
+        'max_mana': params['PLAYER_MANA']
+    }
@@ -0,0 +1,256 @@
+"""Seeded run randomness and replay logs (no pygame).
+
+Every random decision of a run goes through RunRandom, which is seeded once
+per run and reports each draw to the run's ReplayLog. Together with the
+recorded player commands this is enough to play a run again bit for bit:
+
+    run = RunState(seed=1234)        # run.rng / run.replay
+    ...play...
+    run.replay.save('run.json')
+    replay_headless(ReplayLog.load('run.json'))   # raises ReplayMismatch on drift
+"""
+import json
+import random
+
+from ai import fuzzy_logic
+from engine.actions import Action
+
+REPLAY_VERSION = 1
+
+
+class ReplayMismatch(Exception):
+    """A replayed run diverged from its recording."""
+
+
+def current_fuzzy_params():
+    """Copy of fuzzy_logic.params to record, or None while they are the defaults."""
+    if not fuzzy_logic.params_version:
+        return None
+    return {k: list(v) for k, v in fuzzy_logic.params.items()}
+
+
+class RunRandom(random.Random):
+    """random.Random that records every draw into a ReplayLog.
+
+    The draw sequence is the plain random.Random one for the same seed, so
+    seeded code keeps producing the same values as before.
+    """
+
+    def __init__(self, seed, log=None):
+        self.log = None
+        super().__init__(seed)
+        self.log = log
+
+    def _record(self, method, value):
+        if self.log is not None:
+            self.log.draw(method, value)
+        return value
+
+    def shuffle(self, x):
+        super().shuffle(x)
+        self._record('shuffle', list(x))
+
+    def choice(self, seq):
+        return self._record('choice', super().choice(seq))
+
+    def randint(self, a, b):
+        return self._record('randint', super().randint(a, b))
+
+    # random() is deliberately not wrapped: overriding it makes
+    # random.Random switch its shuffle/choice algorithm for the subclass.
+
+
+class ReplayLog:
+    """Ordered record of one run: battles, player commands, draws, results.
+
+    Records are small lists so the log serializes to compact JSON:
+        ['battle', kind, spec]
+        ['cmd', command, target]
+        ['rng', method, value]
+        ['end', outcome, turn_count, total_run_turns, hp, mana]
+        ['ai', enemy_kind, action, target]   (enemy controller decisions)
+
+    Enemy scoring also depends on `fuzzy_params`, the fuzzy_logic.params of
+    the run (None for the defaults), and `inference`, the scorer forced on
+    every battle (None for none); play_log() applies both.
+    """
+
+    def __init__(self, seed, overrides=None, records=None, fuzzy_params=None, inference=None):
+        self.seed = seed
+        self.overrides = dict(overrides or {})
+        self.records = records if records is not None else []
+        self.fuzzy_params = fuzzy_params
+        self.inference = inference
+        self.saved_path = None
+
+    # --------------------------------------------------------------- recording
+
+    def battle(self, kind, spec):
+        self.records.append(['battle', kind, dict(spec)])
+
+    def command(self, command):
+        kind, target = command
+        self.records.append(['cmd', kind, list(target) if target is not None else None])
+
+    def draw(self, method, value):
+        self.records.append(['rng', method, value])
+
+    def decision(self, kind, action, target):
+        self.records.append(['ai', kind, action, list(target) if target is not None else None])
+
+    def result(self, outcome, turn_count, total_run_turns, hp, mana):
+        self.records.append(['end', outcome, turn_count, total_run_turns, hp, mana])
+
+    def event(self, event):
+        """Engine events are derived from the commands; not stored here."""
+
+    def checkpoint(self, engine):
+        """Called by BattleEngine at battle start and after every turn."""
+
+    # ----------------------------------------------------------------- reading
+
+    def apply_fuzzy_params(self):
+        """Switch fuzzy_logic to the parameters the run was recorded with."""
+        wanted = self.fuzzy_params or fuzzy_logic.DEFAULT_PARAMS
+        if {k: list(v) for k, v in wanted.items()} != fuzzy_logic.params:
+            fuzzy_logic.apply_params(self.fuzzy_params)
+
+    def battles(self):
+        """Yield (kind, spec, commands, decisions) for every recorded battle.
+
+        `decisions` are the (enemy_kind, action, target) choices of enemy
+        controllers, replayed by ReplayController.
+        """
+        current = None
+        for rec in self.records:
+            if rec[0] == 'battle':
+                if current is not None:
+                    yield current
+                current = (rec[1], rec[2], [], [])
+            elif rec[0] == 'cmd' and current is not None:
+                target = tuple(rec[2]) if rec[2] is not None else None
+                current[2].append((rec[1], target))
+            elif rec[0] == 'ai' and current is not None:
+                target = tuple(rec[3]) if rec[3] is not None else None
+                current[3].append((rec[1], rec[2], target))
+        if current is not None:
+            yield current
+
+    @property
+    def battle_count(self):
+        return sum(1 for rec in self.records if rec[0] == 'battle')
+
+    def diff(self, other):
+        """Index of the first record that differs from `other`, or None."""
+        for i, (a, b) in enumerate(zip(self.records, other.records)):
+            if a != b:
+                return i
+        if len(self.records) != len(other.records):
+            return min(len(self.records), len(other.records))
+        return None
+
+    # --------------------------------------------------------- serialization
+
+    def to_dict(self):
+        return {'version': REPLAY_VERSION, 'seed': self.seed, 'overrides': self.overrides,
+                'fuzzy_params': self.fuzzy_params, 'inference': self.inference,
+                'records': self.records}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != REPLAY_VERSION:
+            raise ValueError(f"Unsupported replay version: {data.get('version')}")
+        return cls(data['seed'], data.get('overrides'), data['records'],
+                   data.get('fuzzy_params'), data.get('inference'))
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+        self.saved_path = path
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Load a JSON replay, or a binary one (see engine.replay_binary)."""
+        from engine.replay_binary import is_binary_replay, ReplayReader
+        if is_binary_replay(path):
+            with ReplayReader(path) as reader:
+                return reader.to_log()
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+class ReplayController:
+    """Enemy controller that plays back recorded decisions in order."""
+
+    def __init__(self, decisions):
+        self.decisions = list(decisions)
+        self.index = 0
+
+    @classmethod
+    def for_battle(cls, decisions):
+        """BattleEngine controllers for every enemy kind in `decisions`."""
+        if not decisions:
+            return {}
+        controller = cls(decisions)
+        return {kind: controller for kind, _, _ in decisions}
+
+    def decide(self, engine, e):
+        if self.index >= len(self.decisions):
+            raise ReplayMismatch(f"No recorded decision left for {type(e).__name__}")
+        kind, action, target = self.decisions[self.index]
+        self.index += 1
+        if kind != type(e).__name__:
+            raise ReplayMismatch(f"Recorded decision is for {kind}, not {type(e).__name__}")
+        return Action(e, action, target)
+
+
+def check_replay(recorded, replayed):
+    """Raise ReplayMismatch if two logs of the same run differ."""
+    index = recorded.diff(replayed)
+    if index is not None:
+        want = recorded.records[index] if index < len(recorded.records) else None
+        got = replayed.records[index] if index < len(replayed.records) else None
+        raise ReplayMismatch(f"Replay diverged at record {index}: expected {want}, got {got}")
+
+
+def play_log(run, log, inference=None):
+    """Start every battle of `log` on `run` and submit its commands.
+
+    The recorded fuzzy parameters are applied first; `inference` defaults
+    to the recorded one.
+    """
+    from engine.battle_engine import BattleEngine
+
+    log.apply_fuzzy_params()
+    if inference is None:
+        inference = log.inference
+    for kind, _, commands, decisions in log.battles():
+        engine = BattleEngine(run, forced_inference=inference,
+                              controllers=ReplayController.for_battle(decisions),
+                              **run.start_battle(kind))
+        for command in commands:
+            engine.submit(command)
+        engine.drain_events()
+    return run
+
+
+def replay_headless(log, inference=None):
+    """Play a recorded run again without a display and verify it.
+
+    Args:
+        log: ReplayLog of the original run.
+        inference: Enemy scorer override, as for BattleEngine; defaults
+            to the one the run was recorded with.
+
+    Returns:
+        The RunState after the last recorded battle.
+
+    Raises:
+        ReplayMismatch: If any battle, draw, command or result differs.
+    """
+    from engine.run_state import RunState
+
+    run = play_log(RunState(log.overrides, seed=log.seed), log, inference)
+    check_replay(log, run.replay)
+    return run
@@ -0,0 +1,463 @@
+"""Compact binary replay container with keyframes and a seekable index.
+
+Layout (little endian):
+
+    header    HEADER, then a JSON object (overrides, unit kind table,
+              fuzzy parameters, forced inference), zero-padded to RECORD_SIZE
+    records   fixed-width RECORD_SIZE-byte records (see RECORD / UNIT / VALUE)
+    footer    n_index INDEX entries, then the value table as JSON
+    trailer   TRAILER: footer offset, n_index, value table size, magic
+
+Every record starts with its type byte. Commands, events, battle starts,
+RNG draws, enemy-controller decisions and battle results are one record
+each. Payloads that are not
+small integers (battle specs, shuffled lists) are stored once in the value
+table and referenced by index; each new value is also streamed as JSON in
+VALUE records just before the first record that uses it. Every `keyframe_interval` turns (and at the
+start of each battle) a KEYFRAME record followed by one UNIT record per
+unit stores the full battle state; the footer indexes the keyframes so a
+reader can jump to any turn without replaying from the start.
+
+Unit kinds are numbered by the header's kind table: 'Player' and every
+enemy type registered (entities.registry) when the file was started.
+Version 1 files have no table and use UNIT_KINDS.
+
+A file whose writer never reached close() has no footer. Since version 3
+it can still be read: the records run to the end of the file and the index
+and value table are rebuilt from the KEYFRAME and VALUE records.
+
+ReplayWriter streams records to disk and only keeps the index and value
+table in memory. ReplayReader memory-maps a file for random access;
+iter_records() scans one sequentially in fixed-size chunks.
+"""
+import bisect
+import json
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+from engine.actions import ENEMY_ACTIONS
+from engine.replay import ReplayLog
+from entities.registry import ENEMY_ARCHETYPES
+
+MAGIC = b'FPRP'
+FOOTER_MAGIC = b'FPRX'
+BINARY_VERSION = 3
+RECORD_SIZE = 16
+DEFAULT_KEYFRAME_INTERVAL = 10
+
+HEADER = struct.Struct('<4sHHQHHI')
+RECORD = struct.Struct('<BBHHhhixx')      # rtype, code, battle, turn, a, b, c
+UNIT = struct.Struct('<BBBbbhhhhhx')      # rtype, kind, alive, x, y, hp, max_hp, atk, mana, max_mana
+VALUE = struct.Struct('<BB14s')           # rtype, size, JSON bytes (a value ends with size < 14)
+INDEX = struct.Struct('<HHI')             # battle, turn, record number
+TRAILER = struct.Struct('<QII4s')
+assert RECORD.size == UNIT.size == VALUE.size == RECORD_SIZE
+VALUE_DATA = VALUE.size - 2
+
+# record types
+R_BATTLE, R_CMD, R_EVENT, R_RNG, R_END, R_KEYFRAME, R_UNIT, R_AI, R_VALUE = range(1, 10)
+
+BATTLE_KINDS = ('hunt', 'miniboss', 'boss', 'wave')
+COMMANDS = ('MOVE', 'ATTACK', 'HEAL', 'END')
+RNG_METHODS = ('shuffle', 'choice', 'randint')
+OUTCOMES = ('victory', 'defeat', 'escape')
+EVENT_TYPES = ('spawn', 'player_move', 'player_attack', 'player_heal', 'invalid',
+               'turn_end', 'player_turn', 'enemy_attack', 'enemy_move', 'enemy_heal',
+               'stage_advance', 'escape', 'defeat', 'victory', 'enemy_plan')
+UNIT_KINDS = ('Player', 'Zombie', 'Skeleton', 'Enderman', 'Boss')  # kind table of version 1
+
+Record = namedtuple('Record', 'rtype code battle turn a b c')
+Unit = namedtuple('Unit', 'rtype kind alive x y hp max_hp atk mana max_mana')
+Value = namedtuple('Value', 'rtype size data')
+
+
+def _pad(n):
+    return -n % RECORD_SIZE
+
+
+def _event_fields(event):
+    """(a, b, c) payload of an engine event: a position and one amount."""
+    unit = event.get('unit') or event.get('target')
+    pos = event.get('pos') or ((unit.x, unit.y) if unit is not None else (-1, -1))
+    for key in ('damage', 'amount', 'stage_index', 'turn_count', 'nodes'):
+        if key in event:
+            return pos[0], pos[1], int(event[key])
+    return pos[0], pos[1], 0
+
+
+class ReplayWriter:
+    """Streaming binary recorder with the same interface as ReplayLog.
+
+    Set as RunState.replay (or fed by write_binary) it receives battles,
+    commands, draws, events and per-turn checkpoints from BattleEngine.
+    The file is created on the first battle and completed by close().
+    """
+
+    def __init__(self, path, seed, overrides=None, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL,
+                 fuzzy_params=None, inference=None):
+        self.path = path
+        self.seed = seed
+        self.overrides = dict(overrides or {})
+        self.fuzzy_params = fuzzy_params
+        self.inference = inference
+        self.keyframe_interval = keyframe_interval
+        self.battle_count = 0
+        self.saved_path = None
+        self._file = None
+        self._count = 0
+        self._turn = 0
+        self._index = []
+        self._values = []
+        self._value_ids = {}
+        self._kind_codes = {}
+
+    def _open(self):
+        kinds = ('Player',) + tuple(ENEMY_ARCHETYPES)
+        self._kind_codes = {kind: i for i, kind in enumerate(kinds)}
+        meta = json.dumps({'overrides': self.overrides, 'kinds': kinds, 'fuzzy_params': self.fuzzy_params,
+                           'inference': self.inference}, sort_keys=True).encode('utf-8')
+        self._file = open(self.path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, BINARY_VERSION, RECORD_SIZE, self.seed & (2**64 - 1),
+                                     self.keyframe_interval, 0, len(meta)))
+        self._file.write(meta + b'\0' * _pad(HEADER.size + len(meta)))
+
+    def _value(self, value):
+        key = json.dumps(value, sort_keys=True)
+        if key not in self._value_ids:
+            self._value_ids[key] = len(self._values)
+            self._values.append(value)
+            data = key.encode('utf-8')
+            for start in range(0, len(data) + 1, VALUE_DATA):
+                chunk = data[start:start + VALUE_DATA]
+                self._file.write(VALUE.pack(R_VALUE, len(chunk), chunk))
+                self._count += 1
+        return self._value_ids[key]
+
+    def _write(self, rtype, code=0, a=0, b=0, c=0):
+        if self._file is None:
+            return
+        battle = max(0, self.battle_count - 1)  # draws before the first battle count as battle 0
+        self._file.write(RECORD.pack(rtype, code, battle, self._turn, a, b, c))
+        self._count += 1
+
+    # ---------------------------------------------------------- recorder API
+
+    def battle(self, kind, spec):
+        if self._file is None:
+            self._open()
+        self.battle_count += 1
+        self._turn = 0
+        self._write(R_BATTLE, BATTLE_KINDS.index(kind), c=self._value(dict(spec)))
+
+    def command(self, command):
+        kind, target = command
+        x, y = target if target is not None else (-1, -1)
+        self._write(R_CMD, COMMANDS.index(kind), x, y)
+
+    def draw(self, method, value):
+        if self._file is None:
+            self._open()
+        self._write(R_RNG, RNG_METHODS.index(method), c=self._value(value))
+
+    def decision(self, kind, action, target):
+        x, y = target if target is not None else (-1, -1)
+        self._write(R_AI, ENEMY_ACTIONS.index(action), x, y, self._kind_codes[kind])
+
+    def event(self, event):
+        if event['type'] == 'turn_end':
+            self._turn = event['turn_count']
+        self._write(R_EVENT, EVENT_TYPES.index(event['type']), *_event_fields(event))
+
+    def result(self, outcome, turn_count, total_run_turns, hp, mana):
+        self._write(R_END, OUTCOMES.index(outcome), hp, mana, total_run_turns)
+
+    def checkpoint(self, engine):
+        """Write a keyframe at battle start and every keyframe_interval turns."""
+        if self._file is None or engine.turn_count % self.keyframe_interval:
+            return
+        if self._index and self._index[-1][:2] == (self.battle_count - 1, engine.turn_count):
+            return
+        units = [engine.player] + list(engine.enemies)
+        if len(units) > 0xFF:
+            return  # the unit count is one byte: larger waves are read from their start
+        self._index.append((self.battle_count - 1, engine.turn_count, self._count))
+        self._write(R_KEYFRAME, len(units), engine.stage_index, engine.run.player_stats['level'],
+                    engine.run.total_run_turns)
+        for u in units:
+            self._file.write(UNIT.pack(R_UNIT, self._kind_codes[type(u).__name__], bool(u.alive),
+                                       u.x, u.y, u.hp, u.max_hp, u.atk, u.mana, u.max_mana))
+            self._count += 1
+
+    # ------------------------------------------------------------- finishing
+
+    def close(self):
+        """Write the footer; returns the path, or None if nothing was recorded."""
+        if self._file is None:
+            return None
+        footer_offset = self._file.tell()
+        for entry in self._index:
+            self._file.write(INDEX.pack(*entry))
+        values = json.dumps(self._values, separators=(',', ':')).encode('utf-8')
+        self._file.write(values)
+        self._file.write(TRAILER.pack(footer_offset, len(self._index), len(values), FOOTER_MAGIC))
+        self._file.close()
+        self._file = None
+        self.saved_path = self.path
+        return self.path
+
+    def save(self, path=None):
+        """ReplayLog-compatible alias of close()."""
+        return self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _read_header(buf):
+    """(header dict, offset of the first record) of a replay file's start."""
+    magic, version, record_size, seed, interval, _, meta_len = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a binary replay file")
+    if not 1 <= version <= BINARY_VERSION or record_size != RECORD_SIZE:
+        raise ValueError(f"Unsupported binary replay version: {version}")
+    meta = json.loads(bytes(buf[HEADER.size:HEADER.size + meta_len]).decode('utf-8'))
+    if version == 1:
+        meta = {'overrides': meta, 'kinds': UNIT_KINDS}
+    header = {'version': version, 'seed': seed, 'keyframe_interval': interval,
+              'overrides': meta['overrides'], 'kinds': tuple(meta['kinds']),
+              'fuzzy_params': meta.get('fuzzy_params'), 'inference': meta.get('inference')}
+    return header, HEADER.size + meta_len + _pad(HEADER.size + meta_len)
+
+
+def _decode(raw, offset=0):
+    if raw[offset] == R_UNIT:
+        return Unit(*UNIT.unpack_from(raw, offset))
+    if raw[offset] == R_VALUE:
+        return Value(*VALUE.unpack_from(raw, offset))
+    return Record(*RECORD.unpack_from(raw, offset))
+
+
+def _footer(buf, size, header, data_start):
+    """TRAILER fields of a closed file, or None for an unclosed version 3+ one."""
+    if size >= data_start + TRAILER.size:
+        trailer = TRAILER.unpack_from(buf, size - TRAILER.size)
+        if trailer[3] == FOOTER_MAGIC:
+            return trailer
+    if header['version'] < 3:
+        raise ValueError("Binary replay has no footer (recording not closed?)")
+    return None
+
+
+class _ValueDecoder:
+    """Collects the values streamed in VALUE records, in value table order."""
+
+    def __init__(self, values):
+        self.values = values
+        self._parts = []
+
+    def add(self, rec):
+        self._parts.append(rec.data[:rec.size])
+        if rec.size < VALUE_DATA:
+            self.values.append(json.loads(b''.join(self._parts).decode('utf-8')))
+            self._parts = []
+
+
+def _decision(rec, header):
+    """(enemy kind, action) of an R_AI record."""
+    if header['version'] == 1:  # code packed the action and the kind in nibbles
+        return header['kinds'][rec.code >> 4], ENEMY_ACTIONS[rec.code & 0xF]
+    return header['kinds'][rec.c], ENEMY_ACTIONS[rec.code]
+
+
+def _keyframe_state(head, units, kinds):
+    units = [u._asdict() for u in units]
+    for u in units:
+        del u['rtype']
+        u['kind'] = kinds[u['kind']]
+        u['alive'] = bool(u['alive'])
+    return {
+        'battle': head.battle, 'turn': head.turn, 'stage_index': head.a,
+        'level': head.b, 'total_run_turns': head.c,
+        'units': units,
+    }
+
+
+class ReplayReader:
+    """Random access to a binary replay through a read-only memory map."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.header, self._data_start = _read_header(self._mm)
+        self.seed = self.header['seed']
+        self.keyframe_interval = self.header['keyframe_interval']
+        self.overrides = self.header['overrides']
+        trailer = _footer(self._mm, len(self._mm), self.header, self._data_start)
+        # False for a file that was never closed: index and values are rebuilt
+        self.complete = trailer is not None
+        if self.complete:
+            footer_offset, n_index, values_len, _ = trailer
+            self._n = (footer_offset - self._data_start) // RECORD_SIZE
+            self.index = [INDEX.unpack_from(self._mm, footer_offset + i * INDEX.size) for i in range(n_index)]
+            start = footer_offset + n_index * INDEX.size
+            self.values = json.loads(self._mm[start:start + values_len].decode('utf-8'))
+        else:
+            self._n = (len(self._mm) - self._data_start) // RECORD_SIZE
+            self.index, self.values = self._rebuild()
+        self.header['values'] = self.values
+        self._index_keys = [(battle, turn) for battle, turn, _ in self.index]
+
+    def _rebuild(self):
+        index, values = [], []
+        decoder = _ValueDecoder(values)
+        for i, rec in enumerate(self.records()):
+            if rec.rtype == R_VALUE:
+                decoder.add(rec)
+            elif rec.rtype == R_KEYFRAME and i + rec.code < self._n:  # all its units were written
+                index.append((rec.battle, rec.turn, i))
+        return index, values
+
+    def __len__(self):
+        return self._n
+
+    def record(self, i):
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        return _decode(self._mm, self._data_start + i * RECORD_SIZE)
+
+    def records(self, start=0, stop=None):
+        stop = self._n if stop is None else min(stop, self._n)
+        for i in range(start, stop):
+            yield _decode(self._mm, self._data_start + i * RECORD_SIZE)
+
+    def keyframe(self, k):
+        """Decoded state dict of the k-th indexed keyframe."""
+        _, _, rec = self.index[k]
+        head = self.record(rec)
+        return _keyframe_state(head, [self.record(rec + 1 + j) for j in range(head.code)],
+                               self.header['kinds'])
+
+    def seek(self, battle, turn):
+        """Jump to (battle, turn) via the nearest earlier keyframe.
+
+        Returns:
+            Tuple (state, records): the keyframe state dict and an iterator
+            over the records after it that lead to the start of the
+            player's `turn` (stopping before that turn's command).
+        """
+        k = bisect.bisect_right(self._index_keys, (battle, turn)) - 1
+        if k < 0 or self.index[k][0] != battle:
+            raise KeyError(f"No keyframe for battle {battle}")
+        state = self.keyframe(k)
+        first = self.index[k][2] + 1 + len(state['units'])
+
+        def following():
+            for rec in self.records(first):
+                if rec.battle != battle or rec.turn > turn or (rec.rtype == R_CMD and rec.turn == turn):
+                    return
+                yield rec
+        return state, following()
+
+    def to_log(self):
+        """Rebuild the ReplayLog (battles, commands, draws, results)."""
+        return records_to_log(self.header, self.records())
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_records(path, chunk_records=4096):
+    """Stream (header dict, then) records of a replay with bounded memory.
+
+    Yields:
+        A header dict with 'version', 'seed', 'overrides',
+        'keyframe_interval', 'kinds' (unit kind table), 'fuzzy_params',
+        'inference' and 'values' first, then every Record / Unit / Value
+        in file order. For a file that was never closed, 'values' starts
+        empty and is filled as the VALUE records are read.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(HEADER.size)
+        meta_len = HEADER.unpack(head)[-1]
+        header, data_start = _read_header(head + f.read(meta_len))
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - TRAILER.size))
+        trailer = _footer(f.read(TRAILER.size), min(size, TRAILER.size), header, 0)
+        decoder = None
+        if trailer is not None:
+            footer_offset, n_index, values_len, _ = trailer
+            f.seek(footer_offset + n_index * INDEX.size)
+            header['values'] = json.loads(f.read(values_len).decode('utf-8'))
+        else:
+            footer_offset = data_start + (size - data_start) // RECORD_SIZE * RECORD_SIZE
+            header['values'] = []
+            decoder = _ValueDecoder(header['values'])
+        yield header
+
+        f.seek(data_start)
+        remaining = footer_offset - data_start
+        while remaining > 0:
+            chunk = f.read(min(remaining, chunk_records * RECORD_SIZE))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            for offset in range(0, len(chunk), RECORD_SIZE):
+                rec = _decode(chunk, offset)
+                if decoder is not None and rec.rtype == R_VALUE:
+                    decoder.add(rec)
+                yield rec
+
+
+def records_to_log(header, records):
+    """Build a ReplayLog from decoded binary records.
+
+    Args:
+        header: Header dict as yielded first by iter_records().
+        records: The Records / Units that follow it.
+    """
+    values = header['values']
+    log = ReplayLog(header['seed'], header['overrides'],
+                    fuzzy_params=header['fuzzy_params'], inference=header['inference'])
+    for rec in records:
+        if rec.rtype == R_BATTLE:
+            log.battle(BATTLE_KINDS[rec.code], values[rec.c])
+        elif rec.rtype == R_CMD:
+            log.command((COMMANDS[rec.code], (rec.a, rec.b) if rec.a >= 0 else None))
+        elif rec.rtype == R_RNG:
+            log.draw(RNG_METHODS[rec.code], values[rec.c])
+        elif rec.rtype == R_AI:
+            log.decision(*_decision(rec, header), (rec.a, rec.b) if rec.a >= 0 else None)
+        elif rec.rtype == R_END:
+            log.result(OUTCOMES[rec.code], rec.turn, rec.c, rec.a, rec.b)
+    return log
+
+
+def is_binary_replay(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_binary(log, path, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+    """Convert a ReplayLog to a binary replay by playing it headlessly."""
+    from engine.replay import check_replay, play_log
+    from engine.run_state import RunState
+
+    with ReplayWriter(path, log.seed, log.overrides, keyframe_interval,
+                      log.fuzzy_params, log.inference) as writer:
+        play_log(RunState(log.overrides, seed=log.seed, replay=writer), log)
+    with ReplayReader(path) as reader:
+        check_replay(log, reader.to_log())
+    return path
@@ -0,0 +1,107 @@
+"""Progress that carries over between battles in one run (no pygame)."""
+import random
+from config import WAVE_GRID_W, WAVE_GRID_H, WAVE_ENEMY_COUNT, WAVE_ENEMY_MIX, WAVE_REWARD_LEVELS
+from engine.params import game_params, default_player_stats
+from engine.replay import ReplayLog, RunRandom, current_fuzzy_params
+
+# Enemy order for a hunt is shuffled each time
+HUNT_STAGES = ['Zombie', 'Skeleton', 'Zombie']
+
+
+class RunState:
+    """Player stats, turn counter and unlocks for a whole run.
+
+    ScreenManager extends this for the game; simulators use it directly.
+    All randomness of the run comes from `self.rng`, seeded per run, and is
+    recorded together with the player commands in `self.replay`.
+    """
+
+    def __init__(self, params_overrides=None, seed=None, replay=None):
+        self.params_overrides = dict(params_overrides or {})
+        self.params = game_params(params_overrides)
+        self.reset_score(seed, replay)
+
+    def reset_score(self, seed=None, replay=None):
+        """Reset the global turn counter and player stats for a new game run.
+
+        Args:
+            seed: Seed of the run RNG; a fresh random seed when None.
+            replay: Recorder for the run (ReplayLog interface), defaults
+                to new_replay().
+        """
+        self.total_run_turns = 0
+        self.player_stats = default_player_stats(self.params)
+        self.miniboss_defeated = False
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(32)
+        self.seed = seed
+        self.replay = replay if replay is not None else self.new_replay(seed)
+        self.rng = RunRandom(seed, self.replay)
+
+    def new_replay(self, seed):
+        """Recorder for a new run; in-memory by default."""
+        return ReplayLog(seed, self.params_overrides, fuzzy_params=current_fuzzy_params())
+
+    def level_up(self, amount):
+        """Level up the player, increasing stats and full heal."""
+        self.player_stats['level'] += amount
+        self.player_stats['atk'] += 5 * amount
+        self.player_stats['max_hp'] += 10 * amount
+        # Full heal on level up
+        self.player_stats['hp'] = self.player_stats['max_hp']
+        self.player_stats['mana'] = self.player_stats['max_mana']
+
+    def update_player_state(self, hp, mana):
+        """Update player stats with current battle values (damage persists)."""
+        self.player_stats['hp'] = hp
+        self.player_stats['mana'] = mana
+
+    def start_battle(self, kind):
+        """Build the battle `kind` ('hunt', 'miniboss', 'boss') and record it.
+
+        Returns:
+            Keyword arguments for BattleEngine / TurnBasedGrid.
+        """
+        spec = getattr(self, f'{kind}_battle')()
+        self.replay.battle(kind, spec)
+        return spec
+
+    # Battle factories: keyword arguments for BattleEngine / TurnBasedGrid
+    def hunt_battle(self, rng=None):
+        """Random hunt with 3 stages, reward +1 level."""
+        enemy_types = list(HUNT_STAGES)
+        (rng or self.rng).shuffle(enemy_types)
+        return {'stages': enemy_types, 'reward_levels': 1}
+
+    def miniboss_battle(self):
+        """Miniboss fight, reward +3 levels, unlocks boss."""
+        return {'stages': ['Enderman'], 'reward_levels': 3, 'is_miniboss': True}
+
+    def boss_battle(self):
+        """Final boss fight, no level reward."""
+        return {'stages': ['Boss'], 'is_miniboss': False}
+
+    def wave_battle(self, count=None, rng=None):
+        """Wave of `count` mixed enemies (default WAVE_ENEMY_COUNT) on the
+        open WAVE_GRID, all on the field at once; reward +WAVE_REWARD_LEVELS.
+
+        Enemies fill random tiles of the right half of the grid, listed
+        nearest column first; types follow WAVE_ENEMY_MIX in random order.
+        """
+        rng = rng or self.rng
+        first_x = WAVE_GRID_W // 2
+        tiles = (WAVE_GRID_W - first_x) * WAVE_GRID_H
+        count = min(WAVE_ENEMY_COUNT if count is None else count, tiles)
+        picked = list(range(tiles))
+        rng.shuffle(picked)
+        picked = sorted(picked[:count])
+
+        total = sum(WAVE_ENEMY_MIX.values())
+        types = [t for t, share in WAVE_ENEMY_MIX.items() for _ in range(count * share // total)]
+        types += [next(iter(WAVE_ENEMY_MIX))] * (count - len(types))
+        rng.shuffle(types)
+
+        enemies = [{'type': t, 'x': first_x + i // WAVE_GRID_H, 'y': i % WAVE_GRID_H}
+                   for t, i in zip(types, picked)]
+        return {'enemies': enemies, 'grid': [WAVE_GRID_W, WAVE_GRID_H],
+                'reward_levels': WAVE_REWARD_LEVELS, 'batch_ai': True}
@@ -0,0 +1,90 @@
+"""Compact immutable battle snapshots for lookahead and rollback.
+
+A BattleState is a handful of slots pointing at immutable tuples, so
+cloning one only copies references: unchanged units, the stage list and
+the RNG state are shared between every clone (structural sharing).
+Changing a unit builds one new UnitState and one new units tuple, leaving
+the original state untouched (copy-on-write).
+
+    state = engine.snapshot_state()     # live engine -> BattleState
+    child = state.replace_unit(1, hp=0, alive=False)
+    scratch.restore_state(child)        # BattleState -> reusable engine
+"""
+from collections import namedtuple
+
+UnitState = namedtuple('UnitState', 'kind team x y hp max_hp atk mana max_mana alive')
+
+
+def unit_state(unit):
+    """UnitState of a live Entity."""
+    return UnitState(type(unit).__name__, unit.team, unit.x, unit.y, unit.hp, unit.max_hp,
+                     unit.atk, getattr(unit, 'mana', 0), getattr(unit, 'max_mana', 0), unit.alive)
+
+
+class BattleState:
+    """One battle position: units (player first), turn, stage and RNG state.
+
+    Attributes:
+        units: Tuple of UnitState, the player at index 0.
+        turn: 'PLAYER' or 'ENEMY'.
+        turn_count: Turns played in this battle.
+        stage_index: Index into `stages`.
+        stages: Tuple of enemy type names, or None for a fixed enemy list.
+        outcome: None while running, else 'victory'/'defeat'/'escape'.
+        total_run_turns: Run-wide turn counter.
+        player_level: Run level of the player.
+        rng_state: random.Random.getstate() of the run RNG, or None.
+    """
+    __slots__ = ('units', 'turn', 'turn_count', 'stage_index', 'stages', 'outcome',
+                 'total_run_turns', 'player_level', 'rng_state')
+
+    def __init__(self, units, turn='PLAYER', turn_count=0, stage_index=0, stages=None,
+                 outcome=None, total_run_turns=0, player_level=1, rng_state=None):
+        self.units = tuple(units)
+        self.turn = turn
+        self.turn_count = turn_count
+        self.stage_index = stage_index
+        self.stages = tuple(stages) if stages is not None else None
+        self.outcome = outcome
+        self.total_run_turns = total_run_turns
+        self.player_level = player_level
+        self.rng_state = rng_state
+
+    def clone(self, **changes):
+        """Shallow copy sharing every tuple, with optional slot changes."""
+        new = BattleState.__new__(BattleState)
+        for name in BattleState.__slots__:
+            setattr(new, name, changes.get(name, getattr(self, name)))
+        return new
+
+    def replace_unit(self, index, **changes):
+        """Clone with one unit's fields changed; other units are shared."""
+        units = list(self.units)
+        units[index] = units[index]._replace(**changes)
+        return self.clone(units=tuple(units))
+
+    @property
+    def player(self):
+        return self.units[0]
+
+    @property
+    def enemies(self):
+        return self.units[1:]
+
+    @property
+    def is_over(self):
+        return self.outcome is not None
+
+    def key(self):
+        """Hashable value identifying the position (RNG state excluded)."""
+        return (self.units, self.turn, self.turn_count, self.stage_index, self.stages, self.outcome)
+
+    def __eq__(self, other):
+        return isinstance(other, BattleState) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        units = ', '.join(f'{u.kind}@{u.x},{u.y} hp={u.hp}' for u in self.units)
+        return f'BattleState(turn={self.turn}#{self.turn_count}, stage={self.stage_index}, [{units}])'
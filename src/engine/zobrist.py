@@ -0,0 +1,208 @@
+"""Zobrist hashing of battle positions and a shared transposition table.
+
+A position hash is the XOR of one 64-bit key per feature: every unit slot
+contributes its kind and tile, HP and mana, and its ATK and max HP (or a
+single "dead" key), and the side to move, the turn count and the stage
+index add one key each. The turn count is part of the position because the
+Enderman escapes at ENDERMAN_ESCAPE_TURN, and ATK / max HP because they grow
+with the player's level, so the shared table never mixes up positions that
+play out differently. Changing one unit is two XORs, so BattleEngine keeps
+`engine.hash` up to date in O(1) per move, attack, heal or turn:
+
+    keys = zobrist_keys(engine.grid_w)
+    engine.hash == keys.position(engine.units, engine.turn, engine.turn_count, engine.stage_index)
+
+Keys are derived from the feature with splitmix64 instead of a table
+filled by `random`, so hashes are the same in every process and do not
+depend on PYTHONHASHSEED or on the order keys are first used.
+
+TranspositionTable is a fixed-size cache keyed by these hashes; one shared
+instance (shared_table()) is used by the search AI and the player hints.
+"""
+import zlib
+from collections import namedtuple
+from functools import lru_cache
+
+MASK64 = (1 << 64) - 1
+
+# feature ids (top byte of the splitmix input)
+F_POSITION, F_HP, F_MANA, F_DEAD, F_SIDE, F_STAGE, F_PERSPECTIVE, F_STATS, F_TURN = range(1, 10)
+UNIT_KINDS = ('Player', 'Zombie', 'Skeleton', 'Enderman', 'Boss')
+_KIND_INDEX = {kind: i for i, kind in enumerate(UNIT_KINDS)}
+
+
+def splitmix64(x):
+    """One splitmix64 step: a well-mixed 64-bit value for integer `x`."""
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+def _kind(unit):
+    """Type name of an Entity or UnitState."""
+    return getattr(unit, 'kind', None) or type(unit).__name__
+
+
+def kind_index(kind):
+    """Number of a unit type name in the position keys.
+
+    Types registered at runtime (entities.registry) get a number from the
+    name's CRC, so it is the same in every process.
+    """
+    index = _KIND_INDEX.get(kind)
+    if index is None:
+        index = _KIND_INDEX[kind] = len(UNIT_KINDS) + zlib.crc32(kind.encode()) % 0xFFFF
+    return index
+
+
+class ZobristKeys:
+    """Deterministic key set for one grid width.
+
+    Args:
+        grid_w: Grid width, used to number tiles.
+        seed: Mixed into every key; different seeds give independent sets.
+        hp_step: HP bucket width (1 hashes exact HP).
+        mana_step: Mana bucket width (1 hashes exact mana).
+    """
+
+    def __init__(self, grid_w, seed=0, hp_step=1, mana_step=1):
+        self.grid_w = grid_w
+        self.seed = seed
+        self.hp_step = hp_step
+        self.mana_step = mana_step
+        self._keys = {}
+
+    def key(self, feature, slot=0, value=0):
+        """64-bit key of one feature value; cached after the first use."""
+        packed = (feature, slot, value)
+        k = self._keys.get(packed)
+        if k is None:
+            k = splitmix64(self.seed ^ (feature << 56) ^ (slot << 36) ^ (value & 0xFFFFFFFFF))
+            self._keys[packed] = k
+        return k
+
+    def unit(self, slot, u):
+        """Combined key of the unit in `slot` (Entity or UnitState)."""
+        if not u.alive:
+            return self.key(F_DEAD, slot)
+        kind = kind_index(_kind(u))
+        return (self.key(F_POSITION, slot, kind * 4096 + u.y * self.grid_w + u.x)
+                ^ self.key(F_HP, slot, max(0, u.hp) // self.hp_step)
+                ^ self.key(F_MANA, slot, max(0, getattr(u, 'mana', 0)) // self.mana_step)
+                ^ self.key(F_STATS, slot, max(0, u.max_hp) * 4096 + max(0, u.atk)))
+
+    def side(self, turn):
+        """Side-to-move key (0 for the player's turn)."""
+        return self.key(F_SIDE) if turn == 'ENEMY' else 0
+
+    def turn_count(self, turn_count):
+        return self.key(F_TURN, 0, turn_count)
+
+    def stage(self, stage_index):
+        return self.key(F_STAGE, 0, stage_index)
+
+    def position(self, units, turn, turn_count, stage_index):
+        """Full hash, recomputed from scratch (O(units))."""
+        h = self.side(turn) ^ self.turn_count(turn_count) ^ self.stage(stage_index)
+        for slot, u in enumerate(units):
+            h ^= self.unit(slot, u)
+        return h
+
+    def state(self, state):
+        """Hash of a BattleState; equals the engine hash it was taken from."""
+        return self.position(state.units, state.turn, state.turn_count, state.stage_index)
+
+    def perspective(self, slot):
+        """Key to XOR into a hash whose stored value is seen from unit `slot`."""
+        return self.key(F_PERSPECTIVE, slot)
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(grid_w, seed=0):
+    """Shared ZobristKeys for a grid width (one key cache per process)."""
+    return ZobristKeys(grid_w, seed)
+
+
+# ------------------------------------------------------------ transposition
+
+TTEntry = namedtuple('TTEntry', 'key depth value move generation')
+
+
+class TranspositionTable:
+    """Fixed-size hash -> (depth, value, move) cache with two-way buckets.
+
+    Each bucket holds a depth-preferred slot and an always-replace slot: a
+    new entry takes the first slot if it searched at least as deep as the
+    one there (or that one is from an older search generation), otherwise
+    it overwrites the second. Memory never grows past `capacity` entries.
+
+    Args:
+        capacity: Number of entries, rounded up to a power of two.
+    """
+
+    def __init__(self, capacity=1 << 16):
+        size = 2
+        while size < capacity:
+            size <<= 1
+        self.capacity = size
+        self._mask = (size >> 1) - 1
+        self.entries = [None] * size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Age existing entries so fresher results may replace deep old ones."""
+        self.generation += 1
+
+    def probe(self, key):
+        """Entry stored for `key`, or None."""
+        i = (key & self._mask) << 1
+        entries = self.entries
+        for e in (entries[i], entries[i + 1]):
+            if e is not None and e.key == key:
+                self.hits += 1
+                return e
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, value, move=None):
+        """Insert or refresh the entry for `key` (see class replacement policy)."""
+        i = (key & self._mask) << 1
+        entries = self.entries
+        entry = TTEntry(key, depth, value, move, self.generation)
+        self.stores += 1
+        first, second = entries[i], entries[i + 1]
+        if second is not None and second.key == key and (first is None or first.key != key):
+            if first is None or depth >= first.depth or first.generation != self.generation:
+                entries[i], entries[i + 1] = entry, first
+            else:
+                entries[i + 1] = entry
+            return entry
+        if first is None or first.key == key or depth >= first.depth or first.generation != self.generation:
+            if first is not None and first.key != key:
+                entries[i + 1] = first  # demote to the always-replace slot
+            entries[i] = entry
+        else:
+            entries[i + 1] = entry
+        return entry
+
+    def clear(self):
+        self.entries = [None] * self.capacity
+        self.hits = self.misses = self.stores = 0
+
+    def __len__(self):
+        return sum(1 for e in self.entries if e is not None)
+
+    @property
+    def hit_rate(self):
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+
+@lru_cache(maxsize=None)
+def shared_table():
+    """The process-wide table shared by enemy search and player hints."""
+    return TranspositionTable()
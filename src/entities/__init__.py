@@ -1,7 +1,10 @@
 """Entities package."""
+from .store import EntityStore
 from .base import Entity
 from .player import Player
 from .enemies import Monster, Zombie, Skeleton, Enderman
 from .boss import Boss
+from .registry import EnemyArchetype, ENEMY_ARCHETYPES, register_archetype, archetype, spawn_enemy
 
-__all__ = ['Entity', 'Player', 'Monster', 'Zombie', 'Skeleton', 'Enderman', 'Boss']
+__all__ = ['EntityStore', 'Entity', 'Player', 'Monster', 'Zombie', 'Skeleton', 'Enderman', 'Boss',
+           'EnemyArchetype', 'ENEMY_ARCHETYPES', 'register_archetype', 'archetype', 'spawn_enemy']
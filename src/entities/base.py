@@ -1,17 +1,56 @@
 """Base Entity class for all game units."""
+from .store import COLUMN, TEAM, TEAMS, EntityStore
+
+
+def _column(name, cast=None):
+    """Property reading/writing `name` in the unit's EntityStore row."""
+    col = COLUMN[name]
+    if cast is None:
+        def get(self):
+            return self._store.data.item(self._row, col)
+    else:
+        def get(self):
+            return cast(self._store.data.item(self._row, col))
+
+    def set(self, value):
+        self._store.data[self._row, col] = value
+
+    return property(get, set, doc=f"{name} (stored in the EntityStore)")
 
 
 class Entity:
-    """Base class for all game entities with health, attack, and position."""
-    
-    def __init__(self, x, y, hp, atk, team):
+    """Base class for all game entities with health, attack, and position.
+
+    The attributes live in an EntityStore row (see entities.store); the
+    entity itself only holds the store and its row index.
+    """
+    __slots__ = ('_store', '_row')
+
+    x = _column('x')
+    y = _column('y')
+    hp = _column('hp')
+    max_hp = _column('max_hp')
+    atk = _column('atk')
+    mana = _column('mana')
+    max_mana = _column('max_mana')
+    alive = _column('alive', bool)
+
+    def __init__(self, x, y, hp, atk, team, store=None):
+        self._store = store if store is not None else EntityStore(1)
+        self._row = self._store.allocate(type(self).__name__, team)
         self.x = x
         self.y = y
         self.hp = hp
         self.max_hp = hp
         self.atk = atk
-        self.team = team
-        self.alive = True
+
+    @property
+    def team(self):
+        return TEAMS[self._store.data.item(self._row, TEAM)]
+
+    @team.setter
+    def team(self, value):
+        self._store.data[self._row, TEAM] = TEAMS.index(value)
 
     def pos(self):
         """Return the current position as a tuple."""
@@ -19,6 +58,4 @@ class Entity:
 
     def take_damage(self, amount):
         """Apply damage to the entity and mark as dead if HP reaches 0."""
-        self.hp -= amount
-        if self.hp <= 0:
-            self.alive = False
+        self._store.damage(self._row, amount)
@@ -5,8 +5,9 @@ from src.config import BOSS_HP, BOSS_ATK, BOSS_MANA
 
 class Boss(Entity):
     """Boss enemy with high HP, attack, and mana."""
-    
-    def __init__(self, x, y):
-        super().__init__(x, y, hp=BOSS_HP, atk=BOSS_ATK, team='ENEMY')
+    __slots__ = ()
+
+    def __init__(self, x, y, store=None):
+        super().__init__(x, y, hp=BOSS_HP, atk=BOSS_ATK, team='ENEMY', store=store)
         self.mana = BOSS_MANA
         self.max_mana = BOSS_MANA
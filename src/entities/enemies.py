@@ -15,29 +15,33 @@ from src.config import (
 
 class Monster(Entity):
     """Base class for all enemy monsters."""
-    
-    def __init__(self, x, y, hp, atk, mana=0):
-        super().__init__(x, y, hp, atk, team='ENEMY')
+    __slots__ = ()
+
+    def __init__(self, x, y, hp, atk, mana=0, store=None):
+        super().__init__(x, y, hp, atk, team='ENEMY', store=store)
         self.mana = mana
         self.max_mana = mana
 
 
 class Zombie(Monster):
     """Zombie enemy - high HP, moderate attack."""
-    
-    def __init__(self, x, y):
-        super().__init__(x, y, hp=ZOMBIE_HP, atk=ZOMBIE_ATK, mana=ZOMBIE_MANA)
+    __slots__ = ()
+
+    def __init__(self, x, y, store=None):
+        super().__init__(x, y, hp=ZOMBIE_HP, atk=ZOMBIE_ATK, mana=ZOMBIE_MANA, store=store)
 
 
 class Skeleton(Monster):
     """Skeleton enemy - low HP, low attack."""
-    
-    def __init__(self, x, y):
-        super().__init__(x, y, hp=SKELETON_HP, atk=SKELETON_ATK, mana=SKELETON_MANA)
+    __slots__ = ()
+
+    def __init__(self, x, y, store=None):
+        super().__init__(x, y, hp=SKELETON_HP, atk=SKELETON_ATK, mana=SKELETON_MANA, store=store)
 
 
 class Enderman(Monster):
     """Enderman enemy - high HP, high attack, has mana."""
-    
-    def __init__(self, x, y):
-        super().__init__(x, y, hp=ENDERMAN_HP, atk=ENDERMAN_ATK, mana=ENDERMAN_MANA)
+    __slots__ = ()
+
+    def __init__(self, x, y, store=None):
+        super().__init__(x, y, hp=ENDERMAN_HP, atk=ENDERMAN_ATK, mana=ENDERMAN_MANA, store=store)
@@ -10,7 +10,8 @@ from src.config import (
 
 class Player(Entity):
     """Player character with mana and healing abilities."""
-    
+    __slots__ = ('level', 'mana_regen')
+
     @staticmethod
     def get_default_stats():
         """Return default player stats from config constants."""
@@ -23,7 +24,7 @@ class Player(Entity):
             'max_mana': PLAYER_MANA
         }
     
-    def __init__(self, x, y, stats: dict = None):
+    def __init__(self, x, y, stats: dict = None, store=None):
         # Use persistent stats from manager if provided, otherwise use defaults
         if stats is None:
             stats = Player.get_default_stats()
@@ -35,7 +36,7 @@ class Player(Entity):
         mana = stats.get('mana', PLAYER_MANA)
         max_mana = stats.get('max_mana', PLAYER_MANA)
         
-        super().__init__(x, y, hp=hp, atk=atk, team='PLAYER')
+        super().__init__(x, y, hp=hp, atk=atk, team='PLAYER', store=store)
         self.max_hp = max_hp  # Override max_hp from stats
         self.level = level
         self.mana = mana
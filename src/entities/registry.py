@@ -0,0 +1,106 @@
+"""Enemy archetypes: everything about an enemy type in one table entry.
+
+Spawning, the fuzzy AI (ai/fuzzy_logic.py), the vectorized simulator and
+the battle view all read the same EnemyArchetype instead of keeping their
+own per-type if/elif chains and constant dicts. The table holds data only
+(no pygame); scenes.components.battle_assets turns the sprite and sound
+entries into shared surfaces once per type.
+
+    spawn_enemy('Skeleton', 5, 2, params, store)   # Skeleton with params stats
+    register_archetype(EnemyArchetype('Spider', ...))  # new enemy type
+"""
+from collections import namedtuple
+
+from .enemies import Monster, Zombie, Skeleton, Enderman
+from .boss import Boss
+from src.config import (
+    ZOMBIE_HP, ZOMBIE_ATK, ZOMBIE_MANA,
+    SKELETON_HP, SKELETON_ATK, SKELETON_MANA,
+    ENDERMAN_HP, ENDERMAN_ATK, ENDERMAN_MANA,
+    BOSS_HP, BOSS_ATK, BOSS_MANA,
+    ZOMBIE_Y_OFFSET, SKELETON_Y_OFFSET, ENDERMAN_X_OFFSET, ENDERMAN_Y_OFFSET, BOSS_Y_OFFSET,
+)
+
+EnemyArchetype = namedtuple('EnemyArchetype', [
+    'name', 'cls', 'stat_key', 'hp', 'atk', 'mana',
+    'uses_mana', 'behaviors', 'heal_at',
+    'sprite_dir', 'frame_count', 'sprite_pad', 'offset', 'sounds',
+])
+EnemyArchetype.__doc__ = """One enemy type.
+
+Attributes:
+    name: Type name, also the unit class name (type(unit).__name__).
+    cls: Entity class, or None to have register_archetype create one.
+    stat_key: Prefix of the type's game params (e.g. 'ZOMBIE' -> ZOMBIE_HP).
+    hp, atk, mana: Stats used when the params have no entry for stat_key.
+    uses_mana: AI profile - True scores with the with-mana fuzzy system.
+    behaviors: Behaviour for a Weak, Mid and Strong fuzzy score.
+    heal_at: (hp_percent, mana) - heal first when HP% <= and mana >=, or None.
+    sprite_dir: Directory under assets/ with the Idle spritesheet/frames.
+    frame_count: Frames in the spritesheet.
+    sprite_pad: Pixels added to the tile size for the sprite's box.
+    offset: (x, y) sprite offset in pixels.
+    sounds: {event: file in assets/sounds}, played as '<name>_<event>'.
+"""
+
+ENEMY_ARCHETYPES = {}
+DEFAULT_ARCHETYPE = 'Zombie'  # unknown type names spawn as this
+
+
+def _monster_class(name):
+    """Plain Monster subclass named `name`; stats are set by spawn_enemy."""
+    def __init__(self, x, y, store=None):
+        Monster.__init__(self, x, y, hp=0, atk=0, store=store)
+    return type(name, (Monster,), {'__slots__': (), '__init__': __init__,
+                                   '__doc__': f"{name} enemy (registered archetype)."})
+
+
+def register_archetype(archetype):
+    """Add or replace an enemy type; returns the stored archetype."""
+    if archetype.cls is None:
+        archetype = archetype._replace(cls=_monster_class(archetype.name))
+    ENEMY_ARCHETYPES[archetype.name] = archetype
+    return archetype
+
+
+def archetype(name):
+    """Archetype of type `name`, falling back to DEFAULT_ARCHETYPE."""
+    found = ENEMY_ARCHETYPES.get(name)
+    return found if found is not None else ENEMY_ARCHETYPES[DEFAULT_ARCHETYPE]
+
+
+def spawn_enemy(name, x, y, params, store=None):
+    """New enemy of type `name` at (x, y) with stats from `params`."""
+    arch = archetype(name)
+    e = arch.cls(x, y, store=store)
+    key = arch.stat_key
+    e.hp = e.max_hp = params.get(f'{key}_HP', arch.hp)
+    e.atk = params.get(f'{key}_ATK', arch.atk)
+    e.mana = e.max_mana = params.get(f'{key}_MANA', arch.mana)
+    return e
+
+
+register_archetype(EnemyArchetype(
+    'Zombie', Zombie, 'ZOMBIE', ZOMBIE_HP, ZOMBIE_ATK, ZOMBIE_MANA,
+    uses_mana=False, behaviors=('MOVE_RETREAT', 'MOVE_CLOSE', 'MOVE_CLOSE'), heal_at=None,
+    sprite_dir='zombie', frame_count=6, sprite_pad=30, offset=(0, ZOMBIE_Y_OFFSET),
+    sounds={'spawn': 'Zombie_spawn.mp3', 'attack': 'Zombie_attack.mp3'}))
+
+register_archetype(EnemyArchetype(
+    'Skeleton', Skeleton, 'SKELETON', SKELETON_HP, SKELETON_ATK, SKELETON_MANA,
+    uses_mana=False, behaviors=('MOVE_RETREAT', 'RANGED_ATTACK', 'RANGED_ATTACK'), heal_at=None,
+    sprite_dir='skeleton', frame_count=7, sprite_pad=30, offset=(0, SKELETON_Y_OFFSET),
+    sounds={'spawn': 'Skeleton_spawn.mp3', 'attack': 'Skeleton_attack.mp3'}))
+
+register_archetype(EnemyArchetype(
+    'Enderman', Enderman, 'ENDERMAN', ENDERMAN_HP, ENDERMAN_ATK, ENDERMAN_MANA,
+    uses_mana=True, behaviors=('TELEPORT_FAR', 'TELEPORT_CLOSE', 'TELEPORT_CLOSE'), heal_at=(40, 30),
+    sprite_dir='enderman', frame_count=14, sprite_pad=30, offset=(ENDERMAN_X_OFFSET, ENDERMAN_Y_OFFSET),
+    sounds={'spawn': 'Enderman_spawn.mp3', 'attack': 'Enderman_attack.mp3',
+            'teleport': 'Enderman_teleport.mp3'}))
+
+register_archetype(EnemyArchetype(
+    'Boss', Boss, 'BOSS', BOSS_HP, BOSS_ATK, BOSS_MANA,
+    uses_mana=True, behaviors=('MOVE_RETREAT', 'RANGED_ATTACK', 'MOVE_CLOSE'), heal_at=(50, 40),
+    sprite_dir='boss', frame_count=8, sprite_pad=100, offset=(0, BOSS_Y_OFFSET),
+    sounds={'spawn': 'Boss_spawn.mp3', 'attack': 'Boss_attack.mp3'}))
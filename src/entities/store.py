@@ -0,0 +1,139 @@
+"""Structure-of-arrays storage for battle units.
+
+Every unit attribute lives in its own NumPy column of an EntityStore, one
+row per unit. Entity objects (Player, Zombie, Boss, ...) are small
+__slots__ views holding only (store, row), so `unit.hp -= 3` still works
+while the engine can check, damage or snapshot all of its units with one
+array operation per column.
+
+    store = EntityStore()
+    zombie = Zombie(3, 4, store=store)
+    store.any_alive(rows)           # instead of any(u.alive for u in units)
+    store.damage(rows, amounts)     # hp -= amounts, alive where hp > 0
+
+A BattleEngine owns one store for its units. An Entity created without a
+store gets a private one-row store.
+"""
+import numpy as np
+
+TEAMS = ('PLAYER', 'ENEMY')
+
+# Column order of EntityStore.data; the first eight match UnitState.x..alive
+COLUMNS = ('x', 'y', 'hp', 'max_hp', 'atk', 'mana', 'max_mana', 'alive', 'team', 'kind')
+COLUMN = {name: i for i, name in enumerate(COLUMNS)}
+X, Y, HP, MAX_HP, ATK, MANA, MAX_MANA, ALIVE, TEAM, KIND = range(len(COLUMNS))
+STATE_FIELDS = ALIVE + 1  # x..alive, written/read together by snapshots
+
+
+class EntityStore:
+    """Parallel attribute arrays for a set of units.
+
+    `data` is one int32 array of shape (capacity, len(COLUMNS)), so
+    `data[:, HP]` is the HP column of every row and `data[rows, :STATE_FIELDS]`
+    reads or writes whole units at once. Rows are handed out by allocate()
+    and recycled by release(); the array doubles in size when full, so
+    views never cache it.
+
+    Args:
+        capacity: Initial number of rows.
+    """
+
+    # type name <-> id, shared by all stores so ids are stable
+    kinds = []
+    _kind_ids = {}
+
+    def __init__(self, capacity=8):
+        self.capacity = max(1, capacity)
+        self.size = 0  # rows handed out so far, including released ones
+        self._free = []
+        self.data = np.zeros((self.capacity, len(COLUMNS)), np.int32)
+
+    def __len__(self):
+        return self.size - len(self._free)
+
+    def column(self, name):
+        """View of one attribute for every row."""
+        return self.data[:, COLUMN[name]]
+
+    @classmethod
+    def kind_id(cls, name):
+        """Stable integer id of a unit type name."""
+        kind = cls._kind_ids.get(name)
+        if kind is None:
+            kind = cls._kind_ids[name] = len(cls.kinds)
+            cls.kinds.append(name)
+        return kind
+
+    # ----- rows
+    def allocate(self, kind, team):
+        """Row for a new living unit of type name `kind` on `team`."""
+        if self._free:
+            row = self._free.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow(self.capacity * 2)
+            row = self.size
+            self.size += 1
+        values = self.data[row]
+        values[:] = 0
+        values[ALIVE] = 1
+        values[TEAM] = TEAMS.index(team)
+        values[KIND] = self.kind_id(kind)
+        return row
+
+    def _grow(self, capacity):
+        grown = np.zeros((capacity, len(COLUMNS)), np.int32)
+        grown[:self.capacity] = self.data
+        self.data = grown
+        self.capacity = capacity
+
+    def release(self, unit):
+        """Give `unit`'s row back to this store.
+
+        The unit keeps its values in a private one-row store, so anything
+        still holding it (events, sprites) reads the same numbers.
+        """
+        row = unit._row
+        detached = EntityStore(1)
+        detached.size = 1
+        detached.data[0] = self.data[row]
+        unit._store, unit._row = detached, 0
+        self.data[row, ALIVE] = 0
+        self._free.append(row)
+
+    # ----- vectorized queries and updates over `rows` (an index array)
+    def any_alive(self, rows):
+        return bool(self.data[rows, ALIVE].any())
+
+    def positions(self, rows, alive_only=True):
+        """List of (x, y) of the units in `rows`, in row order."""
+        return [(r[X], r[Y]) for r in self.data[rows].tolist() if r[ALIVE] or not alive_only]
+
+    def find(self, rows, x, y):
+        """Index into `rows` of the living unit standing on (x, y), or -1."""
+        d = self.data[rows]
+        hits = np.flatnonzero((d[:, ALIVE] != 0) & (d[:, X] == x) & (d[:, Y] == y))
+        return int(hits[0]) if len(hits) else -1
+
+    def damage(self, rows, amounts):
+        """Subtract `amounts` from the HP of `rows`; units at 0 HP or less die.
+
+        Returns:
+            Boolean array, True for each row that was killed by this damage.
+        """
+        d = self.data
+        d[rows, HP] -= amounts
+        killed = (d[rows, ALIVE] != 0) & (d[rows, HP] <= 0)
+        d[rows, ALIVE] &= ~killed
+        return killed
+
+    def unit_states(self, rows):
+        """UnitState tuple for each row."""
+        from engine.state import UnitState  # engine imports entities
+        kinds, teams = self.kinds, TEAMS
+        return [UnitState(kinds[kind], teams[team], x, y, hp, max_hp, atk, mana, max_mana, alive != 0)
+                for x, y, hp, max_hp, atk, mana, max_mana, alive, team, kind in self.data[rows].tolist()]
+
+    def load_states(self, rows, states):
+        """Write the x..alive fields of `states` (UnitStates) into `rows`."""
+        self.data[rows, :STATE_FIELDS] = [s[2:] for s in states]
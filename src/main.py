@@ -1,31 +1,65 @@
+import os
 import pygame
+from config import FUZZY_PARAMS_FILE
 from screen_manager import ScreenManager
 
-def main():
+def main(seed=None, replay=None, step_delay=0.3):
+    """Run the game window.
+
+    Args:
+        seed: Seed for every run (random when None).
+        replay: Optional ReplayLog to play back instead of taking input.
+        step_delay: Seconds between replayed commands.
+    """
     pygame.init()
 
+    if os.path.isfile(FUZZY_PARAMS_FILE):
+        from ai import fuzzy_logic
+        try:
+            fuzzy_logic.load_params(FUZZY_PARAMS_FILE)
+            print(f"✓ Tuned fuzzy parameters loaded: {FUZZY_PARAMS_FILE}")
+        except (OSError, ValueError, KeyError) as ex:
+            print(f"✗ Could not load fuzzy parameters: {ex}")
+
     screen_size = (1200, 800)
     screen = pygame.display.set_mode(screen_size)
     pygame.display.set_caption("Screen Manager - PyGame OOP")
 
     clock = pygame.time.Clock()
-    manager = ScreenManager(screen_size)
+    manager = ScreenManager(screen_size, seed=seed)
+    if manager.ai_worker is not None:
+        manager.ai_worker.start()  # warm up while the menus are shown
 
-    running = True
-    while running:
-        dt = clock.tick(60) / 1000.0
+    player = None
+    if replay is not None:
+        from replay_player import ReplayPlayer
+        player = ReplayPlayer(manager, replay, step_delay)
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            else:
-                manager.handle_event(event)
+    running = True
+    try:
+        while running:
+            dt = clock.tick(60) / 1000.0
 
-        manager.update(dt)
-        manager.draw(screen)
-        pygame.display.flip()
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                else:
+                    manager.handle_event(event)
 
-    pygame.quit()
+            if player is not None:
+                player.update(dt)
+            manager.update(dt)
+            rects = manager.draw(screen)
+            if rects is None:
+                pygame.display.flip()
+            elif rects:  # scenes on a DirtyLayer report only what changed
+                pygame.display.update(rects)
+    finally:
+        # also on errors, so a streamed replay is never left without its footer
+        manager.save_replay()
+        if manager.ai_worker is not None:
+            manager.ai_worker.close()
+        pygame.quit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,63 @@
+"""Plays a recorded run through the real scenes, one command at a time."""
+from engine.params import game_params
+from engine.replay import check_replay, ReplayController, ReplayMismatch
+
+
+class ReplayPlayer:
+    """Feeds a ReplayLog into a ScreenManager as if the player were clicking.
+
+    Battles are started through the same ScreenManager.start_* factories as
+    the campfire buttons, so the run RNG and rendering follow the original
+    session exactly.
+    """
+
+    def __init__(self, manager, log, step_delay=0.3):
+        """
+        Args:
+            manager: ScreenManager to drive.
+            log: ReplayLog to play.
+            step_delay: Seconds between replayed commands.
+        """
+        self.manager = manager
+        self.log = log
+        self.step_delay = step_delay
+        self.timer = 0.0
+        self.pending = list(log.battles())
+        self.commands = []
+        self.battle = None
+        self.finished = False
+
+        manager.save_replays = False
+        manager.params_overrides = dict(log.overrides)
+        manager.params = game_params(log.overrides)
+        log.apply_fuzzy_params()
+        manager.forced_inference = log.inference
+        manager.reset_score(log.seed)
+
+    def update(self, dt):
+        if self.finished:
+            return
+        self.timer += dt
+        if self.timer < self.step_delay:
+            return
+        self.timer = 0.0
+
+        screen = self.manager.current_screen
+        in_battle = self.battle is not None and screen is self.battle and not self.battle.engine.is_over
+        if in_battle:
+            if self.commands and self.battle.turn == 'PLAYER':
+                self.battle.apply_command(self.commands.pop(0))
+            return
+        if self.pending:
+            kind, _, self.commands, decisions = self.pending.pop(0)
+            getattr(self.manager, f'start_{kind}')()
+            self.battle = self.manager.screens['battle']
+            self.battle.engine.controllers = ReplayController.for_battle(decisions)
+            self.battle.ai_worker = None  # every decision comes from the recording
+            return
+        self.finished = True
+        try:
+            check_replay(self.log, self.manager.replay)
+            print(f"✓ Replay finished: {self.log.battle_count} battles, seed {self.log.seed}")
+        except ReplayMismatch as ex:
+            print(f"✗ {ex}")
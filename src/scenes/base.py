@@ -1,5 +1,8 @@
 import pygame
 
+from ui.widgets import WidgetGroup
+
+
 class ScreenBase:
     def __init__(self, manager, screen_size: tuple[int, int]):
         self.manager = manager
@@ -20,4 +23,57 @@ class ScreenBase:
         raise NotImplementedError
 
     def draw(self, surface):
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+class MenuScreen(ScreenBase):
+    """A menu drawn from a cached composite plus retained-mode buttons.
+
+    Subclasses paint everything except their buttons in compose() and put
+    the buttons in self.widgets. The composite is built in on_enter() and
+    again only when composite_key(), the data it shows, changes; buttons
+    are redrawn over it when their hover or enabled state changes. So an
+    idle frame draws nothing, and a hover is one or two button blits.
+    """
+
+    def __init__(self, manager, screen_size: tuple[int, int]):
+        super().__init__(manager, screen_size)
+        self.widgets = WidgetGroup()
+        self.composite = pygame.Surface(screen_size).convert()
+        self._composite_key = None
+        self._composed = False
+
+    def on_enter(self):
+        """Rebuild the composite; another screen drew over the display."""
+        self.refresh_composite(force=True)
+
+    def composite_key(self):
+        """The data compose() shows; the composite is rebuilt when it changes."""
+        return None
+
+    def compose(self, surface):
+        """Paint the screen without its buttons onto `surface`."""
+        raise NotImplementedError
+
+    def refresh_composite(self, force=False):
+        """Rebuild the composite if forced or its data changed."""
+        key = self.composite_key()
+        if force or not self._composed or key != self._composite_key:
+            self._composite_key = key
+            self._composed = True
+            self.compose(self.composite)
+            self.widgets.invalidate()
+
+    def handle_event(self, event):
+        self.widgets.handle_event(event)
+
+    def update(self, dt):
+        pass
+
+    def draw(self, surface):
+        """Draw what changed since the last frame.
+
+        Returns:
+            The rects drawn for pygame.display.update ([] when idle).
+        """
+        self.refresh_composite()
+        return self.widgets.draw(surface, self.composite)
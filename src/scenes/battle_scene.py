@@ -1,140 +1,101 @@
 """Tactical grid-based battle scene with turn-based combat."""
 import pygame
-import os
 from scenes.base import ScreenBase
 from config import (
     PLAYER_HEAL_COST,
     PLAYER_HEAL_AMOUNT,
-    ENEMY_HEAL_COST,
-    ENEMY_HEAL_AMOUNT,
-    GRID_W,
-    GRID_H,
-    ENDERMAN_ESCAPE_TURN,
-    MAP_BLOCKED_TILES
+    AI_DIFFICULTY,
+    HINTS_ENABLED,
+    ENEMY_PHASE_BUDGET_MS,
 )
-from entities.player import Player
-from entities.enemies import Zombie, Skeleton, Enderman
-from entities.boss import Boss
-from ai import fuzzy_logic as fuzzy
-from utils import bfs_reachable
+from ai.hints import HintEngine
+from ai.mcts import controllers_for
+from engine.battle_engine import BattleEngine
 from scenes.components.battle_assets import BattleAssetLoader
 from scenes.components.battle_renderer import BattleRenderer
 from scenes.components.battle_ui import BattleUIManager
+from scenes.components.dirty_layer import DirtyLayer
+from scenes.components.unit_animator import UnitAnimator
+from ui.text_cache import sys_font
 
 
 class TurnBasedGrid(ScreenBase):
     """Turn-based grid with player and enemy units. Enemies use fuzzy logic for AI.
     Supports either `enemies` (list of dicts for simultaneous multi-enemy)
     or `stages` (list of enemy type names for sequential single-enemy stages).
+
+    The rules live in engine.BattleEngine; this scene only turns input into
+    engine commands and engine events into sounds, messages and scene changes.
+
+    `engine` resumes an already running BattleEngine. With `autoplay` (a
+    sim.policies player policy) the battle fast-forwards: one player turn
+    per frame, drawn only every `render_every` turns, with input ignored.
+
+    With hints on (T, default HINTS_ENABLED) an ai.hints.HintEngine
+    searches the player's best command in the background and the board
+    highlights it.
+
+    The enemy phase is not played inside the input event that ends the
+    player turn: update() plays it in slices of ENEMY_PHASE_BUDGET_MS per
+    frame (BattleEngine.step_enemy_phase), and a UnitAnimator slides and
+    lunges the units as their actions resolve. With the manager's
+    ai.worker.AIWorker, search and Mamdani decisions are made in its pool
+    and update() only polls for them.
     """
-    def __init__(self, manager, screen_size, enemies: list[dict] = None, stages: list[str] = None, next_scene=None, forced_inference=None, reward_levels=0, is_miniboss=False):
+    def __init__(self, manager, screen_size, enemies: list[dict] = None, stages: list[str] = None, next_scene=None, forced_inference=None, reward_levels=0, is_miniboss=False,
+                 engine=None, autoplay=None, render_every=1):
         super().__init__(manager, screen_size)
-        
-        # RPG parameters
-        self.reward_levels = reward_levels
-        self.is_miniboss = is_miniboss
 
-        self.grid_w = GRID_W
-        self.grid_h = GRID_H
+        self.resumed = engine is not None
+        self.engine = engine or BattleEngine(manager, enemies=enemies, stages=stages,
+                                             forced_inference=forced_inference,
+                                             reward_levels=reward_levels, is_miniboss=is_miniboss,
+                                             controllers=controllers_for(AI_DIFFICULTY))
+        # enemies act from update(), a time slice per frame
+        self.engine.defer_enemy_phase = True
+        self.next_scene = next_scene
+        self.autoplay = autoplay
+        self.render_every = max(1, render_every)
+        self.hints = HintEngine() if HINTS_ENABLED else None
+        self.ai_worker = getattr(manager, 'ai_worker', None)
+
+        self.grid_w = self.engine.grid_w
+        self.grid_h = self.engine.grid_h
         usable_h = self.screen_height - 120
         self.tile = min(self.screen_width // self.grid_w, usable_h // self.grid_h)
         # align grid to top-left
         self.origin_x = 0
         self.origin_y = 0
 
-        # Find valid player spawn position (avoid blocked tiles)
-        player_x, player_y = 1, self.grid_h // 2
-        if (player_x, player_y) in MAP_BLOCKED_TILES:
-            # Find nearest valid position
-            for px in range(self.grid_w):
-                for py in range(self.grid_h):
-                    if (px, py) not in MAP_BLOCKED_TILES:
-                        player_x, player_y = px, py
-                        break
-                else:
-                    continue
-                break
-        
-        # player - use persistent stats from manager
-        self.player = Player(player_x, player_y, stats=self.manager.player_stats)
-        
-        # boss damage boost
-        if stages and 'Boss' in stages:
-            self.player.atk += 5  # boost +5 ATK for boss fight
-
-        # support either simultaneous enemies or sequential stages
-        self.stages = stages
-        self.stage_index = 0
-        self.forced_inference = forced_inference
-        self.next_scene = next_scene
-
-        # build initial enemies list
-        self.enemies = []
-        if stages and len(stages) > 0:
-            # start with first stage as a single enemy
-            etype = stages[0]
-            ex, ey = self._find_valid_enemy_spawn()
-            if etype == 'Zombie':
-                self.enemies.append(Zombie(ex, ey))
-            elif etype == 'Skeleton':
-                self.enemies.append(Skeleton(ex, ey))
-            elif etype == 'Enderman':
-                self.enemies.append(Enderman(ex, ey))
-            elif etype == 'Boss':
-                self.enemies.append(Boss(ex, ey))
-            else:
-                self.enemies.append(Zombie(ex, ey))  # default fallback
-        else:
-            enemies = enemies or []
-            for e in enemies:
-                etype = e.get('type')
-                ex = e.get('x', self.grid_w-2)
-                ey = e.get('y', self.grid_h//2)
-                # Validate spawn position against blocked tiles
-                if (ex, ey) in MAP_BLOCKED_TILES:
-                    ex, ey = self._find_valid_enemy_spawn()
-                if etype == 'Zombie':
-                    self.enemies.append(Zombie(ex, ey))
-                elif etype == 'Skeleton':
-                    self.enemies.append(Skeleton(ex, ey))
-                elif etype == 'Enderman':
-                    self.enemies.append(Enderman(ex, ey))
-                elif etype == 'Boss':
-                    self.enemies.append(Boss(ex, ey))
-                else:
-                    self.enemies.append(Zombie(ex, ey))  # default fallback
-
         # Initialize asset loader component and load all assets
         self.asset_loader = BattleAssetLoader(self.tile)
-        self.assets = self.asset_loader.load_assets(self.enemies, self.grid_w, self.grid_h)
+        # the battlefield images are drawn for the fenced 8x6 map only
+        self.assets = self.asset_loader.load_assets(self.enemies, self.grid_w, self.grid_h,
+                                                    backgrounds=self.engine.grid is None)
 
         self.cursor = [0,0]
-        self.turn = 'PLAYER'
-        self.move_range = 2
-        self.turn_count = 0  # track turn number for current battle
-        
-        # Play spawn sound for initial enemies
-        self._play_spawn_sounds()
         
         # Boss fight flag
-        self.is_boss_fight = stages and 'Boss' in stages
+        self.is_boss_fight = self.engine.is_boss_fight
 
-        # Use fuzzy logic module (already imported at module level)
-        self.fuzzy = fuzzy
-
-        self.font = pygame.font.SysFont(None, 24)
-        self.font_small = pygame.font.SysFont(None, 20)
+        self.font = sys_font(24)
+        self.font_small = sys_font(20)
         # gameplay state
         self.mode = 'IDLE'
         self.move_targets = set()
         self.message = 'Giliran PLAYER. Tekan M:move A:attack H:heal E:end.'
-        self.units = [self.player] + self.enemies
+        self.animator = UnitAnimator(self.tile)
+
+        # Play spawn sound for initial enemies
+        self._process_events()
         
         # Initialize renderer component
         self.renderer = BattleRenderer(
             self.tile, self.grid_w, self.grid_h,
-            self.origin_x, self.origin_y, self.screen_width
+            self.origin_x, self.origin_y, self.screen_width, self.screen_height
         )
+        # only what changed since the last frame is drawn (see draw)
+        self.layer = DirtyLayer()
         
         # Initialize UI manager component
         self.ui_manager = BattleUIManager(
@@ -146,43 +107,98 @@ class TurnBasedGrid(ScreenBase):
                 'end': self.btn_end
             }
         )
-    
-    def _find_valid_enemy_spawn(self):
-        """Find a valid spawn position for enemies (avoiding blocked tiles)."""
-        # Try default position first (right side of grid)
-        preferred_x = self.grid_w - 2
-        preferred_y = self.grid_h // 2
-        
-        if (preferred_x, preferred_y) not in MAP_BLOCKED_TILES:
-            return preferred_x, preferred_y
-        
-        # Search for valid position from right side of grid
-        for x in range(self.grid_w - 1, -1, -1):
-            for y in range(self.grid_h):
-                if (x, y) not in MAP_BLOCKED_TILES:
-                    return x, y
-        
-        # Fallback to center if all else fails
-        return self.grid_w // 2, self.grid_h // 2
-    
-    def _play_spawn_sounds(self):
-        """Play spawn sounds for all current enemies."""
-        for e in self.enemies:
-            if not e.alive:
-                continue
-            etype = type(e).__name__.lower()
-            sound_key = f"{etype}_spawn"
-            if sound_key in self.assets['sounds'] and self.assets['sounds'][sound_key]:
-                self.assets['sounds'][sound_key].play()
+
+    # Engine state shown by this view
+    @property
+    def player(self):
+        return self.engine.player
+
+    @property
+    def enemies(self):
+        return self.engine.enemies
+
+    @property
+    def units(self):
+        return self.engine.units
+
+    @property
+    def turn(self):
+        return self.engine.turn
+
+    @property
+    def stages(self):
+        return self.engine.stages
+
+    @property
+    def stage_index(self):
+        return self.engine.stage_index
+
+    @property
+    def turn_count(self):
+        return self.engine.turn_count
     
     def _play_sound(self, key):
         """Play a sound effect by key if it exists."""
         if key in self.assets['sounds'] and self.assets['sounds'][key]:
             self.assets['sounds'][key].play()
 
+    def _process_events(self):
+        """Apply engine events to the view: sounds, messages, scene changes.
+
+        Each sound plays at most once per call, however many enemies
+        triggered it (a wave's enemy phase is hundreds of events).
+        """
+        sounds = []
+        for ev in self.engine.drain_events():
+            etype = ev['type']
+            if etype == 'spawn':
+                if ev['unit'].alive:
+                    sounds.append(f"{type(ev['unit']).__name__.lower()}_spawn")
+            elif etype == 'player_move':
+                self.animator.move(self.player, ev['from_pos'], ev['pos'])
+            elif etype == 'player_attack':
+                sounds.append('player_attack')
+                self.animator.lunge(self.player, (ev['target'].x, ev['target'].y))
+            elif etype == 'player_heal':
+                sounds.append('heal')
+            elif etype == 'enemy_attack':
+                sounds.append(f"{type(ev['unit']).__name__.lower()}_attack")
+                self.animator.lunge(ev['unit'], (self.player.x, self.player.y))
+            elif etype == 'enemy_move':
+                # Play the teleport sound of types that have one (Enderman)
+                sounds.append(f"{type(ev['unit']).__name__.lower()}_teleport")
+                if ev['action'] != 'TELEPORT':
+                    self.animator.move(ev['unit'], ev['from_pos'], ev['pos'])
+            elif etype == 'enemy_heal':
+                sounds.append('heal')
+                print(f"{type(ev['unit']).__name__} healed +{ev['amount']} HP. Mana: {ev['unit'].mana}")
+            elif etype == 'enemy_plan':
+                print(f"{type(ev['unit']).__name__} planned {ev['choice']}: "
+                      f"{ev['nodes']} nodes, {ev['iterations']} rollouts "
+                      f"({ev.get('table_hits', 0)} cached), {ev['ms']:.1f} ms")
+            elif etype == 'stage_advance':
+                # reload enemy_frames using asset_loader
+                self.assets['enemy_frames'] = self.asset_loader.reload_enemy_frames(self.enemies)
+                self.mode = 'IDLE'
+            if ev['message']:
+                self.message = ev['message']
+        for key in dict.fromkeys(sounds):
+            self._play_sound(key)
+
+        outcome = self.engine.outcome
+        if outcome == 'defeat':
+            self.manager.go_to('end_menu')
+        elif outcome == 'victory':
+            # Use next_scene if provided (e.g., boss -> end_menu), else campfire
+            self.manager.go_to(self.next_scene or 'campfire')
+        elif outcome == 'escape':
+            self.manager.go_to(self.next_scene or 'main_menu')
+
     def on_enter(self):
         """Reset local turn counter when battle starts (global counter keeps accumulating)."""
-        self.turn_count = 0
+        if not self.resumed:
+            self.engine.turn_count = 0
+        self.layer.invalidate()  # the previous screen drew over everything
         
         # Play boss music if this is a boss fight
         if self.is_boss_fight:
@@ -195,6 +211,10 @@ class TurnBasedGrid(ScreenBase):
     
     def on_exit(self):
         """Called when leaving the battle - stop boss music if playing."""
+        if self.hints is not None:
+            self.hints.cancel()
+        if self.ai_worker is not None:
+            self.ai_worker.cancel()
         if self.is_boss_fight:
             pygame.mixer.music.stop()
 
@@ -202,9 +222,7 @@ class TurnBasedGrid(ScreenBase):
     def btn_move(self):
         if self.turn != 'PLAYER':
             return
-        self.mode = 'MOVE'
-        self.move_targets = bfs_reachable((self.player.x, self.player.y), self.move_range, {(e.x, e.y) for e in self.enemies if e.alive})
-        self.message = 'Mode MOVE. Pilih petak tujuan lalu tekan Enter.'
+        self._enter_move_mode()
     
     def btn_attack(self):
         if self.turn != 'PLAYER':
@@ -226,7 +244,23 @@ class TurnBasedGrid(ScreenBase):
             return
         self.end_turn()
 
+    def toggle_hints(self):
+        if self.hints is None:
+            self.hints = HintEngine()
+            self.message = 'Hints ON. Saran terbaik ditandai di papan.'
+        else:
+            self.hints.cancel()
+            self.hints = None
+            self.message = 'Hints OFF.'
+
+    def _enter_move_mode(self):
+        self.mode = 'MOVE'
+        self.move_targets = self.engine.move_targets()
+        self.message = 'Mode MOVE. Pilih petak tujuan lalu tekan Enter.'
+
     def handle_event(self, event):
+        if self.autoplay is not None:
+            return  # fast-forward plays by itself
         # Delegate to UI manager for button events
         self.ui_manager.handle_event(event)
         
@@ -238,12 +272,12 @@ class TurnBasedGrid(ScreenBase):
             if event.key in (pygame.K_UP, pygame.K_w): self.cursor[1] = max(0, self.cursor[1]-1)
             # mode keys
             if event.key == pygame.K_m and self.turn == 'PLAYER':
-                self.mode = 'MOVE'
-                self.move_targets = bfs_reachable((self.player.x, self.player.y), self.move_range, {(e.x, e.y) for e in self.enemies if e.alive})
-                self.message = 'Mode MOVE. Pilih petak tujuan lalu tekan Enter.'
+                self._enter_move_mode()
             if event.key in (pygame.K_a, pygame.K_SPACE) and self.turn == 'PLAYER':
                 self.mode = 'ATTACK'
                 self.message = 'Mode ATTACK. Pilih petak musuh bersebelahan lalu Enter.'
+            if event.key == pygame.K_t:
+                self.toggle_hints()
             if event.key == pygame.K_h and self.turn == 'PLAYER':
                 self.mode = 'HEAL'
                 self.message = 'Mode HEAL. Tekan Enter untuk heal (+10 HP).'
@@ -263,188 +297,41 @@ class TurnBasedGrid(ScreenBase):
                     self.confirm_action()
 
     def unit_at(self, pos):
-        for u in self.units:
-            if u.alive and (u.x, u.y) == pos:
-                return u
-        return None
+        return self.engine.unit_at(pos)
 
     def confirm_action(self):
-        cx, cy = self.cursor
         if self.turn != 'PLAYER':
             return
+        target = tuple(self.cursor)
         if self.mode == 'MOVE':
-            if (cx, cy) in self.move_targets and self.unit_at((cx, cy)) is None:
-                self.player.x, self.player.y = cx, cy
-                self.mode = 'IDLE'
-                self.move_targets = set()
-                self.message = f'Player moved to {cx},{cy}.'
-                self.end_turn()
-            else:
-                self.message = 'Lokasi tidak valid untuk MOVE.'
+            command = ('MOVE', target)
         elif self.mode == 'ATTACK':
-            target = self.unit_at((cx, cy))
-            if target and target.team != 'PLAYER' and abs(self.player.x-cx)+abs(self.player.y-cy) == 1:
-                self._play_sound('player_attack')
-                target.take_damage(self.player.atk)
-                if target.hp <= 0:
-                    target.alive = False
-                    # increment player damage on enemy defeat
-                    self.player.atk += 1
-                    self.message = f'Enemy {type(target).__name__} defeated. ATK +1 (now {self.player.atk}).'
-                else:
-                    self.message = f'Attack! Enemy HP: {max(0,target.hp)}.'
-                self.mode = 'IDLE'
-                self.end_turn()
-            else:
-                self.message = 'Target tidak valid untuk ATTACK.'
+            command = ('ATTACK', target)
         elif self.mode == 'HEAL':
-            # STEP 3.1: Player Heal with Mana cost check
-            old_hp = self.player.hp
-            if self.player.heal(PLAYER_HEAL_AMOUNT, PLAYER_HEAL_COST):
-                self._play_sound('heal')
-                healed = self.player.hp - old_hp
-                self.message = f'Player healed +{healed} HP. HP: {self.player.hp}/{self.player.max_hp}. Mana: {self.player.mana}.'
-                self.mode = 'IDLE'
-                self.end_turn()
-            else:
-                self.message = f'Not enough Mana! Need {PLAYER_HEAL_COST}, have {self.player.mana}.'
-                self.mode = 'IDLE'
+            command = ('HEAL', None)
         else:
             self.message = 'Tidak ada aksi dipilih. Tekan M/A/H atau E untuk end turn.'
+            return
+        self.apply_command(command)
 
     def end_turn(self):
         if self.turn != 'PLAYER':
             return
-        self.turn = 'ENEMY'
-        self.mode = 'IDLE'
-        self.move_targets = set()
-        self.message = 'Giliran ENEMY.'
-        self.turn_count += 1  # increment local turn counter
-        self.manager.total_run_turns += 1  # increment global turn counter
-        
-        # auto-win for Enderman at escape turn threshold
-        if self.turn_count >= ENDERMAN_ESCAPE_TURN and self.stages and any(type(e).__name__ == 'Enderman' for e in self.enemies if e.alive):
-            for e in self.enemies:
-                if type(e).__name__ == 'Enderman':
-                    e.alive = False
-            self.message = f'Turn {ENDERMAN_ESCAPE_TURN} reached! Enderman auto-defeated!'
-            if self.next_scene:
-                self.manager.go_to(self.next_scene)
-            else:
-                self.manager.go_to('main_menu')
-            return
-        # enemy actions sequentially
-        for e in self.enemies:
-            if not e.alive:
-                continue
-            self.enemy_action(e)
-            if self.player.hp <= 0:
-                break
-        # check results
-        if self.player.hp <= 0:
-            # Sync the death state (HP <= 0) to the manager so EndMenu knows we died
-            self.manager.update_player_state(self.player.hp, self.player.mana)
-            self.manager.go_to('end_menu')
-            return
-        if all(not e.alive for e in self.enemies):
-            # if sequential stages were provided, advance to next stage
-            if self.stages:
-                if self.stage_index < len(self.stages) - 1:
-                    self.stage_index += 1
-                    # spawn next single enemy at valid position
-                    etype = self.stages[self.stage_index]
-                    ex, ey = self._find_valid_enemy_spawn()
-                    if etype == 'Zombie':
-                        self.enemies = [Zombie(ex, ey)]
-                    elif etype == 'Skeleton':
-                        self.enemies = [Skeleton(ex, ey)]
-                    elif etype == 'Enderman':
-                        self.enemies = [Enderman(ex, ey)]
-                    elif etype == 'Boss':
-                        self.enemies = [Boss(ex, ey)]
-                    else:
-                        self.enemies = [Zombie(ex, ey)]  # default fallback
-                    # update self.units to include new enemy (fix for unit_at check)
-                    self.units = [self.player] + self.enemies
-                    # reload enemy_frames using asset_loader
-                    enemy_frames, enemy_anim_indexes, enemy_anim_timers = self.asset_loader.reload_enemy_frames(self.enemies)
-                    self.assets['enemy_frames'] = enemy_frames
-                    self.assets['enemy_anim_indexes'] = enemy_anim_indexes
-                    self.assets['enemy_anim_timers'] = enemy_anim_timers
-                    # Player HP persists between stages (no auto-heal)
-                    self.turn = 'PLAYER'
-                    self.mode = 'IDLE'
-                    self.message = f'Stage {self.stage_index+1}: {type(self.enemies[0]).__name__}. ATK={self.player.atk}. M:move A:attack H:heal'
-                    # Play spawn sound for the new enemy
-                    self._play_spawn_sounds()
-                    return
-                else:
-                    # All stages complete - victory!
-                    self.manager.total_run_turns -= 1  # Refund the killing blow turn
-                    self.manager.update_player_state(self.player.hp, self.player.mana)
-                    self.manager.level_up(self.reward_levels)
-                    if self.is_miniboss:
-                        self.manager.miniboss_defeated = True
-                    # Use next_scene if provided (e.g., boss -> end_menu), else campfire
-                    if self.next_scene:
-                        self.manager.go_to(self.next_scene)
-                    else:
-                        self.manager.go_to('campfire')
-                    return
-            else:
-                # All enemies dead (non-staged battle) - victory!
-                self.manager.total_run_turns -= 1  # Refund the killing blow turn
-                self.manager.update_player_state(self.player.hp, self.player.mana)
-                self.manager.level_up(self.reward_levels)
-                if self.is_miniboss:
-                    self.manager.miniboss_defeated = True
-                # Use next_scene if provided (e.g., boss -> end_menu), else campfire
-                if self.next_scene:
-                    self.manager.go_to(self.next_scene)
-                else:
-                    self.manager.go_to('campfire')
-                return
-        # back to player
-        self.turn = 'PLAYER'
-        self.message = 'Giliran PLAYER. Tekan M untuk move, A untuk attack, E untuk end turn.'
-
-    def enemy_action(self, e):
-        # simple enemy action using fuzzy.get_final_action when available
-        occupied = {(ee.x, ee.y) for ee in self.enemies if ee.alive}
-        occupied.add((self.player.x, self.player.y))
-        hp_p = int(100 * self.player.hp / max(1, self.player.max_hp))
-        hp_b = int(100 * e.hp / max(1, e.max_hp))
-        mana_p = int(self.player.mana)
-        mana_b = int(e.mana)
-        cd_p = 0
-        if self.fuzzy:
-            try:
-                action, target = self.fuzzy.get_final_action(type(e).__name__, hp_p, hp_b, mana_p, mana_b, cd_p, (e.x, e.y), (self.player.x, self.player.y), occupied, self.grid_w, self.grid_h)
-            except Exception:
-                action, target = ('MOVE_CLOSE', None)
-        else:
-            action, target = ('MOVE_CLOSE', None)
-        
-        # Get enemy type for sound keys
-        etype = type(e).__name__.lower()
-        
-        if action in ('ATTACK', 'RANGED_ATTACK'):
-            if abs(e.x - self.player.x) + abs(e.y - self.player.y) <= 2:
-                self._play_sound(f"{etype}_attack")
-                self.player.hp -= e.atk
-        elif action in ('MOVE_CLOSE', 'MOVE_RETREAT', 'TELEPORT'):
-            if target and target not in occupied and target not in MAP_BLOCKED_TILES:
-                # Play teleport sound for Enderman on move/teleport actions
-                if etype == 'enderman' and action in ('MOVE_CLOSE', 'MOVE_RETREAT', 'TELEPORT'):
-                    self._play_sound('enderman_teleport')
-                e.x, e.y = target
-        elif action == 'HEAL':
-            # STEP 3.2: Enemy Heal with Mana cost check
-            if e.mana >= ENEMY_HEAL_COST:
-                self._play_sound('heal')
-                e.hp = min(e.max_hp, e.hp + ENEMY_HEAL_AMOUNT)
-                e.mana -= ENEMY_HEAL_COST
-                print(f"{type(e).__name__} healed +{ENEMY_HEAL_AMOUNT} HP. Mana: {e.mana}")
+        self.apply_command(('END', None))
+
+    def apply_command(self, command):
+        """Submit a player command to the engine and update the view.
+
+        Used by the input handlers and by replay playback.
+        """
+        if self.hints is not None:
+            self.hints.cancel()
+        accepted = self.engine.submit(command)
+        if accepted or command[0] in ('HEAL', 'END'):
+            self.mode = 'IDLE'
+            self.move_targets = set()
+        self._process_events()
+        return accepted
 
     def update(self, dt):
         # advance animations using assets dictionary
@@ -452,56 +339,34 @@ class TurnBasedGrid(ScreenBase):
         if self.assets['player_anim_timer'] >= self.assets['player_anim_speed']:
             self.assets['player_anim_timer'] = 0
             self.assets['player_anim_index'] = (self.assets['player_anim_index'] + 1) % len(self.assets['player_frames'])
-        for i, frames in enumerate(self.assets['enemy_frames']):
-            self.assets['enemy_anim_timers'][i] += 1
-            if self.assets['enemy_anim_timers'][i] >= 8:
-                self.assets['enemy_anim_timers'][i] = 0
-                self.assets['enemy_anim_indexes'][i] = (self.assets['enemy_anim_indexes'][i] + 1) % max(1, len(frames))
-
-        if self.turn == 'ENEMY':
-            occupied = {(e.x, e.y) for e in self.enemies if e.alive}
-            occupied.add((self.player.x, self.player.y))
-            for e in self.enemies:
-                if not e.alive: continue
-                hp_p = int(100 * self.player.hp / max(1, self.player.max_hp))
-                hp_b = int(100 * e.hp / max(1, e.max_hp))
-                mana_p = int(self.player.mana)
-                mana_b = int(e.mana)
-                cd_p = 0
-                if self.fuzzy:
-                    try:
-                        action, target = self.fuzzy.get_final_action(type(e).__name__, hp_p, hp_b, mana_p, mana_b, cd_p, (e.x, e.y), (self.player.x, self.player.y), occupied, self.grid_w, self.grid_h)
-                    except Exception:
-                        action, target = ('MOVE_CLOSE', None)
-                else:
-                    action, target = ('MOVE_CLOSE', None)
-                if action in ('ATTACK','RANGED_ATTACK'):
-                    if abs(e.x-self.player.x)+abs(e.y-self.player.y) <= 2:
-                        self.player.hp -= e.atk
-                elif action in ('MOVE_CLOSE','MOVE_RETREAT','TELEPORT'):
-                    if target and target not in occupied and target not in MAP_BLOCKED_TILES:
-                        e.x, e.y = target
-                elif action == 'HEAL':
-                    # STEP 3.2: Enemy Heal with Mana cost check (update method)
-                    if e.mana >= ENEMY_HEAL_COST:
-                        e.hp = min(e.max_hp, e.hp + ENEMY_HEAL_AMOUNT)
-                        e.mana -= ENEMY_HEAL_COST
-
-            if self.player.hp <= 0:
-                # Sync the death state (HP <= 0) to the manager so EndMenu knows we died
-                self.manager.update_player_state(self.player.hp, self.player.mana)
-                self.manager.go_to('end_menu')
-                return
-            if all(not e.alive for e in self.enemies):
-                if self.next_scene:
-                    self.manager.go_to(self.next_scene)
-                else:
-                    self.manager.go_to('main_menu')
-                return
-            self.turn = 'PLAYER'
-            self.mode = 'IDLE'
+        # one clock for every enemy; the renderer picks each type's frame from it
+        self.assets['enemy_anim_tick'] += 1
+        self.animator.update(dt)
+
+        # enemy phase: as many enemies as fit in this frame's budget
+        if self.engine.enemy_phase_pending:
+            if self.ai_worker is not None:
+                self.ai_worker.step_phase(self.engine, ENEMY_PHASE_BUDGET_MS)
+            else:
+                self.engine.step_enemy_phase(ENEMY_PHASE_BUDGET_MS)
+            self._process_events()
+
+        # fast-forward: one player turn per frame
+        if self.autoplay is not None and self.turn == 'PLAYER' and not self.engine.is_over:
+            if not self.apply_command(self.autoplay(self.engine)):
+                self.apply_command(('END', None))
+        elif self.hints is not None and self.turn == 'PLAYER' and not self.engine.is_over:
+            self.hints.request(self.engine)  # no-op while the position is unchanged
 
     def draw(self, surface):
+        """Draw the frame's changes.
+
+        Returns:
+            The rects drawn, for pygame.display.update ([] when nothing
+            changed).
+        """
+        if self.autoplay is not None and self.turn_count % self.render_every and not self.engine.is_over:
+            return []  # fast-forward: keep the last drawn turn on screen
         # Build game state dictionary for renderer
         game_state = {
             'player': self.player,
@@ -511,11 +376,18 @@ class TurnBasedGrid(ScreenBase):
             'move_targets': self.move_targets,
             'message': self.message,
             'turn': self.turn,
-            'total_run_turns': self.manager.total_run_turns
+            'total_run_turns': self.manager.total_run_turns,
+            'hint': self.hints.hint_for(self.engine) if self.hints is not None else None,
+            'offsets': self.animator.offsets(),
         }
         
         # Delegate rendering to the renderer component
-        self.renderer.draw(surface, self.assets, game_state)
+        self.renderer.draw(self.layer, self.assets, game_state)
         
         # Delegate UI drawing to the UI manager component
-        self.ui_manager.draw(surface)
+        self.ui_manager.draw(self.layer)
+        self._draw_overlay(self.layer)
+        return self.layer.end(surface)
+
+    def _draw_overlay(self, layer):
+        """Add scene-specific items above the UI (none here)."""
@@ -1,11 +1,13 @@
 """Campfire Hub Screen - Central menu for the RPG overhaul."""
 import pygame
 import os
-from scenes.base import ScreenBase
+from config import FAST_FORWARD_EVERY, WAVE_ENEMY_COUNT, WAVE_REWARD_LEVELS
+from scenes.base import MenuScreen
 from ui.button import Button
+from ui.text_cache import draw_fields, render_text, sys_font
 
 
-class CampfireScreen(ScreenBase):
+class CampfireScreen(MenuScreen):
     """Hub screen where the player can choose their next action."""
     
     def __init__(self, manager, screen_size):
@@ -20,11 +22,21 @@ class CampfireScreen(ScreenBase):
         except Exception:
             self.bg = None
         
+        # Background darkened by a semi-transparent overlay for readability, built once
+        self.backdrop = pygame.Surface(screen_size).convert()
+        if self.bg:
+            self.backdrop.blit(self.bg, (0, 0))
+        else:
+            self.backdrop.fill((30, 30, 50))
+        overlay = pygame.Surface(screen_size, pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 150))
+        self.backdrop.blit(overlay, (0, 0))
+        
         # Fonts
-        self.font_title = pygame.font.SysFont(None, 56)
-        self.font_stats = pygame.font.SysFont(None, 32)
-        self.font_button = pygame.font.SysFont(None, 28)
-        self.font_tooltip = pygame.font.SysFont(None, 22)
+        self.font_title = sys_font(56)
+        self.font_stats = sys_font(32)
+        self.font_button = sys_font(28)
+        self.font_tooltip = sys_font(22)
         
         # Button layout
         cx = screen_size[0] // 2
@@ -37,25 +49,43 @@ class CampfireScreen(ScreenBase):
                    bg_color=(100, 50, 50)),
             Button("Retire / Main Menu", (cx, cy + 180), (220, 45), self.go_main_menu, self.font_button,
                    bg_color=(80, 80, 80)),
+            Button("Auto Hunt", (cx + 200, cy), (150, 45), self.auto_hunt, self.font_button,
+                   bg_color=(50, 90, 60)),
+            Button("Fast Hunt", (cx + 360, cy), (150, 45), self.fast_hunt, self.font_button,
+                   bg_color=(50, 70, 100)),
+            Button("Wave Battle", (cx + 200, cy + 60), (150, 45), self.start_wave, self.font_button,
+                   bg_color=(90, 60, 100)),
         ]
         
-        # Assign tooltips
+        # Assign tooltips (the button draws them; disabled ones get their own)
         self.buttons[0].tooltip = "3 Stages. Reward: +1 Lv"
         self.buttons[1].tooltip = "Hard! Reward: +3 Lv, Unlocks Boss"
+        self.buttons[1].disabled_tooltip = "Already Defeated"
         self.buttons[2].tooltip = "Final Battle! Requires Miniboss Defeated"
+        self.buttons[2].disabled_tooltip = "Defeat the Miniboss first!"
         self.buttons[3].tooltip = "Return to Main Menu"
+        self.buttons[4].tooltip = "Resolve a hunt instantly with the auto player"
+        self.buttons[5].tooltip = f"Watch the auto player, every {FAST_FORWARD_EVERY}th turn"
+        self.buttons[6].tooltip = f"{WAVE_ENEMY_COUNT} enemies at once. Reward: +{WAVE_REWARD_LEVELS} Lv"
+        for b in self.buttons:
+            b.tooltip_font = self.font_tooltip
+        self.widgets.widgets = self.buttons
+
+        # Result line of the last auto hunt
+        self.notice = None
         
         # Load background music
         self.music_path = os.path.join(base_path, "..", "..", "assets", "sounds", "Castle In The Mist.mp3")
     
     def on_enter(self):
-        """Called when entering the campfire screen - play background music."""
+        """Called when entering the campfire screen - play background music and compose it."""
         try:
             pygame.mixer.music.load(self.music_path)
             pygame.mixer.music.set_volume(0.3)
             pygame.mixer.music.play(loops=-1)
         except Exception as e:
             print(f"Warning: Could not load background music: {e}")
+        super().on_enter()
     
     def on_exit(self):
         """Called when leaving the campfire screen - stop background music."""
@@ -63,7 +93,19 @@ class CampfireScreen(ScreenBase):
     
     def start_hunt(self):
         self.manager.start_hunt()
+
+    def auto_hunt(self):
+        result = self.manager.auto_hunt()
+        self.notice = f"Auto hunt: {result['outcome']} in {result['turns']} turns"
+
+    def fast_hunt(self):
+        self.notice = None
+        self.manager.start_hunt(fast_forward=True)
     
+    def start_wave(self):
+        self.notice = None
+        self.manager.start_wave()
+
     def start_miniboss(self):
         self.manager.start_miniboss()
     
@@ -75,33 +117,22 @@ class CampfireScreen(ScreenBase):
     def go_main_menu(self):
         self.manager.go_to('main_menu')
     
-    def handle_event(self, event):
-        for b in self.buttons:
-            # Skip boss button if miniboss not defeated
-            if b.text == "Enter Boss Lair" and not self.manager.miniboss_defeated:
-                continue
-            # Skip miniboss button if already defeated
-            if b.text == "Challenge Miniboss" and self.manager.miniboss_defeated:
-                continue
-            b.handle_event(event)
-    
-    def update(self, dt):
-        pass
-    
-    def draw(self, surface):
-        # Draw background
-        if self.bg:
-            surface.blit(self.bg, (0, 0))
-        else:
-            surface.fill((30, 30, 50))
-        
-        # Draw semi-transparent overlay for readability
-        overlay = pygame.Surface((self.screen_width, self.screen_height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 150))
-        surface.blit(overlay, (0, 0))
+    def composite_key(self):
+        stats = self.manager.player_stats
+        return (tuple(stats.values()), self.manager.total_run_turns,
+                self.manager.miniboss_defeated, self.notice)
+
+    def compose(self, surface):
+        # Boss lair opens, and the miniboss closes, once the miniboss is defeated
+        # (disabled buttons ignore clicks but still show their tooltip)
+        self.buttons[1].enabled = not self.manager.miniboss_defeated
+        self.buttons[2].enabled = self.manager.miniboss_defeated
+
+        # Draw darkened background
+        surface.blit(self.backdrop, (0, 0))
         
         # Draw title
-        title = self.font_title.render("CAMPFIRE", True, (255, 215, 0))
+        title = render_text(self.font_title, "CAMPFIRE", True, (255, 215, 0))
         tw = title.get_width()
         surface.blit(title, ((self.screen_width - tw) // 2, 50))
         
@@ -119,20 +150,18 @@ class CampfireScreen(ScreenBase):
         
         # Stats text
         stat_lines = [
-            f"Level: {stats['level']}",
-            f"HP: {stats['hp']} / {stats['max_hp']}",
-            f"ATK: {stats['atk']}",
-            f"Mana: {stats['mana']} / {stats['max_mana']}",
+            (("Level: ", stats['level']),),
+            (("HP: ", stats['hp']), (" / ", stats['max_hp'])),
+            (("ATK: ", stats['atk']),),
+            (("Mana: ", stats['mana']), (" / ", stats['max_mana'])),
         ]
         
-        for i, line in enumerate(stat_lines):
-            stat_surf = self.font_stats.render(line, True, (200, 255, 200))
-            surface.blit(stat_surf, (panel_x + 20, panel_y + 15 + i * 30))
+        for i, fields in enumerate(stat_lines):
+            draw_fields(surface, self.font_stats, fields, (200, 255, 200), (panel_x + 20, panel_y + 15 + i * 30))
         
         # Draw turn counter
-        turn_text = f"Total Turns: {self.manager.total_run_turns}"
-        turn_surf = self.font_stats.render(turn_text, True, (150, 200, 255))
-        surface.blit(turn_surf, (self.screen_width - 220, 20))
+        draw_fields(surface, self.font_stats, (("Total Turns: ", self.manager.total_run_turns),),
+                    (150, 200, 255), (self.screen_width - 220, 20))
         
         # Draw miniboss status
         if self.manager.miniboss_defeated:
@@ -141,52 +170,9 @@ class CampfireScreen(ScreenBase):
         else:
             status_text = "✗ Miniboss Not Defeated"
             status_color = (255, 100, 100)
-        status_surf = self.font_stats.render(status_text, True, status_color)
+        status_surf = render_text(self.font_stats, status_text, True, status_color)
         surface.blit(status_surf, (panel_x + 20, panel_y + panel_h + 10))
-        
-        # Draw buttons
-        for b in self.buttons:
-            # Grey out boss button if miniboss not defeated
-            if b.text == "Enter Boss Lair" and not self.manager.miniboss_defeated:
-                # Draw greyed out button
-                grey_rect = b.rect.copy()
-                pygame.draw.rect(surface, (60, 60, 60), grey_rect, border_radius=8)
-                pygame.draw.rect(surface, (100, 100, 100), grey_rect, 2, border_radius=8)
-                grey_text = self.font_button.render(b.text, True, (100, 100, 100))
-                text_rect = grey_text.get_rect(center=grey_rect.center)
-                surface.blit(grey_text, text_rect)
-            # Grey out miniboss button if already defeated
-            elif b.text == "Challenge Miniboss" and self.manager.miniboss_defeated:
-                # Draw greyed out button
-                grey_rect = b.rect.copy()
-                pygame.draw.rect(surface, (60, 60, 60), grey_rect, border_radius=8)
-                pygame.draw.rect(surface, (100, 100, 100), grey_rect, 2, border_radius=8)
-                grey_text = self.font_button.render(b.text, True, (100, 100, 100))
-                text_rect = grey_text.get_rect(center=grey_rect.center)
-                surface.blit(grey_text, text_rect)
-            else:
-                b.draw(surface)
-        
-        # Draw tooltips on hover
-        mx, my = pygame.mouse.get_pos()
-        for b in self.buttons:
-            if hasattr(b, 'tooltip') and b.rect.collidepoint((mx, my)):
-                # Custom tooltip for disabled boss button
-                if b.text == "Enter Boss Lair" and not self.manager.miniboss_defeated:
-                    tooltip_text = "Defeat the Miniboss first!"
-                # Custom tooltip for defeated miniboss
-                elif b.text == "Challenge Miniboss" and self.manager.miniboss_defeated:
-                    tooltip_text = "Already Defeated"
-                else:
-                    tooltip_text = b.tooltip
-                
-                tooltip_surf = self.font_tooltip.render(tooltip_text, True, (255, 255, 200))
-                tooltip_rect = tooltip_surf.get_rect()
-                tooltip_rect.midbottom = (b.rect.centerx, b.rect.top - 5)
-                
-                # Draw tooltip background
-                bg_rect = tooltip_rect.inflate(10, 6)
-                pygame.draw.rect(surface, (50, 50, 50), bg_rect, border_radius=4)
-                pygame.draw.rect(surface, (200, 200, 150), bg_rect, 1, border_radius=4)
-                surface.blit(tooltip_surf, tooltip_rect)
-                break
+
+        if self.notice:
+            notice_surf = render_text(self.font_tooltip, self.notice, True, (255, 255, 200))
+            surface.blit(notice_surf, (panel_x + 20, panel_y + panel_h + 40))
@@ -2,5 +2,8 @@
 from scenes.components.battle_assets import BattleAssetLoader
 from scenes.components.battle_renderer import BattleRenderer
 from scenes.components.battle_ui import BattleUIManager
+from scenes.components.dirty_layer import DirtyLayer
+from scenes.components.frame_timer import FrameTimer
+from scenes.components.unit_animator import UnitAnimator
 
-__all__ = ['BattleAssetLoader', 'BattleRenderer', 'BattleUIManager']
+__all__ = ['BattleAssetLoader', 'BattleRenderer', 'BattleUIManager', 'DirtyLayer', 'FrameTimer', 'UnitAnimator']
@@ -1,19 +1,21 @@
 """Asset loading component for battle scene."""
 import pygame
 import os
+from entities.registry import ENEMY_ARCHETYPES, archetype
 from utils import scale_preserve
 
 
 class BattleAssetLoader:
-    """Handles all asset loading for the battle scene including images and sounds."""
+    """Handles all asset loading for the battle scene including images and sounds.
     
-    # Frame counts for spritesheet extraction
-    FRAME_COUNTS = {
-        'Zombie': 6,
-        'Skeleton': 7,
-        'Enderman': 14,
-        'Boss': 8,
-    }
+    Enemy frames and sounds come from the enemy archetypes and are loaded
+    once per process; every battle (and every enemy of a type) shares them.
+    """
+    
+    # (type name, tile size) -> frames, shared by all loaders
+    _frame_cache = {}
+    # sound key -> pygame Sound (or None), filled by the first load
+    _sound_cache = None
     
     def __init__(self, tile_size: int):
         """Initialize the asset loader.
@@ -24,22 +26,24 @@ class BattleAssetLoader:
         self.tile = tile_size
         self.repo = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
     
-    def load_assets(self, enemies_list: list, grid_w: int, grid_h: int) -> dict:
+    def load_assets(self, enemies_list: list, grid_w: int, grid_h: int, backgrounds: bool = True) -> dict:
         """Load all assets required for battle.
         
         Args:
             enemies_list: List of enemy entity objects.
             grid_w: Grid width in tiles.
             grid_h: Grid height in tiles.
+            backgrounds: Load the battlefield images; without them the
+                renderer draws a plain grid (used for enlarged wave grids).
             
         Returns:
             Dictionary containing all loaded assets:
             - player_frames: list of player animation surfaces
             - battlefield_bg: background surface for regular battles
             - boss_battle_bg: background surface for boss battles
-            - enemy_frames: list of frame lists per enemy
-            - enemy_anim_indexes: list of animation indexes per enemy
-            - enemy_anim_timers: list of animation timers per enemy
+            - enemy_frames: dict of shared frame lists per enemy type name
+            - enemy_anim_tick: frame counter driving every enemy animation
+            - enemy_anim_speed: ticks per enemy animation frame
             - sounds: dict of sound objects keyed by name
             - boss_music_path: path to boss music file
         """
@@ -52,13 +56,15 @@ class BattleAssetLoader:
         assets['player_anim_speed'] = 8
         
         # Load backgrounds
-        assets['battlefield_bg'], assets['boss_battle_bg'] = self._load_backgrounds(grid_w, grid_h)
+        if backgrounds:
+            assets['battlefield_bg'], assets['boss_battle_bg'] = self._load_backgrounds(grid_w, grid_h)
+        else:
+            assets['battlefield_bg'] = assets['boss_battle_bg'] = None
         
-        # Load enemy frames
-        enemy_frames, enemy_anim_indexes, enemy_anim_timers = self._load_enemy_frames(enemies_list)
-        assets['enemy_frames'] = enemy_frames
-        assets['enemy_anim_indexes'] = enemy_anim_indexes
-        assets['enemy_anim_timers'] = enemy_anim_timers
+        # Load enemy frames; all enemies of a type show the same frame
+        assets['enemy_frames'] = self._load_enemy_frames(enemies_list)
+        assets['enemy_anim_tick'] = 0
+        assets['enemy_anim_speed'] = 8
         
         # Load sounds
         assets['sounds'] = self._load_sounds()
@@ -69,14 +75,14 @@ class BattleAssetLoader:
         
         return assets
     
-    def reload_enemy_frames(self, enemies_list: list) -> tuple:
+    def reload_enemy_frames(self, enemies_list: list) -> dict:
         """Reload enemy frames for a new set of enemies (e.g., stage progression).
         
         Args:
             enemies_list: List of enemy entity objects.
             
         Returns:
-            Tuple of (enemy_frames, enemy_anim_indexes, enemy_anim_timers)
+            Dict of frame lists per enemy type name.
         """
         return self._load_enemy_frames(enemies_list)
     
@@ -157,107 +163,111 @@ class BattleAssetLoader:
         
         return battlefield_bg, boss_battle_bg
     
-    def _load_enemy_frames(self, enemies_list: list) -> tuple:
-        """Load animated frames for all enemies.
+    def _load_enemy_frames(self, enemies_list: list) -> dict:
+        """Load animated frames for every enemy type present.
+        
+        Enemies of the same type share one frame list (see enemy_frames).
         
         Args:
             enemies_list: List of enemy entity objects.
             
         Returns:
-            Tuple of (enemy_frames, enemy_anim_indexes, enemy_anim_timers).
+            Dict of frame lists per enemy type name.
         """
-        enemy_frames = []
-        enemy_anim_indexes = []
-        enemy_anim_timers = []
+        types = dict.fromkeys(type(e).__name__ for e in enemies_list)
+        return {et: self.enemy_frames(et) for et in types}
+    
+    def enemy_frames(self, et: str) -> list:
+        """Shared animation frames of enemy type `et`, loaded once per tile size.
         
-        for e in enemies_list:
-            et = type(e).__name__
-            name = et.lower()
-            frames = []
-            loaded = False
+        Args:
+            et: Enemy type name (a key of ENEMY_ARCHETYPES).
             
-            enemy_paths = [
-                os.path.join(self.repo, 'assets', name)
-            ]
+        Returns:
+            List of surfaces; do not modify, other enemies use it too.
+        """
+        key = (et, self.tile)
+        frames = self._frame_cache.get(key)
+        if frames is None:
+            frames = self._frame_cache[key] = self._load_archetype_frames(archetype(et))
+        return frames
+    
+    def _load_archetype_frames(self, arch) -> list:
+        """Load one archetype's frames from its spritesheet or frame files.
+        
+        Args:
+            arch: EnemyArchetype to load.
             
-            for enemy_dir in enemy_paths:
-                if loaded:
-                    break
-                    
-                # Try spritesheet first (Idle.png or idle.png - case insensitive)
-                sheet_path = None
-                for fname in ['Idle.png', 'idle.png']:
-                    test_path = os.path.join(enemy_dir, fname)
-                    if os.path.isfile(test_path):
-                        sheet_path = test_path
-                        break
-                        
-                if sheet_path:
-                    try:
-                        sheet = pygame.image.load(sheet_path).convert_alpha()
-                        n = self.FRAME_COUNTS.get(et, 6)
-                        fw = sheet.get_width() // max(1, n)
-                        fh = sheet.get_height()
-                        # Boss uses larger sprite size
-                        sprite_size = (self.tile + 100, self.tile + 100) if et == 'Boss' else (self.tile + 30, self.tile + 30)
-                        for i in range(n):
-                            sub = sheet.subsurface((i*fw, 0, fw, fh))
-                            frames.append(scale_preserve(sub, sprite_size))
-                        print(f"✓ Loaded {et} spritesheet ({n} frames) from {sheet_path}")
-                        loaded = True
-                        break
-                    except Exception as ex:
-                        print(f"✗ Failed loading {et} sheet from {sheet_path}: {ex}")
-                        
-                # Try individual files
-                if os.path.isdir(enemy_dir):
-                    try:
-                        files = sorted([f for f in os.listdir(enemy_dir) if f.lower().endswith('.png')])
-                        if files:
-                            sprite_size = (self.tile + 100, self.tile + 100) if et == 'Boss' else (self.tile + 30, self.tile + 30)
-                            for f in files:
-                                p = os.path.join(enemy_dir, f)
-                                img = pygame.image.load(p).convert_alpha()
-                                frames.append(scale_preserve(img, sprite_size))
-                            print(f"✓ Loaded {et} from {enemy_dir} ({len(frames)} frames)")
-                            loaded = True
-                            break
-                    except Exception as ex:
-                        print(f"✗ Failed loading {et} from {enemy_dir}: {ex}")
-                        
-            if not frames:
-                print(f"WARNING: No frames for {et}, using fallback")
-                surf = pygame.Surface((self.tile, self.tile))
-                surf.fill((120, 0, 0))
-                frames = [surf]
+        Returns:
+            List of animation surfaces.
+        """
+        et = arch.name
+        frames = []
+        enemy_dir = os.path.join(self.repo, 'assets', arch.sprite_dir)
+        sprite_size = (self.tile + arch.sprite_pad, self.tile + arch.sprite_pad)
+            
+        # Try spritesheet first (Idle.png or idle.png - case insensitive)
+        sheet_path = None
+        for fname in ['Idle.png', 'idle.png']:
+            test_path = os.path.join(enemy_dir, fname)
+            if os.path.isfile(test_path):
+                sheet_path = test_path
+                break
                 
-            enemy_frames.append(frames)
-            enemy_anim_indexes.append(0)
-            enemy_anim_timers.append(0)
-        
-        return enemy_frames, enemy_anim_indexes, enemy_anim_timers
+        if sheet_path:
+            try:
+                sheet = pygame.image.load(sheet_path).convert_alpha()
+                n = arch.frame_count
+                fw = sheet.get_width() // max(1, n)
+                fh = sheet.get_height()
+                for i in range(n):
+                    sub = sheet.subsurface((i*fw, 0, fw, fh))
+                    frames.append(scale_preserve(sub, sprite_size))
+                print(f"✓ Loaded {et} spritesheet ({n} frames) from {sheet_path}")
+                return frames
+            except Exception as ex:
+                print(f"✗ Failed loading {et} sheet from {sheet_path}: {ex}")
+                frames = []
+                
+        # Try individual files
+        if os.path.isdir(enemy_dir):
+            try:
+                files = sorted([f for f in os.listdir(enemy_dir) if f.lower().endswith('.png')])
+                for f in files:
+                    p = os.path.join(enemy_dir, f)
+                    img = pygame.image.load(p).convert_alpha()
+                    frames.append(scale_preserve(img, sprite_size))
+                if frames:
+                    print(f"✓ Loaded {et} from {enemy_dir} ({len(frames)} frames)")
+            except Exception as ex:
+                print(f"✗ Failed loading {et} from {enemy_dir}: {ex}")
+        if frames:
+            return frames
+                
+        print(f"WARNING: No frames for {et}, using fallback")
+        surf = pygame.Surface((self.tile, self.tile))
+        surf.fill((120, 0, 0))
+        return [surf]
     
     def _load_sounds(self) -> dict:
-        """Load all sound effects.
+        """Load all sound effects (once; later calls return the same dict).
+        
+        Enemy sounds are keyed '<type>_<event>' from each archetype's sounds.
         
         Returns:
             Dictionary of sound objects keyed by name.
         """
+        if BattleAssetLoader._sound_cache is not None:
+            return BattleAssetLoader._sound_cache
         sounds_dir = os.path.join(self.repo, 'assets', 'sounds')
         sounds = {}
         sound_files = {
             'player_attack': 'Player_attack.mp3',
             'heal': 'Heal.mp3',
-            'zombie_spawn': 'Zombie_spawn.mp3',
-            'zombie_attack': 'Zombie_attack.mp3',
-            'skeleton_spawn': 'Skeleton_spawn.mp3',
-            'skeleton_attack': 'Skeleton_attack.mp3',
-            'enderman_spawn': 'Enderman_spawn.mp3',
-            'enderman_attack': 'Enderman_attack.mp3',
-            'enderman_teleport': 'Enderman_teleport.mp3',
-            'boss_spawn': 'Boss_spawn.mp3',
-            'boss_attack': 'Boss_attack.mp3',
         }
+        for arch in ENEMY_ARCHETYPES.values():
+            for event, filename in arch.sounds.items():
+                sound_files[f'{arch.name.lower()}_{event}'] = filename
         for key, filename in sound_files.items():
             try:
                 sound_path = os.path.join(sounds_dir, filename)
@@ -269,4 +279,6 @@ class BattleAssetLoader:
                 print(f"Warning: Could not load sound {filename}: {e}")
                 sounds[key] = None
         
+        if pygame.mixer.get_init():
+            BattleAssetLoader._sound_cache = sounds  # else retry once audio is up
         return sounds
@@ -1,11 +1,18 @@
 """Rendering component for battle scene."""
+import functools
+
 import pygame
 
+from ui.text_cache import draw_fields, measure_fields, render_text, sys_font
+
 
 class BattleRenderer:
     """Handles all rendering for the battle scene."""
+
+    PANEL_H = 120
     
-    def __init__(self, tile_size: int, grid_w: int, grid_h: int, origin_x: int, origin_y: int, screen_width: int):
+    def __init__(self, tile_size: int, grid_w: int, grid_h: int, origin_x: int, origin_y: int, screen_width: int,
+                 screen_height: int = None):
         """Initialize the renderer.
         
         Args:
@@ -15,6 +22,7 @@ class BattleRenderer:
             origin_x: Grid origin x position.
             origin_y: Grid origin y position.
             screen_width: Screen width in pixels.
+            screen_height: Screen height in pixels (default: grid plus panel).
         """
         self.tile = tile_size
         self.grid_w = grid_w
@@ -22,15 +30,22 @@ class BattleRenderer:
         self.origin_x = origin_x
         self.origin_y = origin_y
         self.screen_width = screen_width
+        self.screen_height = screen_height or grid_h * tile_size + self.PANEL_H
         
-        self.font = pygame.font.SysFont(None, 24)
-        self.font_small = pygame.font.SysFont(None, 20)
+        self.font = sys_font(24)
+        self.font_small = sys_font(20)
+        # static layers by id(background image), composited once
+        self._backdrops = {}
     
-    def draw(self, surface, assets: dict, game_state: dict):
-        """Draw the complete battle scene.
+    def draw(self, layer, assets: dict, game_state: dict):
+        """List the complete battle scene on a DirtyLayer.
+        
+        The background, grid and panel come from a backdrop composited
+        once; everything else is added as layer items, so only what
+        changed since the last frame is drawn again.
         
         Args:
-            surface: The pygame surface to draw on.
+            layer: The DirtyLayer of the scene.
             assets: Dictionary containing loaded assets from BattleAssetLoader.
             game_state: Dictionary containing current game state:
                 - player: Player entity
@@ -41,73 +56,113 @@ class BattleRenderer:
                 - message: Current message string
                 - turn: Current turn ('PLAYER' or 'ENEMY')
                 - total_run_turns: Total turn count from manager
+                - hint: Optional ai.hints.Hint to highlight
+                - offsets: Optional {id(unit): (dx, dy)} pixel offsets of
+                  animating units (see UnitAnimator)
         """
-        # Clear screen
-        surface.fill((20, 20, 20))
-        
-        # Draw background
-        self._draw_background(surface, assets, game_state['enemies'])
+        layer.begin(self._backdrop(assets, game_state['enemies']))
         
         # Draw move target highlights
         if game_state['mode'] == 'MOVE' and game_state['move_targets']:
-            self._draw_move_targets(surface, game_state['move_targets'])
+            self._draw_move_targets(layer, game_state['move_targets'])
+        
+        # Draw hinted command
+        if game_state.get('hint') is not None:
+            self._draw_hint(layer, game_state['hint'], game_state['player'])
+
+        offsets = game_state.get('offsets') or {}
         
         # Draw player
-        self._draw_player(surface, assets, game_state['player'])
+        self._draw_player(layer, assets, game_state['player'], offsets)
         
         # Draw enemies
-        self._draw_enemies(surface, assets, game_state['enemies'])
+        self._draw_enemies(layer, assets, game_state['enemies'], offsets)
         
         # Draw cursor
-        self._draw_cursor(surface, game_state['cursor'])
+        self._draw_cursor(layer, game_state['cursor'])
         
         # Draw UI panel
-        self._draw_ui_panel(surface, game_state)
+        self._draw_ui_panel(layer, game_state)
     
-    def _draw_background(self, surface, assets: dict, enemies: list):
-        """Draw the battlefield background.
+    def _backdrop(self, assets: dict, enemies: list):
+        """Screen-sized static layer: background, grid and empty panel.
+        
+        Built once per background; the boss background replaces the
+        battlefield while a Boss is alive.
         
         Args:
-            surface: The pygame surface to draw on.
             assets: Dictionary containing loaded assets.
             enemies: List of enemy entities.
         """
-        is_boss_fight = any(type(e).__name__ == 'Boss' and e.alive for e in enemies)
-        
-        if is_boss_fight and assets['boss_battle_bg']:
-            surface.blit(assets['boss_battle_bg'], (self.origin_x, self.origin_y))
-        elif assets['battlefield_bg']:
-            surface.blit(assets['battlefield_bg'], (self.origin_x, self.origin_y))
+        boss_bg = assets['boss_battle_bg']
+        if boss_bg and any(type(e).__name__ == 'Boss' and e.alive for e in enemies):
+            background = boss_bg
         else:
-            # Fallback to grid drawing if images not loaded
-            for x in range(self.grid_w):
-                for y in range(self.grid_h):
-                    rx = self.origin_x + x * self.tile
-                    ry = self.origin_y + y * self.tile
-                    rect = pygame.Rect(rx, ry, self.tile, self.tile)
-                    pygame.draw.rect(surface, (80, 80, 80), rect, 1)
+            background = assets['battlefield_bg']
+        backdrop = self._backdrops.get(id(background))
+        if backdrop is None:
+            backdrop = pygame.Surface((self.screen_width, self.screen_height))
+            backdrop.fill((20, 20, 20))
+            if background:
+                backdrop.blit(background, (self.origin_x, self.origin_y))
+            else:
+                # Fallback to grid drawing if images not loaded
+                backdrop.blit(self._build_grid_surface(), (self.origin_x, self.origin_y))
+            panel = pygame.Rect(0, self.grid_h * self.tile, self.screen_width, self.PANEL_H)
+            pygame.draw.rect(backdrop, (30, 30, 30), panel)
+            self._backdrops[id(background)] = backdrop
+        return backdrop
+
+    def _build_grid_surface(self):
+        """Transparent surface with the grid lines."""
+        grid = pygame.Surface((self.grid_w * self.tile, self.grid_h * self.tile), pygame.SRCALPHA)
+        for x in range(self.grid_w):
+            for y in range(self.grid_h):
+                rect = pygame.Rect(x * self.tile, y * self.tile, self.tile, self.tile)
+                pygame.draw.rect(grid, (80, 80, 80), rect, 1)
+        return grid
     
-    def _draw_move_targets(self, surface, move_targets: set):
+    def _draw_move_targets(self, layer, move_targets: set):
         """Draw move target highlights.
         
         Args:
-            surface: The pygame surface to draw on.
+            layer: The DirtyLayer to draw on.
             move_targets: Set of reachable (x, y) positions.
         """
         for (mx, my) in move_targets:
             r = pygame.Rect(mx * self.tile + 6, my * self.tile + 6, self.tile - 12, self.tile - 12)
-            pygame.draw.rect(surface, (180, 240, 180), r, 2)
+            layer.add(r, 'move_target', functools.partial(pygame.draw.rect, color=(180, 240, 180), rect=r, width=2))
     
-    def _draw_player(self, surface, assets: dict, player):
+    def _draw_hint(self, layer, hint, player):
+        """Highlight the hinted command's tile (the player's own for HEAL/END).
+
+        Args:
+            layer: The DirtyLayer to draw on.
+            hint: ai.hints.Hint with the suggested command.
+            player: Player entity.
+        """
+        kind, target = hint.command
+        hx, hy = target if target is not None else (player.x, player.y)
+        color = {'MOVE': (120, 200, 255), 'ATTACK': (255, 90, 90), 'HEAL': (120, 255, 160)}.get(kind, (200, 200, 200))
+        r = pygame.Rect(self.origin_x + hx * self.tile + 3, self.origin_y + hy * self.tile + 3,
+                        self.tile - 6, self.tile - 6)
+        layer.add(r, ('hint', color),
+                  functools.partial(pygame.draw.rect, color=color, rect=r, width=3, border_radius=6))
+        label = render_text(self.font_small, f'Hint: {kind}', True, color)
+        layer.blit(label, label.get_rect(topleft=(r.x + 4, r.y + 4)), key=f'Hint: {kind}')
+
+    def _draw_player(self, layer, assets: dict, player, offsets=None):
         """Draw the player sprite and HP bar.
         
         Args:
-            surface: The pygame surface to draw on.
+            layer: The DirtyLayer to draw on.
             assets: Dictionary containing loaded assets.
             player: Player entity.
+            offsets: Optional {id(unit): (dx, dy)} animation offsets.
         """
-        px = self.origin_x + player.x * self.tile
-        py = self.origin_y + player.y * self.tile
+        ox, oy = offsets.get(id(player), (0, 0)) if offsets else (0, 0)
+        px = self.origin_x + player.x * self.tile + ox
+        py = self.origin_y + player.y * self.tile + oy
         
         # Get current animation frame
         player_frames = assets['player_frames']
@@ -115,73 +170,100 @@ class BattleRenderer:
         pframe = player_frames[anim_index]
         
         # Position sprite to sit on bottom center of tile
-        rect = pframe.get_rect(midbottom=(px + self.tile // 2, py + self.tile - 8))
-        surface.blit(pframe, rect)
+        layer.blit(pframe, pframe.get_rect(midbottom=(px + self.tile // 2, py + self.tile - 8)))
         
         # Draw player HP bar
         ph_ratio = max(0, player.hp) / player.max_hp
         bar_w = int(self.tile * 0.8)
-        bx = player.x * self.tile + (self.tile - bar_w) // 2
-        by = player.y * self.tile + self.tile - 12
-        pygame.draw.rect(surface, (40, 40, 40), (bx, by, bar_w, 6))
-        pygame.draw.rect(surface, (50, 180, 50), (bx, by, int(bar_w * ph_ratio), 6))
+        bx = player.x * self.tile + (self.tile - bar_w) // 2 + ox
+        by = player.y * self.tile + self.tile - 12 + oy
+        layer.fill((40, 40, 40), (bx, by, bar_w, 6))
+        layer.fill((50, 180, 50), (bx, by, int(bar_w * ph_ratio), 6))
         
         # Draw level indicator above player sprite
-        level_text = f"Lv.{player.level}"
-        level_surf = self.font_small.render(level_text, True, (255, 215, 0))
-        level_rect = level_surf.get_rect(midbottom=(px + self.tile // 2, py - 40))
-        surface.blit(level_surf, level_rect)
+        self.add_fields(layer, (('Lv.', player.level),), (255, 215, 0),
+                          midbottom=(px + self.tile // 2, py - 40), font=self.font_small)
     
-    def _draw_enemies(self, surface, assets: dict, enemies: list):
+    def _draw_enemies(self, layer, assets: dict, enemies: list, offsets=None):
         """Draw all enemy sprites and HP bars.
         
+        Every enemy of a type shows the same animation frame, so the frame
+        is picked once per type (and a full redraw sends the sprites out in
+        one blits() call).
+        
         Args:
-            surface: The pygame surface to draw on.
+            layer: The DirtyLayer to draw on.
             assets: Dictionary containing loaded assets.
             enemies: List of enemy entities.
+            offsets: Optional {id(unit): (dx, dy)} animation offsets.
         """
         enemy_frames = assets['enemy_frames']
-        enemy_anim_indexes = assets['enemy_anim_indexes']
+        step = assets['enemy_anim_tick'] // assets['enemy_anim_speed']
+        current = {}  # type name -> this frame's surface
+        bar_w = int(self.tile * 0.8)
+        bars = []
         
-        for i, e in enumerate(enemies):
+        for e in enemies:
             if not e.alive:
                 continue
+            ox, oy = offsets.get(id(e), (0, 0)) if offsets else (0, 0)
+            bx = e.x * self.tile + ox
+            by = e.y * self.tile + oy
+            ex = self.origin_x + bx
+            ey = self.origin_y + by
             
-            ex = self.origin_x + e.x * self.tile
-            ey = self.origin_y + e.y * self.tile
-            
-            frames = enemy_frames[i]
-            idx = enemy_anim_indexes[i] % max(1, len(frames))
-            ef = frames[idx]
+            kind = type(e).__name__
+            ef = current.get(kind)
+            if ef is None:
+                frames = enemy_frames[kind]
+                ef = current[kind] = frames[step % len(frames)]
             
             # Position sprite to sit on bottom center of tile
-            erect = ef.get_rect(midbottom=(ex + self.tile // 2, ey + self.tile - 8))
-            surface.blit(ef, erect)
+            layer.blit(ef, ef.get_rect(midbottom=(ex + self.tile // 2, ey + self.tile - 8)))
             
-            # Draw HP bar
+            # HP bar
             ehr = max(0, e.hp) / e.max_hp
-            bar_w = int(self.tile * 0.8)
-            bx = e.x * self.tile + (self.tile - bar_w) // 2
-            by = e.y * self.tile + self.tile - 12
-            pygame.draw.rect(surface, (40, 40, 40), (bx, by, bar_w, 6))
-            pygame.draw.rect(surface, (50, 180, 50), (bx, by, int(bar_w * ehr), 6))
+            bx += (self.tile - bar_w) // 2
+            by += self.tile - 12
+            bars.append(((bx, by, bar_w, 6), (bx, by, int(bar_w * ehr), 6)))
+        
+        # bars above every sprite, as sprites may reach into the tile above
+        for back, fill in bars:
+            layer.fill((40, 40, 40), back)
+            layer.fill((50, 180, 50), fill)
     
-    def _draw_cursor(self, surface, cursor: list):
+    def _draw_cursor(self, layer, cursor: list):
         """Draw the cursor highlight.
         
         Args:
-            surface: The pygame surface to draw on.
+            layer: The DirtyLayer to draw on.
             cursor: [x, y] cursor position.
         """
-        crx = self.origin_x + cursor[0] * self.tile
-        cry = self.origin_y + cursor[1] * self.tile
-        pygame.draw.rect(surface, (255, 200, 0), (crx, cry, self.tile, self.tile), 3)
+        r = pygame.Rect(self.origin_x + cursor[0] * self.tile, self.origin_y + cursor[1] * self.tile,
+                        self.tile, self.tile)
+        layer.add(r, 'cursor', functools.partial(pygame.draw.rect, color=(255, 200, 0), rect=r, width=3))
     
-    def _draw_ui_panel(self, surface, game_state: dict):
-        """Draw the UI panel at the bottom of the screen.
+    def _draw_text(self, layer, text, color, pos):
+        surf = render_text(self.font, text, True, color)
+        layer.blit(surf, surf.get_rect(topleft=pos), key=(text, color))
+
+    def add_fields(self, layer, fields, color, font=None, **anchor):
+        """Counters such as HP: cached labels and glyph-strip values (see ui.text_cache).
+
+        `anchor` places the line like Rect keywords, e.g. topleft=(8, 500).
+        """
+        font = font or self.font
+        rect = pygame.Rect((0, 0), measure_fields(font, fields, color))
+        for name, value in anchor.items():
+            setattr(rect, name, value)
+        layer.add(rect, (fields, color),
+                  functools.partial(draw_fields, font=font, fields=fields, color=color, pos=rect.topleft))
+
+    def _draw_ui_panel(self, layer, game_state: dict):
+        """Draw the UI panel texts (the panel itself is in the backdrop).
         
         Args:
-            surface: The pygame surface to draw on.
+            layer: The DirtyLayer to draw on.
             game_state: Dictionary containing current game state.
         """
         player = game_state['player']
@@ -190,25 +272,28 @@ class BattleRenderer:
         message = game_state['message']
         turn = game_state['turn']
         total_run_turns = game_state['total_run_turns']
-        
-        # Draw panel background
-        panel = pygame.Rect(0, self.grid_h * self.tile, self.screen_width, 120)
-        pygame.draw.rect(surface, (30, 30, 30), panel)
+        panel_y = self.grid_h * self.tile
         
         # Draw info text
         info = f'Turn: {turn} | Mode: {mode} | Cursor: {cursor[0]},{cursor[1]}'
-        surface.blit(self.font.render(info, True, (255, 255, 255)), (8, self.grid_h * self.tile + 6))
+        self._draw_text(layer, info, (255, 255, 255), (8, panel_y + 6))
         
         # Draw message
-        surface.blit(self.font.render(message, True, (230, 200, 60)), (8, self.grid_h * self.tile + 30))
+        self._draw_text(layer, message, (230, 200, 60), (8, panel_y + 30))
+
+        # Draw hint summary
+        hint = game_state.get('hint')
+        if hint is not None:
+            kind, target = hint.command
+            where = f' {target[0]},{target[1]}' if target is not None else ''
+            hint_text = f'Hint: {kind}{where} (depth {hint.depth}, {hint.nodes} nodes)'
+            self._draw_text(layer, hint_text, (120, 200, 255), (8, panel_y + 60))
         
         # Draw turn counter in bottom right
-        turn_text = f'Total Turns: {total_run_turns}'
-        turn_surf = self.font.render(turn_text, True, (100, 255, 255))
-        surface.blit(turn_surf, (self.screen_width - 200, self.grid_h * self.tile + 6))
+        self.add_fields(layer, (('Total Turns: ', total_run_turns),), (100, 255, 255),
+                          topleft=(self.screen_width - 200, panel_y + 6))
         
         # Draw player stats
-        stats_text = f"Lv. {player.level} | HP: {player.hp}/{player.max_hp} | ATK: {player.atk} | Mana: {player.mana}"
-        stats_surf = self.font.render(stats_text, True, (100, 255, 100))
-        surface.blit(stats_surf, (8, self.grid_h * self.tile + 90))
-        
\ No newline at end of file
+        stats = (('Lv. ', player.level), (' | HP: ', f'{player.hp}/{player.max_hp}'),
+                 (' | ATK: ', player.atk), (' | Mana: ', player.mana))
+        self.add_fields(layer, stats, (100, 255, 100), topleft=(8, panel_y + 90))
@@ -1,6 +1,7 @@
 """UI management component for battle scene."""
 import pygame
 from ui.button import Button
+from ui.text_cache import sys_font
 
 
 class BattleUIManager:
@@ -21,26 +22,25 @@ class BattleUIManager:
         self.grid_h = grid_h
         self.tile = tile_size
         
-        self.font = pygame.font.SysFont(None, 24)
-        self.font_small = pygame.font.SysFont(None, 20)
+        self.font = sys_font(24)
+        self.font_small = sys_font(20)
         
         # Create action buttons with tooltips
         button_y = self.grid_h * self.tile + 80
         button_spacing = 150
         button_start_x = 500
+        actions = [
+            ("Move (M)", 'move', "Move your character to an adjacent tile."),
+            ("Attack (A)", 'attack', "Attack an enemy in range."),
+            ("Heal (H)", 'heal', "Heal yourself (costs 20 Mana)."),
+            ("End Turn (E)", 'end', "End your turn."),
+        ]
         
         self.buttons = [
-            Button("Move (M)", (button_start_x, button_y), (130, 40), callbacks['move'], self.font),
-            Button("Attack (A)", (button_start_x + button_spacing, button_y), (130, 40), callbacks['attack'], self.font),
-            Button("Heal (H)", (button_start_x + button_spacing * 2, button_y), (130, 40), callbacks['heal'], self.font),
-            Button("End Turn (E)", (button_start_x + button_spacing * 3, button_y), (130, 40), callbacks['end'], self.font),
+            Button(text, (button_start_x + button_spacing * i, button_y), (130, 40), callbacks[name], self.font,
+                   tooltip=tooltip, tooltip_font=self.font_small)
+            for i, (text, name, tooltip) in enumerate(actions)
         ]
-        
-        # Assign tooltips to each button
-        self.buttons[0].tooltip = "Move your character to an adjacent tile."
-        self.buttons[1].tooltip = "Attack an enemy in range."
-        self.buttons[2].tooltip = "Heal yourself (costs 20 Mana)."
-        self.buttons[3].tooltip = "End your turn."
     
     def handle_event(self, event) -> str:
         """Handle input events for UI elements.
@@ -57,40 +57,19 @@ class BattleUIManager:
         # The buttons call their callbacks directly, so we don't need to return action here
         return None
     
-    def draw(self, surface):
+    def draw(self, layer):
         """Draw all UI elements.
         
         Args:
-            surface: The pygame surface to draw on.
+            layer: The DirtyLayer to draw on.
         """
-        # Draw buttons
+        # Buttons and tooltips are pre-rendered surfaces, so the layer
+        # keys them by identity and redraws them only when their state changes
         for button in self.buttons:
-            button.draw(surface)
-        
-        # Draw tooltips on hover
-        self._draw_tooltips(surface)
-    
-    def _draw_tooltips(self, surface):
-        """Draw tooltips for hovered buttons.
+            layer.blit(button.image, button.rect)
         
-        Args:
-            surface: The pygame surface to draw on.
-        """
-        mx, my = pygame.mouse.get_pos()
+        # Draw the tooltip of the hovered button (only one at a time)
         for button in self.buttons:
-            if button.rect.collidepoint((mx, my)):
-                # Render tooltip above the button
-                tooltip_text = getattr(button, 'tooltip', '')
-                if tooltip_text:
-                    tooltip_surf = self.font_small.render(tooltip_text, True, (255, 255, 200))
-                    tooltip_rect = tooltip_surf.get_rect()
-                    tooltip_rect.midbottom = (button.rect.centerx, button.rect.top - 5)
-                    
-                    # Draw tooltip background
-                    bg_rect = tooltip_rect.inflate(10, 6)
-                    pygame.draw.rect(surface, (50, 50, 50), bg_rect, border_radius=4)
-                    pygame.draw.rect(surface, (200, 200, 150), bg_rect, 1, border_radius=4)
-                    
-                    # Draw tooltip text
-                    surface.blit(tooltip_surf, tooltip_rect)
-                break  # Only show one tooltip at a time
+            if button.hovered and button.tooltip_image is not None:
+                layer.blit(button.tooltip_image, button.tooltip_rect)
+                break
@@ -0,0 +1,117 @@
+"""Frame compositor that redraws only the regions that changed."""
+import pygame
+
+
+class DirtyLayer:
+    """A static backdrop plus keyed items, redrawn only where they changed.
+
+    Every frame the scene lists what is on screen, in z-order, over a
+    pre-composited backdrop:
+
+        layer.begin(backdrop)
+        layer.blit(sprite, rect)               # long-lived surface
+        layer.fill((40, 40, 40), bar)          # solid rectangle
+        layer.add(rect, key, draw)             # draw(surface), anything else
+        rects = layer.end(surface)             # for pygame.display.update
+
+    An item is unchanged when one with the same rect and key was drawn last
+    frame. Where items appeared or vanished the backdrop is restored and
+    every item overlapping the region is drawn again, clipped to it, so
+    overlaps keep their order. A frame where nothing changed draws nothing
+    and end() returns []. The first frame, a new backdrop, invalidate() or
+    more than MAX_RECTS changed regions redraw the whole surface instead.
+
+    Args:
+        max_rects: Changed regions above which a full redraw is cheaper.
+    """
+
+    MAX_RECTS = 64
+
+    def __init__(self, max_rects=MAX_RECTS):
+        self.max_rects = max_rects
+        self._backdrop = None
+        self._items = []  # (rect, key, source) this frame
+        self._drawn = set()  # (x, y, w, h, key) of the last drawn frame
+        self._full = True
+
+    def invalidate(self):
+        """Redraw everything next frame, e.g. when another scene drew over it."""
+        self._full = True
+
+    def begin(self, backdrop):
+        """Start a frame on `backdrop`, a surface the size of the target."""
+        if backdrop is not self._backdrop:
+            self._backdrop = backdrop
+            self._full = True
+        self._items = []
+
+    def blit(self, source, rect, key=None):
+        """Blit `source` at `rect`; the key defaults to the surface itself,
+        so pass one (e.g. the text) for surfaces created every frame."""
+        rect = pygame.Rect(rect)
+        self._items.append((rect, id(source) if key is None else key, source))
+
+    def fill(self, color, rect):
+        """Fill `rect` with `color`."""
+        self._items.append((pygame.Rect(rect), color, color))
+
+    def add(self, rect, key, draw):
+        """Call draw(surface) for content that stays inside `rect` and is described by `key`."""
+        self._items.append((pygame.Rect(rect), key, draw))
+
+    def end(self, surface):
+        """Draw the frame's changes onto `surface`.
+
+        Returns:
+            List of the rects that were drawn ([] when nothing changed).
+        """
+        items = self._items
+        current = {(r.x, r.y, r.w, r.h, key) for r, key, _ in items}
+        changed = current ^ self._drawn
+        self._drawn = current
+        if not self._full and not changed:
+            return []
+        if self._full or len(changed) > self.max_rects:
+            self._full = False
+            surface.blit(self._backdrop, (0, 0))
+            self._draw_items(surface, items)
+            return [surface.get_rect()]
+
+        rects = [r for r, _, _ in items]
+        dirty = _merge([pygame.Rect(c[:4]) for c in changed])
+        clip = surface.get_clip()
+        for region in dirty:
+            surface.set_clip(region)
+            surface.blit(self._backdrop, region, region)
+            self._draw_items(surface, [items[i] for i in region.collidelistall(rects)])
+        surface.set_clip(clip)
+        return dirty
+
+    @staticmethod
+    def _draw_items(surface, items):
+        batch = []  # consecutive blits go out in one blits() call
+        for rect, _, source in items:
+            if isinstance(source, pygame.Surface):
+                batch.append((source, rect))
+                continue
+            if batch:
+                surface.blits(batch, doreturn=False)
+                batch = []
+            if callable(source):
+                source(surface)
+            else:
+                surface.fill(source, rect)
+        if batch:
+            surface.blits(batch, doreturn=False)
+
+
+def _merge(rects):
+    """Union overlapping rects so no region is redrawn twice."""
+    merged = []
+    for rect in sorted(rects, key=lambda r: (r.y, r.x)):
+        hit = rect.collidelist(merged)
+        while hit != -1:
+            rect.union_ip(merged.pop(hit))
+            hit = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
@@ -0,0 +1,99 @@
+"""Frame-time statistics for a scene (no pygame)."""
+import sys
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+from config import FPS, FRAME_REPORT_SECONDS
+
+FrameStats = namedtuple('FrameStats', 'frames fps p50_ms p95_ms p99_ms max_ms work_p95_ms')
+FrameStats.__doc__ = """Frame times over the last FrameTimer window.
+
+Attributes:
+    frames: Frames measured.
+    fps: Frames per second from the mean frame time.
+    p50_ms, p95_ms, p99_ms, max_ms: Frame time percentiles and worst frame.
+    work_p95_ms: 95th percentile of the scene's own update + draw time.
+"""
+
+
+class FrameTimer:
+    """Rolling frame-time and scene work-time percentiles.
+
+    Call frame() once per frame (at the start of update) and add the time
+    spent in update/draw with work(). The frame time is the interval
+    between frame() calls, so it includes the flip and the clock wait; the
+    work time shows how much of the frame budget the scene itself uses.
+
+        timer.frame()
+        started = time.perf_counter()
+        ...                      # update or draw
+        timer.work(time.perf_counter() - started)
+
+    Args:
+        label: Name printed in reports.
+        window: Number of recent frames the statistics cover.
+        report_every: Seconds between maybe_report() prints (None: never).
+        target_fps: Frame rate a report counts as met (✓) at the 95th percentile.
+    """
+
+    def __init__(self, label, window=600, report_every=FRAME_REPORT_SECONDS, target_fps=FPS):
+        self.label = label
+        self.report_every = report_every
+        self.target_fps = target_fps
+        self._frames = deque(maxlen=window)
+        self._work = deque(maxlen=window)
+        self._last = None
+        self._reported = time.perf_counter()
+
+    def frame(self):
+        """Mark the start of a frame."""
+        now = time.perf_counter()
+        if self._last is not None:
+            self._frames.append(now - self._last)
+            self._work.append(0.0)
+        self._last = now
+
+    def work(self, seconds):
+        """Add `seconds` of scene work to the current frame."""
+        if self._work:
+            self._work[-1] += seconds
+
+    def reset(self):
+        """Forget all frames, e.g. when the scene is entered again."""
+        self._frames.clear()
+        self._work.clear()
+        self._last = None
+        self._reported = time.perf_counter()
+
+    def stats(self):
+        """FrameStats of the current window, or None before two frames."""
+        if not self._frames:
+            return None
+        ms = np.array(self._frames) * 1000.0
+        p50, p95, p99 = np.percentile(ms, (50, 95, 99))
+        work_p95 = float(np.percentile(np.array(self._work) * 1000.0, 95))
+        return FrameStats(len(ms), 1000.0 / ms.mean(), float(p50), float(p95), float(p99),
+                          float(ms.max()), work_p95)
+
+    def report(self, out=sys.stdout):
+        """Print one ✓/✗ line of the current statistics; returns the FrameStats."""
+        stats = self.stats()
+        if stats is None:
+            return None
+        ok = stats.p95_ms <= 1000.0 / self.target_fps * 1.1  # clock.tick jitter
+        print(f"{'✓' if ok else '✗'} {self.label}: {stats.fps:.1f} FPS over {stats.frames} frames, "
+              f"frame p50 {stats.p50_ms:.1f} / p95 {stats.p95_ms:.1f} / p99 {stats.p99_ms:.1f} / "
+              f"max {stats.max_ms:.1f} ms, scene work p95 {stats.work_p95_ms:.1f} ms", file=out)
+        return stats
+
+    def maybe_report(self, out=sys.stdout):
+        """report() if `report_every` seconds have passed since the last one."""
+        if self.report_every is None:
+            return None
+        now = time.perf_counter()
+        if now - self._reported < self.report_every:
+            return None
+        self._reported = now
+        return self.report(out)
@@ -0,0 +1,68 @@
+"""Short sprite animations for resolved unit actions (no pygame)."""
+import math
+
+from config import MOVE_ANIM_MS, ATTACK_ANIM_MS
+
+
+class UnitAnimator:
+    """Pixel offsets that animate units after the engine has moved them.
+
+    The engine applies an action at once; the view then draws the unit
+    shifted by offsets() so a move slides in from the old tile and an
+    attack lunges toward its target and back. Animations run on the
+    scene's dt and a unit's new animation replaces its running one.
+
+    Args:
+        tile: Tile size in pixels.
+        move_ms: Duration of a move slide.
+        attack_ms: Duration of an attack lunge.
+    """
+
+    LUNGE = 0.3  # share of a tile an attack lunges forward
+
+    def __init__(self, tile, move_ms=MOVE_ANIM_MS, attack_ms=ATTACK_ANIM_MS):
+        self.tile = tile
+        self.move_s = move_ms / 1000.0
+        self.attack_s = attack_ms / 1000.0
+        self._active = {}  # id(unit) -> (kind, dx, dy, duration, elapsed)
+
+    def __len__(self):
+        return len(self._active)
+
+    def move(self, unit, from_pos, to_pos):
+        """Slide `unit` from tile `from_pos` to `to_pos`, where the engine already put it."""
+        dx = (from_pos[0] - to_pos[0]) * self.tile
+        dy = (from_pos[1] - to_pos[1]) * self.tile
+        if self.move_s > 0 and (dx or dy):
+            self._active[id(unit)] = ('move', dx, dy, self.move_s, 0.0)
+
+    def lunge(self, unit, target_pos):
+        """Lunge `unit` toward tile `target_pos` and back."""
+        dx, dy = target_pos[0] - unit.x, target_pos[1] - unit.y
+        dist = math.hypot(dx, dy)
+        if self.attack_s > 0 and dist:
+            scale = self.LUNGE * self.tile / dist
+            self._active[id(unit)] = ('lunge', dx * scale, dy * scale, self.attack_s, 0.0)
+
+    def update(self, dt):
+        """Advance every animation by `dt` seconds and drop finished ones."""
+        if not self._active:
+            return
+        active = {}
+        for key, (kind, dx, dy, duration, elapsed) in self._active.items():
+            elapsed += dt
+            if elapsed < duration:
+                active[key] = (kind, dx, dy, duration, elapsed)
+        self._active = active
+
+    def offsets(self):
+        """{id(unit): (dx, dy)} pixel offsets of the units being animated."""
+        out = {}
+        for key, (kind, dx, dy, duration, elapsed) in self._active.items():
+            t = elapsed / duration
+            f = 1.0 - t if kind == 'move' else math.sin(math.pi * t)
+            out[key] = (int(dx * f), int(dy * f))
+        return out
+
+    def clear(self):
+        self._active = {}
@@ -2,11 +2,12 @@
 import pygame
 import os
 import json
-from scenes.base import ScreenBase
+from scenes.base import MenuScreen
 from ui.button import Button
+from ui.text_cache import render_text
 
 
-class EndMenuScreen(ScreenBase):
+class EndMenuScreen(MenuScreen):
     """Victory screen shown after defeating the boss, allows saving high scores."""
     
     def __init__(self, manager, screen_size):
@@ -65,11 +66,16 @@ class EndMenuScreen(ScreenBase):
         if self.boss_turns == 0:
             print("✗ Warning: Total run turns is 0, this seems unusual")
 
+        # The run is over: keep its replay
+        self.manager.save_replay()
+
         # Reset state
         self.player_name = ""
         self.saved = False
         self.input_active = True
         self.error_msg = ""
+        self.cursor_shown = False
+        super().on_enter()
 
     def validate_name(self, name):
         """Validasi input nama. Raise ValueError jika tidak valid."""
@@ -147,16 +153,12 @@ class EndMenuScreen(ScreenBase):
 
     def quit_game(self):
         """Exit the game."""
-        pygame.quit()
-        raise SystemExit
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
 
     def handle_event(self, event):
         """Handle keyboard input and button clicks."""
-        # Handle buttons (save button only for victory)
-        if not self.is_defeated and not self.saved:
-            self.save_btn.handle_event(event)
-        self.menu_btn.handle_event(event)
-        self.quit_btn.handle_event(event)
+        # Handle buttons (compose() leaves the save button out unless it is shown)
+        self.widgets.handle_event(event)
 
         # Handle text input (only for victory, not defeated)
         if not self.is_defeated and not self.saved:
@@ -180,8 +182,34 @@ class EndMenuScreen(ScreenBase):
         """No updates needed."""
         pass
 
+    def composite_key(self):
+        return (self.is_defeated, self.saved, self.input_active, self.player_name, self.error_msg,
+                self.boss_turns)
+
     def draw(self, surface):
-        """Draw victory or defeat screen with appropriate elements."""
+        """Draw the changes since the last frame; the cursor blinks on top of the composite."""
+        rects = super().draw(surface)
+        redrawn = rects and rects[0] == surface.get_rect()
+        shown = self.input_active and not self.saved and not self.is_defeated \
+            and pygame.time.get_ticks() % 1000 < 500
+        if shown != self.cursor_shown or (shown and redrawn):
+            self.cursor_shown = shown
+            cursor_rect = self.cursor_rect()
+            surface.blit(self.composite, cursor_rect, cursor_rect)
+            if shown:
+                pygame.draw.line(surface, (255, 255, 255), cursor_rect.midtop,
+                                 (cursor_rect.centerx, cursor_rect.top + 24), 2)
+            rects.append(cursor_rect)
+        return rects
+
+    def cursor_rect(self):
+        """Area of the text cursor after the typed name."""
+        input_width = render_text(self.font_input, self.player_name, True, (255, 255, 255)).get_width()
+        cursor_x = self.input_box.x + 10 + input_width + 2
+        return pygame.Rect(cursor_x - 2, self.input_box.y + 8, 4, 26)
+
+    def compose(self, surface):
+        """Draw victory or defeat screen without its buttons and cursor."""
         # Draw background
         if self.bg:
             surface.blit(self.bg, (0, 0))
@@ -205,19 +233,12 @@ class EndMenuScreen(ScreenBase):
             # Center the navigation buttons for defeated state
             cx = self.screen_width // 2
             
-            # Draw Main Menu button (centered)
-            menu_btn_rect = pygame.Rect(0, 0, 180, 48)
-            menu_btn_rect.center = (cx, 250)
-            self.menu_btn.rect = menu_btn_rect
-            self.menu_btn.text_rect = self.menu_btn.text_surface.get_rect(center=menu_btn_rect.center)
-            self.menu_btn.draw(surface)
+            # Place Main Menu button (centered)
+            self.menu_btn.place((cx, 250), (180, 48))
             
-            # Draw Quit Game button (centered)
-            quit_btn_rect = pygame.Rect(0, 0, 180, 48)
-            quit_btn_rect.center = (cx, 320)
-            self.quit_btn.rect = quit_btn_rect
-            self.quit_btn.text_rect = self.quit_btn.text_surface.get_rect(center=quit_btn_rect.center)
-            self.quit_btn.draw(surface)
+            # Place Quit Game button (centered)
+            self.quit_btn.place((cx, 320), (180, 48))
+            self.widgets.widgets = [self.menu_btn, self.quit_btn]
         else:
             # VICTORY state - show full UI with score input
             # Draw background panel for readability
@@ -251,18 +272,10 @@ class EndMenuScreen(ScreenBase):
                 pygame.draw.rect(surface, box_color, self.input_box, 2)
                 pygame.draw.rect(surface, (30, 30, 30), self.input_box.inflate(-4, -4))
 
-                # Draw input text
-                input_surf = self.font_input.render(self.player_name, True, (255, 255, 255))
+                # Draw input text (the blinking cursor is drawn by draw())
+                input_surf = render_text(self.font_input, self.player_name, True, (255, 255, 255))
                 surface.blit(input_surf, (self.input_box.x + 10, self.input_box.y + 8))
 
-                # Draw cursor (blinking effect)
-                if pygame.time.get_ticks() % 1000 < 500:
-                    cursor_x = self.input_box.x + 10 + input_surf.get_width() + 2
-                    cursor_y = self.input_box.y + 8
-                    pygame.draw.line(surface, (255, 255, 255), 
-                                   (cursor_x, cursor_y), 
-                                   (cursor_x, cursor_y + 24), 2)
-
                 # Draw error message below input box
                 if self.error_msg:
                     error_surf = self.font_error.render(self.error_msg, True, self.input_color_error)
@@ -275,7 +288,7 @@ class EndMenuScreen(ScreenBase):
                 smw = saved_msg.get_width()
                 surface.blit(saved_msg, ((self.screen_width - smw) // 2, 280))
 
-            # Draw buttons - reposition based on state
+            # Place buttons - reposition based on state
             cx = self.screen_width // 2
             btn_width = 200
             btn_height = 48
@@ -284,23 +297,12 @@ class EndMenuScreen(ScreenBase):
             
             if not self.saved:
                 # All three buttons vertically stacked
-                self.save_btn.rect.center = (cx, start_y)
-                self.save_btn.text_rect = self.save_btn.text_surface.get_rect(center=self.save_btn.rect.center)
-                self.save_btn.draw(surface)
-                
-                self.menu_btn.rect.center = (cx, start_y + btn_spacing)
-                self.menu_btn.text_rect = self.menu_btn.text_surface.get_rect(center=self.menu_btn.rect.center)
-                self.menu_btn.draw(surface)
-                
-                self.quit_btn.rect.center = (cx, start_y + btn_spacing * 2)
-                self.quit_btn.text_rect = self.quit_btn.text_surface.get_rect(center=self.quit_btn.rect.center)
-                self.quit_btn.draw(surface)
+                self.save_btn.place((cx, start_y), (btn_width, btn_height))
+                self.menu_btn.place((cx, start_y + btn_spacing), (btn_width, btn_height))
+                self.quit_btn.place((cx, start_y + btn_spacing * 2), (btn_width, btn_height))
+                self.widgets.widgets = [self.save_btn, self.menu_btn, self.quit_btn]
             else:
                 # Only menu and quit buttons, repositioned after save
-                self.menu_btn.rect.center = (cx, start_y)
-                self.menu_btn.text_rect = self.menu_btn.text_surface.get_rect(center=self.menu_btn.rect.center)
-                self.menu_btn.draw(surface)
-                
-                self.quit_btn.rect.center = (cx, start_y + btn_spacing)
-                self.quit_btn.text_rect = self.quit_btn.text_surface.get_rect(center=self.quit_btn.rect.center)
-                self.quit_btn.draw(surface)
+                self.menu_btn.place((cx, start_y), (btn_width, btn_height))
+                self.quit_btn.place((cx, start_y + btn_spacing), (btn_width, btn_height))
+                self.widgets.widgets = [self.menu_btn, self.quit_btn]
@@ -4,17 +4,12 @@ import os
 from scenes.base import ScreenBase
 from ui.button import Button
 from config import *
+from entities.registry import archetype
 from utils import scale_preserve
 
 
 class FightBase(ScreenBase):
     """Simple button-based fight scene with animation frames."""
-    FRAME_COUNTS = {
-        'Zombie': 6,
-        'Skeleton': 7,
-        'Enderman': 14,
-        'Boss': 8,
-    }
 
     def __init__(self, manager, screen_size, stages, next_scene=None):
         super().__init__(manager, screen_size)
@@ -63,15 +58,15 @@ class FightBase(ScreenBase):
         self.enemy_hps = [hp]
 
         # load animation frames
-        name = etype.lower()
+        arch = archetype(etype)
         repo = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-        sheet_path = os.path.join(repo, 'assets', name, 'Idle.png')
+        sheet_path = os.path.join(repo, 'assets', arch.sprite_dir, 'Idle.png')
 
         frames = []
         if os.path.isfile(sheet_path):
             try:
                 sheet = pygame.image.load(sheet_path).convert_alpha()
-                n = self.FRAME_COUNTS.get(etype, 6)
+                n = arch.frame_count
                 fw = sheet.get_width() // max(1, n)
                 fh = sheet.get_height()
                 for i in range(n):
@@ -176,13 +171,13 @@ class FightGrid(FightBase):
         self.move_interval = 1.0
 
         # load a frame for enemy (reuse single frame if available)
-        name = enemy_type.lower()
+        arch = archetype(enemy_type)
         repo = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-        p = os.path.join(repo, 'assets', name, 'Idle.png')
+        p = os.path.join(repo, 'assets', arch.sprite_dir, 'Idle.png')
         
         try:
             sheet = pygame.image.load(p).convert_alpha()
-            n = self.FRAME_COUNTS.get(enemy_type, 6)
+            n = arch.frame_count
             fw = sheet.get_width() // max(1, n)
             fh = sheet.get_height()
             sub = sheet.subsurface((0,0,fw,fh))
@@ -209,10 +204,9 @@ class FightGrid(FightBase):
         self.move_timer += dt
         if self.move_timer >= self.move_interval:
             self.move_timer = 0
-            # simple random movement
-            import random
-            dx = random.choice([-1, 0, 1])
-            dy = random.choice([-1, 0, 1])
+            # simple random movement, drawn from the seeded run RNG
+            dx = self.manager.rng.choice([-1, 0, 1])
+            dy = self.manager.rng.choice([-1, 0, 1])
             nx = max(0, min(self.grid_w-1, self.enemy_x + dx))
             ny = max(0, min(self.grid_h-1, self.enemy_y + dy))
             self.enemy_x, self.enemy_y = nx, ny
@@ -2,11 +2,12 @@
 import pygame
 import os
 import json
-from scenes.base import ScreenBase
+from scenes.base import MenuScreen
 from ui.button import Button
+from ui.text_cache import render_text, sys_font
 
 
-class HighScoreScreen(ScreenBase):
+class HighScoreScreen(MenuScreen):
     """Display leaderboard of top players with lowest turn counts."""
     
     def __init__(self, manager, screen_size):
@@ -23,21 +24,23 @@ class HighScoreScreen(ScreenBase):
             self.bg = None
 
         # Fonts
-        self.font_title = pygame.font.SysFont(None, 48)
-        self.font_score = pygame.font.SysFont(None, 32)
-        self.font_button = pygame.font.SysFont(None, 28)
+        self.font_title = sys_font(48)
+        self.font_score = sys_font(32)
+        self.font_button = sys_font(28)
 
         # Back button
         cx = screen_size[0] // 2
         cy = screen_size[1] - 80
         self.back_btn = Button("Back to Menu", (cx, cy), (200, 48), self.back_to_menu, self.font_button)
+        self.widgets.widgets = [self.back_btn]
 
         # Score list (loaded on_enter)
         self.scores = []
 
     def on_enter(self):
-        """Load scores when screen becomes active."""
+        """Load scores when screen becomes active and draw them once."""
         self.load_scores()
+        super().on_enter()
 
     def load_scores(self):
         """Load high scores from highscore.json."""
@@ -66,16 +69,8 @@ class HighScoreScreen(ScreenBase):
         """Return to main menu."""
         self.manager.go_to("main_menu")
 
-    def handle_event(self, event):
-        """Handle button clicks."""
-        self.back_btn.handle_event(event)
-
-    def update(self, dt):
-        """No updates needed."""
-        pass
-
-    def draw(self, surface):
-        """Draw leaderboard with scores."""
+    def compose(self, surface):
+        """Draw the leaderboard without its button."""
         # Draw background
         if self.bg:
             surface.blit(self.bg, (0, 0))
@@ -91,7 +86,7 @@ class HighScoreScreen(ScreenBase):
         pygame.draw.rect(surface, (80, 80, 80), panel_rect, 3)  # Border
         
         # Draw title
-        title = self.font_title.render("Hall of Fame (Lowest Turns)", True, (255, 255, 255))
+        title = render_text(self.font_title, "Hall of Fame (Lowest Turns)", True, (255, 255, 255))
         tw = title.get_width()
         surface.blit(title, ((self.screen_width - tw) // 2, 50))
 
@@ -100,7 +95,7 @@ class HighScoreScreen(ScreenBase):
         spacing = 45
 
         if not self.scores:
-            no_scores = self.font_score.render("No scores yet. Be the first!", True, (200, 200, 200))
+            no_scores = render_text(self.font_score, "No scores yet. Be the first!", True, (200, 200, 200))
             surface.blit(no_scores, ((self.screen_width - no_scores.get_width()) // 2, start_y + 100))
         else:
             for i, entry in enumerate(self.scores[:10]):
@@ -120,13 +115,10 @@ class HighScoreScreen(ScreenBase):
 
                 # Format: "1. PlayerName - 12 Turns"
                 score_text = f"{rank}. {name} - {turns} Turns"
-                text_surf = self.font_score.render(score_text, True, color)
+                text_surf = render_text(self.font_score, score_text, True, color)
                 
                 # Center horizontally
                 x = (self.screen_width - text_surf.get_width()) // 2
                 y = start_y + (i * spacing)
                 
                 surface.blit(text_surf, (x, y))
-
-        # Draw back button
-        self.back_btn.draw(surface)
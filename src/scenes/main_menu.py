@@ -1,9 +1,9 @@
 import pygame
 import os
-from scenes.base import ScreenBase
+from scenes.base import MenuScreen
 from ui.button import Button
 
-class MainMenuScreen(ScreenBase):
+class MainMenuScreen(MenuScreen):
     def __init__(self, manager, screen_size):
         super().__init__(manager, screen_size)
 
@@ -26,6 +26,7 @@ class MainMenuScreen(ScreenBase):
             Button("High Score", (cx, cy + 60), (180, 40), self.go_high_score, self.font_button),
             Button("Exit", (cx, cy + 120), (180, 40), self.exit_game, self.font_button),
         ]
+        self.widgets.widgets = self.buttons
 
         # Load main menu music
         music_path = os.path.join(base_path, "..", "..", "assets", "sounds", "mainmenu_sound.mp3")
@@ -42,6 +43,7 @@ class MainMenuScreen(ScreenBase):
                 pygame.mixer.music.play(-1)  # Loop indefinitely
             except Exception as ex:
                 print(f"✗ Error playing main menu music: {ex}")
+        super().on_enter()
 
     def on_exit(self):
         """Stop music when leaving main menu."""
@@ -56,16 +58,10 @@ class MainMenuScreen(ScreenBase):
         self.manager.go_to("high_score")
 
     def exit_game(self):
-        pygame.quit()
-        raise SystemExit
+        # main() ends its loop on QUIT and saves the replay before quitting
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
 
-    def handle_event(self, event):
-        for b in self.buttons:
-            b.handle_event(event)
-
-    def update(self, dt): pass
-
-    def draw(self, surface):
+    def compose(self, surface):
         # Draw background
         surface.blit(self.bg, (0, 0))
 
@@ -76,7 +72,3 @@ class MainMenuScreen(ScreenBase):
         tw, th = title.get_width(), title.get_height()
         x = (self.screen_width - tw) // 2
         surface.blit(title, (x, 70))
-
-        # Draw buttons
-        for b in self.buttons:
-            b.draw(surface)
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""Wave battle: hundreds of enemies at once on an enlarged open grid."""
+import time
+from engine.battle_engine import BattleEngine
+from scenes.battle_scene import TurnBasedGrid
+from scenes.components.frame_timer import FrameTimer
+
+
+class WaveBattle(TurnBasedGrid):
+    """TurnBasedGrid for a wave (see RunState.wave_battle).
+
+    What keeps a few hundred enemies at 60 FPS lives in the shared code:
+    the engine's tile index and batched fuzzy scoring (`batch_ai`), one
+    frame list and animation clock per enemy type, a single blits() call
+    for the sprites and one sound per type per frame. Enemies use
+    plain fuzzy logic; AI_DIFFICULTY search is not run for a wave.
+
+    A FrameTimer measures every frame. Its percentiles are shown in the
+    panel, printed every FRAME_REPORT_SECONDS and once more when the
+    battle is left.
+    """
+
+    def __init__(self, manager, screen_size, enemies: list[dict], grid, batch_ai=True,
+                 reward_levels=0, next_scene=None, forced_inference=None):
+        engine = BattleEngine(manager, enemies=enemies, grid=grid, batch_ai=batch_ai,
+                              forced_inference=forced_inference, reward_levels=reward_levels)
+        super().__init__(manager, screen_size, engine=engine, next_scene=next_scene)
+        self.resumed = False  # a fresh battle, only built before the scene
+        self.frame_timer = FrameTimer(f'Wave ({len(self.enemies)} enemies)')
+
+    def on_enter(self):
+        super().on_enter()
+        self.frame_timer.reset()
+
+    def on_exit(self):
+        super().on_exit()
+        self.frame_timer.report()
+
+    def update(self, dt):
+        self.frame_timer.frame()
+        started = time.perf_counter()
+        super().update(dt)
+        self.frame_timer.work(time.perf_counter() - started)
+        self.frame_timer.maybe_report()
+
+    def draw(self, surface):
+        started = time.perf_counter()
+        rects = super().draw(surface)
+        self.frame_timer.work(time.perf_counter() - started)
+        return rects
+
+    def _draw_overlay(self, layer):
+        stats = self.frame_timer.stats()
+        if stats is not None:
+            alive = sum(1 for e in self.enemies if e.alive)
+            fields = (('', f'{stats.fps:.0f}'), (' FPS | p95 ', f'{stats.p95_ms:.1f}'),
+                      (' ms | Enemies: ', alive))
+            self.renderer.add_fields(layer, fields, (200, 200, 255),
+                                     topright=(self.screen_width - 8, self.grid_h * self.tile + 30))
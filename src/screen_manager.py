@@ -1,19 +1,32 @@
-import random
 from scenes.main_menu import MainMenuScreen
 from scenes.end_menu import EndMenuScreen
 from scenes.high_score import HighScoreScreen
 from scenes.campfire import CampfireScreen
-from entities.player import Player
+import os
+import time
+from config import AUTO_RESOLVE_POLICY, AUTO_RESOLVE_MAX_TURNS, FAST_FORWARD_EVERY, AI_WORKER
+from ai.worker import AIWorker
+from engine.run_state import RunState
+from engine.replay import current_fuzzy_params
+from engine.replay_binary import ReplayWriter
 
-class ScreenManager:
-    def __init__(self, screen_size):
+REPLAY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'replays'))
+
+class ScreenManager(RunState):
+    def __init__(self, screen_size, seed=None):
+        # Replays are written to REPLAY_DIR unless a replay is being played back
+        self.save_replays = True
+        # Every run is seeded with this when given (random seeds otherwise)
+        self.fixed_seed = seed
+        # Enemy scorer forced on every battle (None: the usual per-type one)
+        self.forced_inference = None
+        # Battles send search/Mamdani enemy decisions here (started on first use)
+        self.ai_worker = AIWorker(AI_WORKER) if AI_WORKER else None
+        # RPG persistent player stats, turn counter and unlocks live in RunState
+        super().__init__(seed=seed)
         self.screen_size = screen_size
         self.screens = {}
         self.current_screen = None
-        self.total_run_turns = 0  # Global turn counter for entire run
-        # RPG persistent player stats - uses centralized defaults from Player
-        self.player_stats = Player.get_default_stats()
-        self.miniboss_defeated = False
         self._register_screens()
 
     def _register_screens(self):
@@ -24,55 +37,127 @@ class ScreenManager:
 
         self.go_to("main_menu")
 
-    def reset_score(self):
-        """Reset the global turn counter and player stats for a new game run."""
-        self.total_run_turns = 0
-        self.player_stats = Player.get_default_stats()
-        self.miniboss_defeated = False
-
     def level_up(self, amount):
         """Level up the player, increasing stats and full heal."""
-        self.player_stats['level'] += amount
-        self.player_stats['atk'] += 5 * amount
-        self.player_stats['max_hp'] += 10 * amount
-        # Full heal on level up
-        self.player_stats['hp'] = self.player_stats['max_hp']
-        self.player_stats['mana'] = self.player_stats['max_mana']
+        super().level_up(amount)
         print(f"Leveled Up to {self.player_stats['level']}!")
 
-    def update_player_state(self, hp, mana):
-        """Update player stats with current battle values (damage persists)."""
-        self.player_stats['hp'] = hp
-        self.player_stats['mana'] = mana
+    def reset_score(self, seed=None, replay=None):
+        """Start a new run, keeping the replay of the previous one."""
+        if hasattr(self, 'replay'):
+            self.save_replay()
+        super().reset_score(self.fixed_seed if seed is None else seed, replay)
+
+    def new_replay(self, seed):
+        """Stream the run to a binary replay in REPLAY_DIR (see engine.replay_binary)."""
+        if not self.save_replays:
+            return super().new_replay(seed)
+        try:
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+        except OSError as ex:
+            print(f"✗ Could not create replay folder: {ex}")
+            return super().new_replay(seed)
+        name = f"run_{time.strftime('%Y%m%d_%H%M%S')}_{seed}.fpr"
+        return ReplayWriter(os.path.join(REPLAY_DIR, name), seed, self.params_overrides,
+                            fuzzy_params=current_fuzzy_params(), inference=self.forced_inference)
+
+    def save_replay(self):
+        """Finish the current run's replay file once it has a battle.
 
-    def start_hunt(self):
-        """Battle Factory: Start a random hunt with 3 stages, reward +1 level."""
+        Returns:
+            The file path, or None if nothing was written.
+        """
+        if not self.save_replays or self.replay.battle_count == 0:
+            return None
+        if self.replay.saved_path:
+            return self.replay.saved_path
+        try:
+            path = self.replay.save()
+            print(f"✓ Replay saved: {path}")
+            return path
+        except OSError as ex:
+            print(f"✗ Could not save replay: {ex}")
+            return None
+
+    def start_hunt(self, fast_forward=False):
+        """Battle Factory: Start a random hunt with 3 stages, reward +1 level.
+
+        With fast_forward, AUTO_RESOLVE_POLICY plays the hunt one turn per
+        frame and only every FAST_FORWARD_EVERY-th turn is drawn.
+        """
         from scenes.battle_scene import TurnBasedGrid
-        enemy_types = ['Zombie', 'Skeleton', 'Zombie']
-        random.shuffle(enemy_types)
-        battle = TurnBasedGrid(self, self.screen_size, stages=enemy_types, reward_levels=1)
+        from sim.policies import resolve_policy
+        extra = {}
+        if fast_forward:
+            extra = {'autoplay': resolve_policy(AUTO_RESOLVE_POLICY), 'render_every': FAST_FORWARD_EVERY}
+        battle = TurnBasedGrid(self, self.screen_size, forced_inference=self.forced_inference,
+                               **self.start_battle('hunt'), **extra)
+        self.screens['battle'] = battle
+        self.go_to('battle')
+
+    def auto_hunt(self):
+        """Play a hunt headlessly with AUTO_RESOLVE_POLICY and report it.
+
+        The engine applies the usual level_up / update_player_state /
+        total_run_turns bookkeeping and the battle is recorded in the replay.
+        Enemies use plain fuzzy logic (no AI_DIFFICULTY search), so a hunt
+        resolves in milliseconds. A defeat goes to the end menu; a hunt still
+        running after AUTO_RESOLVE_MAX_TURNS opens as a normal battle.
+
+        Returns:
+            Dict with 'outcome' ('victory', 'defeat' or 'timeout'), 'turns'
+            and 'ms'.
+        """
+        from engine.battle_engine import BattleEngine
+        from sim.policies import resolve_policy
+        started = time.perf_counter()
+        spec = self.start_battle('hunt')
+        engine = BattleEngine(self, forced_inference=self.forced_inference, **spec)
+        policy = resolve_policy(AUTO_RESOLVE_POLICY)
+        while not engine.is_over and engine.turn_count < AUTO_RESOLVE_MAX_TURNS:
+            if not engine.submit(policy(engine)):
+                engine.submit(('END', None))
+            engine.drain_events()
+        result = {'outcome': engine.outcome or 'timeout', 'turns': engine.turn_count,
+                  'ms': (time.perf_counter() - started) * 1000.0}
+        print(f"Auto hunt: {result['outcome']} in {result['turns']} turns ({result['ms']:.1f} ms)")
+        if engine.outcome == 'defeat':
+            self.go_to('end_menu')
+        elif not engine.is_over:
+            from scenes.battle_scene import TurnBasedGrid
+            self.screens['battle'] = TurnBasedGrid(self, self.screen_size, engine=engine, **spec)
+            self.go_to('battle')
+        return result
+
+    def start_wave(self):
+        """Battle Factory: Start a wave battle (see RunState.wave_battle)."""
+        from scenes.wave_battle import WaveBattle
+        battle = WaveBattle(self, self.screen_size, forced_inference=self.forced_inference,
+                            **self.start_battle('wave'))
         self.screens['battle'] = battle
         self.go_to('battle')
 
     def start_miniboss(self):
         """Battle Factory: Start miniboss fight, reward +3 levels, unlocks boss."""
         from scenes.battle_scene import TurnBasedGrid
-        battle = TurnBasedGrid(self, self.screen_size, stages=['Enderman'], reward_levels=3, is_miniboss=True)
+        battle = TurnBasedGrid(self, self.screen_size, forced_inference=self.forced_inference,
+                               **self.start_battle('miniboss'))
         self.screens['battle'] = battle
         self.go_to('battle')
 
     def start_boss(self):
         """Battle Factory: Start boss fight, next scene is end_menu."""
         from scenes.battle_scene import TurnBasedGrid
-        battle = TurnBasedGrid(self, self.screen_size, stages=['Boss'], is_miniboss=False, next_scene='end_menu')
+        battle = TurnBasedGrid(self, self.screen_size, next_scene='end_menu',
+                               forced_inference=self.forced_inference, **self.start_battle('boss'))
         self.screens['battle'] = battle
         self.go_to('battle')
 
     def go_to(self, name):
         if name == "exit_game":
             import pygame
-            pygame.quit()
-            raise SystemExit
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+            return
         
         # Call on_exit on the current screen before switching
         if self.current_screen and hasattr(self.current_screen, 'on_exit'):
@@ -91,4 +176,10 @@ class ScreenManager:
         self.current_screen.update(dt)
 
     def draw(self, surface):
-        self.current_screen.draw(surface)
+        """Draw the current screen.
+
+        Returns:
+            The rects it changed for pygame.display.update, or None when it
+            redrew the whole surface.
+        """
+        return self.current_screen.draw(surface)
@@ -0,0 +1 @@
+"""Headless simulation tools built on engine.BattleEngine."""
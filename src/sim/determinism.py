@@ -0,0 +1,233 @@
+"""Cross-process determinism check for the battle engine.
+
+Plays the same seeded runs once in this process (the reference) and again
+on fresh worker processes started with other PYTHONHASHSEED values and
+with the batch fuzzy scorers (ai/fuzzy_batch.py) in place of the scalar
+ones. After every player turn the full battle state is flattened into named
+fields and digested with BLAKE2 (hash() would itself depend on the seed).
+The first turn whose digest differs from the reference is reported with
+the first field that differs, e.g.
+
+    ✗ sugeno hashseed=7 batch: seed 3, battle 2 (hunt), turn 5: units[1].x 4 != 3
+
+Set iteration order is what usually breaks this: `occupied` sets and
+influence-map candidates feed the pick_adjacent_* / teleport tie-breaks.
+
+Example:
+    python run_verify.py --runs 20 --hash-seeds 0,1,2 --inference mamdani,sugeno
+"""
+import argparse
+import hashlib
+import multiprocessing
+import os
+import sys
+import time
+from collections import namedtuple
+
+from engine.battle_engine import BattleEngine
+from engine.run_state import RunState
+from sim.policies import POLICIES, resolve_policy
+from sim.runner import DEFAULT_MAX_TURNS, _battle_schedule, assignment_arg, parse_assignments
+
+BACKENDS = ('scalar', 'batch')
+
+TurnRecord = namedtuple('TurnRecord', 'battle kind turn digest fields')
+TurnRecord.__doc__ = """State after one player turn of a traced run.
+
+Attributes:
+    battle: Battle number within the run (1-based).
+    kind: Battle kind ('hunt', 'miniboss', 'boss').
+    turn: engine.turn_count after the turn.
+    digest: BLAKE2 digest of `fields`.
+    fields: Tuple of (name, value) pairs describing the whole state.
+"""
+
+Divergence = namedtuple('Divergence', 'seed battle kind turn field expected actual')
+
+
+def state_fields(engine):
+    """Flatten the engine's state (and its run's) into (name, value) pairs."""
+    state = engine.snapshot_state()
+    fields = [('turn', state.turn), ('turn_count', state.turn_count),
+              ('stage_index', state.stage_index), ('stages', state.stages),
+              ('outcome', state.outcome), ('total_run_turns', state.total_run_turns),
+              ('player_level', state.player_level), ('zobrist', engine.hash)]
+    for i, unit in enumerate(state.units):
+        fields += [(f'units[{i}].{name}', value) for name, value in unit._asdict().items()]
+    if state.rng_state is not None:
+        fields.append(('rng', hashlib.blake2b(repr(state.rng_state).encode(), digest_size=8).hexdigest()))
+    return tuple(fields)
+
+
+def digest(fields):
+    return hashlib.blake2b(repr(fields).encode(), digest_size=16).hexdigest()
+
+
+def use_backend(name):
+    """Score enemies with the scalar ('scalar') or batch ('batch') fuzzy scorers.
+
+    The batch backend routes fuzzy_logic.get_action_score through
+    fuzzy_batch.batch_action_scores with one-row arrays. It patches this
+    process's fuzzy_logic module, so it is meant for verifier workers.
+    """
+    from ai import fuzzy_logic, fuzzy_batch
+    if not hasattr(use_backend, 'scalar'):
+        use_backend.scalar = fuzzy_logic.get_action_score
+    if name == 'scalar':
+        fuzzy_logic.get_action_score = use_backend.scalar
+    elif name == 'batch':
+        def batch_score(bot_type, hp_p, hp_b, mana_p, mana_b, cd_p, method=None):
+            uses_mana = bot_type not in ('Zombie', 'Skeleton')
+            return float(fuzzy_batch.batch_action_scores([uses_mana], [hp_p], [hp_b], [mana_p], [mana_b],
+                                                         [cd_p], method)[0])
+        fuzzy_logic.get_action_score = batch_score
+    else:
+        raise ValueError(f"Unknown scoring backend: {name!r}")
+
+
+def trace_run(seed, overrides=None, policy='aggressive', hunts=3, inference=None,
+              max_turns=DEFAULT_MAX_TURNS):
+    """Play one run like sim.runner.play_run and record the state after every turn.
+
+    Returns:
+        List of TurnRecord.
+    """
+    run = RunState(overrides, seed=seed)
+    policy_fn = resolve_policy(policy)
+    trace = []
+    for battle, (kind, spec) in enumerate(_battle_schedule(run, hunts), 1):
+        engine = BattleEngine(run, forced_inference=inference, **spec)
+        while not engine.is_over and engine.turn_count < max_turns:
+            if not engine.submit(policy_fn(engine)):
+                engine.submit(('END', None))
+            engine.drain_events()
+            fields = state_fields(engine)
+            trace.append(TurnRecord(battle, kind, engine.turn_count, digest(fields), fields))
+        if engine.outcome != 'victory':
+            break
+    return trace
+
+
+def first_divergence(seed, expected, actual):
+    """First differing turn/field between two traces, or None if identical."""
+    for ref, got in zip(expected, actual):
+        if ref.digest == got.digest:
+            continue
+        ref_fields, got_fields = dict(ref.fields), dict(got.fields)
+        for name, value in ref.fields:
+            if got_fields.get(name, '<missing>') != value:
+                return Divergence(seed, ref.battle, ref.kind, ref.turn, name, value, got_fields.get(name, '<missing>'))
+        extra = next(n for n, _ in got.fields if n not in ref_fields)
+        return Divergence(seed, ref.battle, ref.kind, ref.turn, extra, '<missing>', got_fields[extra])
+    if len(expected) != len(actual):
+        last = expected[-1] if len(expected) < len(actual) else actual[-1] if actual else expected[0]
+        return Divergence(seed, last.battle, last.kind, last.turn, 'turns played', len(expected), len(actual))
+    return None
+
+
+def _trace_task(task):
+    """Worker entry point; task is (backend, seed, trace kwargs)."""
+    backend, seed, kwargs = task
+    use_backend(backend)
+    return seed, os.getpid(), trace_run(seed, **kwargs)
+
+
+def _spawn_pool(workers, hash_seed):
+    """Process pool of fresh interpreters started with PYTHONHASHSEED=hash_seed."""
+    ctx = multiprocessing.get_context('spawn')
+    saved = os.environ.get('PYTHONHASHSEED')
+    os.environ['PYTHONHASHSEED'] = str(hash_seed)
+    try:
+        return ctx.Pool(workers)  # workers start now and inherit the variable
+    finally:
+        if saved is None:
+            del os.environ['PYTHONHASHSEED']
+        else:
+            os.environ['PYTHONHASHSEED'] = saved
+
+
+def verify(seeds, inferences=(None,), hash_seeds=(0, 1), backends=BACKENDS, workers=2,
+           out=sys.stdout, **kwargs):
+    """Compare in-process reference traces with every worker variant.
+
+    Args:
+        seeds: Run seeds to play.
+        inferences: Fuzzy inference methods; each is checked on its own.
+        hash_seeds: PYTHONHASHSEED of each worker pool.
+        backends: Scoring backends run in every pool.
+        workers: Processes per pool.
+        kwargs: Run settings for trace_run (overrides, policy, ...).
+
+    Returns:
+        Dict {(inference, hash_seed, backend): list of Divergence}.
+    """
+    results = {}
+    use_backend('scalar')
+    references = {inference: {s: trace_run(s, inference=inference, **kwargs) for s in seeds}
+                  for inference in inferences}
+    for hash_seed in hash_seeds:
+        pool = _spawn_pool(workers, hash_seed)
+        try:
+            for inference in inferences:
+                reference = references[inference]
+                turns = sum(len(t) for t in reference.values())
+                for backend in backends:
+                    tasks = [(backend, s, dict(kwargs, inference=inference)) for s in seeds]
+                    divergences, pids = [], set()
+                    started = time.perf_counter()
+                    for seed, pid, trace in pool.imap_unordered(_trace_task, tasks):
+                        pids.add(pid)
+                        d = first_divergence(seed, reference[seed], trace)
+                        if d is not None:
+                            divergences.append(d)
+                    divergences.sort()
+                    results[(inference, hash_seed, backend)] = divergences
+                    label = f"{inference or 'mamdani'} hashseed={hash_seed} {backend}"
+                    if divergences:
+                        d = divergences[0]
+                        print(f"✗ {label}: {len(divergences)}/{len(seeds)} runs differ; first at "
+                              f"seed {d.seed}, battle {d.battle} ({d.kind}), turn {d.turn}: "
+                              f"{d.field} {d.actual!r} != {d.expected!r}", file=out)
+                    else:
+                        print(f"✓ {label}: {len(seeds)} runs, {turns} turns identical "
+                              f"({len(pids)} workers, {time.perf_counter() - started:.1f}s)", file=out)
+        finally:
+            pool.close()
+            pool.join()
+    return results
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Cross-process determinism check of the battle engine.")
+    parser.add_argument('--runs', type=int, default=10, help="seeded runs per variant")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first run")
+    parser.add_argument('--hash-seeds', default='0,1,2', help="PYTHONHASHSEED values, comma separated")
+    parser.add_argument('--inference', default='mamdani,sugeno,tsukamoto,fallback',
+                        help="inference methods to check, comma separated")
+    parser.add_argument('--backends', default=','.join(BACKENDS), help="scoring backends, comma separated")
+    parser.add_argument('--workers', type=int, default=2, help="processes per pool")
+    parser.add_argument('--policy', default='aggressive', help=f"player policy: {', '.join(POLICIES)}")
+    parser.add_argument('--hunts', type=int, default=3)
+    parser.add_argument('--max-turns', type=int, default=DEFAULT_MAX_TURNS)
+    parser.add_argument('--set', dest='overrides', action='append', metavar='NAME=VALUE',
+                        type=assignment_arg(), help="override a config value for every run")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    seeds = list(range(args.seed, args.seed + args.runs))
+    inferences = [None if m == 'mamdani' else m for m in args.inference.split(',') if m]
+    results = verify(seeds, inferences, [int(h) for h in args.hash_seeds.split(',') if h],
+                     [b for b in args.backends.split(',') if b], args.workers,
+                     overrides=parse_assignments(args.overrides), policy=args.policy,
+                     hunts=args.hunts, max_turns=args.max_turns)
+    failed = sum(1 for d in results.values() if d)
+    if failed:
+        print(f"✗ {failed}/{len(results)} variants diverged")
+        sys.exit(1)
+    print(f"✓ All {len(results)} variants deterministic")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Gym-style environments for player-side agents against the fuzzy enemies.
+
+Two interfaces over the same rules and encodings:
+
+- BattleEnv: one battle on the real BattleEngine;
+- VectorBattleEnv: n battles in lockstep on VectorBattleSim, with
+  autoreset, so one step() call advances every battle.
+
+Both follow the Gym reset/step protocol without depending on gym:
+
+    env = VectorBattleEnv(1024, kind='hunt', seed=0)
+    obs, info = env.reset()
+    obs, reward, terminated, truncated, info = env.step(actions)
+
+Observations are dicts of NumPy arrays:
+    'grid'   float32 (N_PLANES, grid_h, grid_w): blocked tiles, the
+             player, one plane per built-in enemy type, one for any
+             registered type, and the player's legal MOVE tiles
+    'stats'  float32 (len(STAT_FIELDS),): raw unit stats and turn/stage
+The vector env adds a leading batch axis.
+
+Actions use the sim.vector_sim integer encoding (END, HEAL, ATTACK + d,
+MOVE + tile); `info['action_mask']` marks the legal ones, and an illegal
+action ends the turn. Rewards: -turn_penalty per turn, plus win_reward on
+victory and loss_reward on defeat (escape and timeout add nothing).
+"""
+import random
+
+import numpy as np
+
+from ai.influence_maps import DIRECTIONS
+from engine.battle_engine import BattleEngine
+from engine.params import default_player_stats, game_params
+from engine.run_state import RunState, HUNT_STAGES
+from sim.vector_sim import (VectorBattleSim, grid_tables, ENEMY_TYPES, ZOMBIE, type_codes,
+                            ACTION_END, ACTION_HEAL, ACTION_ATTACK, ACTION_MOVE,
+                            OUTCOME_VICTORY, OUTCOME_DEFEAT)
+
+BATTLE_KINDS = ('hunt', 'miniboss', 'boss')
+# registered enemy types beyond the built-ins share the 'other' plane
+PLANES = ('blocked', 'player') + tuple(t.lower() for t in ENEMY_TYPES) + ('other', 'move')
+N_PLANES = len(PLANES)
+STAT_FIELDS = ('player_hp', 'player_max_hp', 'player_mana', 'player_max_mana', 'player_atk',
+               'enemy_hp', 'enemy_max_hp', 'enemy_mana', 'enemy_atk',
+               'turn_count', 'stage_index', 'n_stages')
+
+
+def n_actions(tables=None):
+    """Size of the action space for a grid."""
+    return ACTION_MOVE + (tables or grid_tables()).n_tiles
+
+
+def action_to_command(action, player_pos, grid_w):
+    """BattleEngine command tuple for an integer action."""
+    action = int(action)
+    if action == ACTION_HEAL:
+        return ('HEAL', None)
+    if ACTION_ATTACK <= action < ACTION_MOVE:
+        dx, dy = DIRECTIONS[action - ACTION_ATTACK]
+        return ('ATTACK', (player_pos[0] + dx, player_pos[1] + dy))
+    if action >= ACTION_MOVE:
+        tile = action - ACTION_MOVE
+        return ('MOVE', (tile % grid_w, tile // grid_w))
+    return ('END', None)
+
+
+def command_to_action(command, player_pos, grid_w):
+    """Integer action for a BattleEngine command tuple (e.g. a policy's)."""
+    kind, target = command
+    if kind == 'HEAL':
+        return ACTION_HEAL
+    if kind == 'ATTACK':
+        return ACTION_ATTACK + DIRECTIONS.index((target[0] - player_pos[0], target[1] - player_pos[1]))
+    if kind == 'MOVE':
+        return ACTION_MOVE + target[1] * grid_w + target[0]
+    return ACTION_END
+
+
+def stage_lists(kind, rng):
+    """Enemy stages of a new battle of `kind` (hunt order drawn from `rng`)."""
+    if kind == 'hunt':
+        order = list(HUNT_STAGES)
+        rng.shuffle(order)
+        return order
+    return ['Enderman' if kind == 'miniboss' else 'Boss']
+
+
+def encode_observations(tables, p_pos, e_pos, e_type, e_alive, stats):
+    """Batched observation dict from flat per-battle arrays.
+
+    Args:
+        tables: GridTables of the grid.
+        p_pos, e_pos: Flat tile indices (n,).
+        e_type: Enemy type codes (n,).
+        e_alive: Bool (n,).
+        stats: Array (n, len(STAT_FIELDS)).
+    """
+    n = len(p_pos)
+    rows = np.arange(n)
+    planes = np.zeros((n, N_PLANES, tables.n_tiles), dtype=np.float32)
+    planes[:, 0] = ~tables.passable
+    planes[rows, 1, p_pos] = 1.0
+    alive = np.flatnonzero(e_alive)
+    plane = np.minimum(e_type[alive].astype(np.int64), len(ENEMY_TYPES))
+    planes[alive, 2 + plane, e_pos[alive]] = 1.0
+    planes[:, N_PLANES - 1] = tables.reach[p_pos, e_pos] & e_alive[:, None]
+    return {'grid': planes.reshape(n, N_PLANES, tables.grid_h, tables.grid_w),
+            'stats': np.asarray(stats, dtype=np.float32)}
+
+
+def action_masks(tables, p_pos, e_pos, e_alive, p_mana, heal_cost):
+    """Bool (n, n_actions) of the actions BattleEngine would accept."""
+    n = len(p_pos)
+    mask = np.zeros((n, ACTION_MOVE + tables.n_tiles), dtype=bool)
+    mask[:, ACTION_END] = True
+    mask[:, ACTION_HEAL] = p_mana >= heal_cost
+    direction = tables.direction[p_pos, e_pos]
+    adjacent = np.flatnonzero(e_alive & (direction >= 0))
+    mask[adjacent, ACTION_ATTACK + direction[adjacent]] = True
+    mask[:, ACTION_MOVE:] = tables.reach[p_pos, e_pos] & e_alive[:, None]
+    return mask
+
+
+class BattleEnv:
+    """One staged battle on BattleEngine, with the Gym reset/step protocol.
+
+    Args:
+        kind: 'hunt', 'miniboss' or 'boss'.
+        params_overrides: Config overrides (see engine.params).
+        inference: Enemy fuzzy scorer override.
+        max_turns: Turns before the episode is truncated.
+        turn_penalty, win_reward, loss_reward: Reward shaping.
+    """
+
+    def __init__(self, kind='hunt', params_overrides=None, inference=None, max_turns=200,
+                 turn_penalty=0.01, win_reward=1.0, loss_reward=-1.0):
+        if kind not in BATTLE_KINDS:
+            raise ValueError(f"Unknown battle kind: {kind}")
+        self.kind = kind
+        self.params_overrides = dict(params_overrides or {})
+        self.params = game_params(self.params_overrides)
+        self.inference = inference
+        self.max_turns = max_turns
+        self.turn_penalty = turn_penalty
+        self.win_reward = win_reward
+        self.loss_reward = loss_reward
+        self.tables = grid_tables()
+        self.n_actions = n_actions(self.tables)
+        self.engine = None
+
+    def reset(self, seed=None):
+        """Start a new battle; `seed` fixes the run RNG (hunt stage order)."""
+        run = RunState(self.params_overrides, seed=seed)
+        self.engine = BattleEngine(run, forced_inference=self.inference, **run.start_battle(self.kind))
+        self.engine.drain_events()
+        return self._observe(), self._info()
+
+    def step(self, action):
+        """Play one player action and the enemy phase.
+
+        Returns:
+            Tuple (obs, reward, terminated, truncated, info).
+        """
+        engine = self.engine
+        command = action_to_command(action, (engine.player.x, engine.player.y), engine.grid_w)
+        accepted = engine.submit(command)
+        if not accepted:
+            engine.submit(('END', None))
+        engine.drain_events()
+
+        reward = -self.turn_penalty
+        if engine.outcome == 'victory':
+            reward += self.win_reward
+        elif engine.outcome == 'defeat':
+            reward += self.loss_reward
+        terminated = engine.is_over
+        truncated = not terminated and engine.turn_count >= self.max_turns
+        info = self._info()
+        info['accepted'] = accepted
+        return self._observe(), reward, terminated, truncated, info
+
+    def _arrays(self):
+        engine = self.engine
+        w = engine.grid_w
+        p = engine.player
+        e = engine.enemies[0]
+        stats = [p.hp, p.max_hp, p.mana, p.max_mana, p.atk, e.hp, e.max_hp, e.mana, e.atk,
+                 engine.turn_count, engine.stage_index, len(engine.stages)]
+        return (np.array([p.y * w + p.x]), np.array([e.y * w + e.x]),
+                np.array([type_codes().get(type(e).__name__, ZOMBIE)]), np.array([e.alive]), np.array([stats]))
+
+    def _observe(self):
+        p_pos, e_pos, e_type, e_alive, stats = self._arrays()
+        obs = encode_observations(self.tables, p_pos, e_pos, e_type, e_alive, stats)
+        return {key: value[0] for key, value in obs.items()}
+
+    def _info(self):
+        p_pos, e_pos, _, e_alive, _ = self._arrays()
+        mask = action_masks(self.tables, p_pos, e_pos, e_alive, np.array([self.engine.player.mana]),
+                            self.params['PLAYER_HEAL_COST'])
+        return {'outcome': self.engine.outcome, 'action_mask': mask[0]}
+
+
+class VectorBattleEnv:
+    """n battles stepped together, restarting each one as soon as it ends.
+
+    A finished battle is reset inside the same step() call: its reward,
+    terminated/truncated flags and info['final_obs'] / info['outcome']
+    describe the episode that just ended, while the returned observation
+    is already the first one of the next episode.
+
+    Args:
+        n: Number of parallel battles.
+        kind: 'hunt', 'miniboss' or 'boss'.
+        params_overrides: Config overrides (see engine.params).
+        inference: Enemy fuzzy scorer override.
+        max_turns: Turns before an episode is truncated.
+        seed: Battle i draws its hunt orders from random.Random(seed + i),
+            so its first episode matches BattleEnv.reset(seed + i).
+        autoreset: Restart finished battles (else they stay done).
+        turn_penalty, win_reward, loss_reward: Reward shaping.
+    """
+
+    def __init__(self, n, kind='hunt', params_overrides=None, inference=None, max_turns=200,
+                 seed=0, autoreset=True, turn_penalty=0.01, win_reward=1.0, loss_reward=-1.0):
+        if kind not in BATTLE_KINDS:
+            raise ValueError(f"Unknown battle kind: {kind}")
+        self.n = n
+        self.kind = kind
+        self.params = game_params(params_overrides)
+        self.max_turns = max_turns
+        self.seed = seed
+        self.autoreset = autoreset
+        self.turn_penalty = turn_penalty
+        self.win_reward = win_reward
+        self.loss_reward = loss_reward
+        self.sim = VectorBattleSim(n, self.params, inference)
+        self.tables = self.sim.tables
+        self.n_actions = n_actions(self.tables)
+        self.player_stats = default_player_stats(self.params)
+        self.rngs = []
+        self.episodes = 0
+
+    def reset(self, seed=None):
+        """Start every battle; returns (obs, info)."""
+        if seed is not None:
+            self.seed = seed
+        self.rngs = [random.Random(self.seed + i) for i in range(self.n)]
+        self.sim.reset([stage_lists(self.kind, r) for r in self.rngs], self.player_stats)
+        return self._observe(), self._info()
+
+    def step(self, actions):
+        """Advance every running battle by one turn.
+
+        Returns:
+            Tuple (obs, reward, terminated, truncated, info) of arrays.
+        """
+        sim = self.sim
+        live = ~sim.done
+        sim.step(actions)
+
+        ended = live & sim.done
+        truncated = live & ~sim.done & (sim.turn_count >= self.max_turns)
+        sim.done |= truncated
+        reward = np.where(live, -self.turn_penalty, 0.0).astype(np.float32)
+        reward[ended & (sim.outcome == OUTCOME_VICTORY)] += self.win_reward
+        reward[ended & (sim.outcome == OUTCOME_DEFEAT)] += self.loss_reward
+
+        info = {}
+        finished = ended | truncated
+        if finished.any():
+            info['final_obs'] = self._observe()
+            info['outcome'] = sim.outcome.copy()
+            info['episode_turns'] = sim.turn_count.copy()
+            self.episodes += int(finished.sum())
+            if self.autoreset:
+                rows = np.flatnonzero(finished)
+                sim.reset_rows(finished, [stage_lists(self.kind, self.rngs[i]) for i in rows],
+                               self.player_stats)
+        info.update(self._info())
+        return self._observe(), reward, ended, truncated, info
+
+    def _observe(self):
+        sim = self.sim
+        stats = np.stack([sim.p_hp, sim.p_max_hp, sim.p_mana, sim.p_max_mana, sim.p_atk,
+                          sim.e_hp, sim.e_max_hp, sim.e_mana, sim.e_atk,
+                          sim.turn_count, sim.stage_index, sim.n_stages], axis=1)
+        return encode_observations(self.tables, sim.p_pos, sim.e_pos, sim.e_type, sim.e_alive, stats)
+
+    def _info(self):
+        sim = self.sim
+        return {'action_mask': action_masks(self.tables, sim.p_pos, sim.e_pos, sim.e_alive,
+                                            sim.p_mana, self.params['PLAYER_HEAL_COST'])}
+
+
+def random_masked_actions(mask, rng):
+    """One uniformly random legal action per row of `mask` (NumPy Generator)."""
+    weights = rng.random(mask.shape) * mask
+    return weights.argmax(axis=1).astype(np.int32)
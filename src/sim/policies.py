@@ -0,0 +1,85 @@
+"""Scripted player policies for headless battles.
+
+A policy is any callable ``policy(engine) -> command`` returning one of the
+BattleEngine command tuples. Custom policies can be passed to the runner as
+``"package.module:function"``.
+"""
+import importlib
+
+
+def _manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def _adjacent_target(engine):
+    """Weakest living enemy next to the player, or None."""
+    p = (engine.player.x, engine.player.y)
+    adjacent = [e for e in engine.enemies if e.alive and _manhattan(p, (e.x, e.y)) == 1]
+    if not adjacent:
+        return None
+    return min(adjacent, key=lambda e: (e.hp, e.x, e.y))
+
+
+def _approach_tile(engine):
+    """Reachable tile that gets closest to any living enemy, or None."""
+    enemies = [(e.x, e.y) for e in engine.enemies if e.alive]
+    if not enemies:
+        return None
+    here = (engine.player.x, engine.player.y)
+    best, best_d = None, min(_manhattan(here, e) for e in enemies)
+    for tile in sorted(engine.move_targets()):
+        d = min(_manhattan(tile, e) for e in enemies)
+        if d < best_d:
+            best, best_d = tile, d
+    return best
+
+
+def _should_heal(engine, ratio):
+    p = engine.player
+    return p.hp < p.max_hp and p.hp <= p.max_hp * ratio and p.mana >= engine.params['PLAYER_HEAL_COST']
+
+
+def _fight(engine, heal_ratio):
+    target = _adjacent_target(engine)
+    if _should_heal(engine, heal_ratio):
+        return ('HEAL', None)
+    if target is not None:
+        return ('ATTACK', (target.x, target.y))
+    tile = _approach_tile(engine)
+    if tile is not None:
+        return ('MOVE', tile)
+    return ('END', None)
+
+
+def aggressive(engine):
+    """Close in and attack, heal only when below 40% HP."""
+    return _fight(engine, 0.4)
+
+
+def cautious(engine):
+    """Same as aggressive but heals from 60% HP."""
+    return _fight(engine, 0.6)
+
+
+def passive(engine):
+    """Always end the turn (baseline for enemy damage output)."""
+    return ('END', None)
+
+
+POLICIES = {
+    'aggressive': aggressive,
+    'cautious': cautious,
+    'passive': passive,
+}
+
+
+def resolve_policy(name):
+    """Return a policy callable from a built-in name or "module:function"."""
+    if callable(name):
+        return name
+    if name in POLICIES:
+        return POLICIES[name]
+    if ':' in name:
+        module_name, func_name = name.split(':', 1)
+        return getattr(importlib.import_module(module_name), func_name)
+    raise KeyError(f"Unknown policy: {name}")
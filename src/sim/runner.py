@@ -0,0 +1,475 @@
+"""Monte Carlo balance runner: plays whole runs headlessly on a process pool.
+
+A run follows the campfire loop of the game: a number of hunts (the shuffled
+3-stage battles from ScreenManager.start_hunt), then the miniboss, then the
+boss. Results stream back per run and are folded into per-config aggregates.
+
+Example:
+    python run_sim.py --runs 500 --policy cautious --sweep BOSS_HP=100,120,140
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from ai import fuzzy_logic
+from engine.battle_engine import BattleEngine
+from engine.replay import current_fuzzy_params
+from engine.replay_binary import ReplayWriter
+from engine.run_state import RunState
+from sim.policies import POLICIES, resolve_policy
+
+DEFAULT_MAX_TURNS = 200
+
+
+def _battle_schedule(run, hunts):
+    """Yield (kind, engine kwargs) for each battle of a run, in order."""
+    for kind in ['hunt'] * hunts + ['miniboss', 'boss']:
+        yield kind, run.start_battle(kind)
+
+
+def play_battle(run, spec, policy, inference=None, max_turns=DEFAULT_MAX_TURNS, kind='battle',
+                actions=None):
+    """Play one battle to the end with a scripted policy.
+
+    With `actions` (a Counter), every accepted player command is counted
+    under its kind; a rejected one counts as the END that replaces it.
+
+    Returns:
+        Tuple (outcome, turns, damage) where damage maps the "kind:Enemy"
+        key of every stage reached to HP lost by the player during it. Outcome is the
+        engine outcome or 'timeout'.
+    """
+    engine = BattleEngine(run, forced_inference=inference, **spec)
+    damage = defaultdict(int)
+    stage_key = f"{kind}:{type(engine.enemies[0]).__name__}" if engine.enemies else kind
+    damage[stage_key] = 0  # a stage counts once reached, even without damage
+    while not engine.is_over and engine.turn_count < max_turns:
+        command = policy(engine)
+        if not engine.submit(command):
+            command = ('END', None)
+            engine.submit(command)
+        if actions is not None:
+            actions[command[0]] += 1
+        for ev in engine.drain_events():
+            if ev['type'] == 'enemy_attack':
+                damage[stage_key] += ev['damage']
+            elif ev['type'] == 'stage_advance':
+                stage_key = f"{kind}:{type(ev['enemies'][0]).__name__}"
+                damage[stage_key] += 0
+    return engine.outcome or 'timeout', engine.turn_count, dict(damage)
+
+
+def play_run(seed, overrides=None, policy='aggressive', hunts=3, inference=None,
+             max_turns=DEFAULT_MAX_TURNS, record_dir=None):
+    """Play one complete run and return a JSON-friendly result dict.
+
+    With `record_dir`, the run is also written there as a binary replay.
+    """
+    writer = None
+    if record_dir:
+        writer = ReplayWriter(os.path.join(record_dir, f'run_{seed}.fpr'), seed, overrides,
+                              fuzzy_params=current_fuzzy_params(), inference=inference)
+    run = RunState(overrides, seed=seed, replay=writer)
+    policy_fn = resolve_policy(policy)
+    damage = {}
+    actions = Counter()
+    outcome = 'win'
+    battles = 0
+    last_kind = None
+    for kind, spec in _battle_schedule(run, hunts):
+        battles += 1
+        last_kind = kind
+        result, _, dmg = play_battle(run, spec, policy_fn, inference, max_turns, kind, actions)
+        for key, value in dmg.items():
+            damage[key] = damage.get(key, 0) + value
+        if result != 'victory':
+            outcome = result
+            break
+    if writer is not None:
+        writer.close()
+    return {
+        'seed': seed,
+        'overrides': dict(overrides or {}),
+        'outcome': outcome,
+        'ended_at': last_kind,
+        'battles': battles,
+        'turns': run.total_run_turns,
+        'level': run.player_stats['level'],
+        'hp': run.player_stats['hp'],
+        'damage': damage,
+        'actions': dict(actions),
+    }
+
+
+def _play_task(seed, kwargs):
+    """play_run in a worker, with the fuzzy parameters the task carries.
+
+    Spawned workers start from the default parameters, so they are sent
+    with every task rather than inherited from the parent.
+    """
+    kwargs = dict(kwargs)
+    fuzzy_params = kwargs.pop('fuzzy_params', None)
+    if fuzzy_params is not None and fuzzy_params != fuzzy_logic.params:
+        fuzzy_logic.apply_params(fuzzy_params)
+    return play_run(seed, **kwargs)
+
+
+def _run_task(task):
+    """Pool entry point; task is (config_index, seed, kwargs)."""
+    index, seed, kwargs = task
+    return index, _play_task(seed, kwargs)
+
+
+def _ring_worker(ring, tasks):
+    """Shared-memory worker: play `tasks` and write each result into `ring`."""
+    from sim.shm_results import encode_result
+    for index, seed, kwargs in tasks:
+        ring.put(encode_result(index, _play_task(seed, kwargs)))
+    ring.close()
+
+
+class RunAggregate:
+    """Streaming aggregate of run results for one parameter set."""
+
+    def __init__(self, overrides):
+        self.overrides = dict(overrides)
+        self.n = 0
+        self.outcomes = Counter()
+        self.turns = []
+        self.win_turns = []
+        self.damage_total = defaultdict(int)
+        self.damage_seen = Counter()
+
+    def add(self, result):
+        self.n += 1
+        self.outcomes[result['outcome']] += 1
+        self.turns.append(result['turns'])
+        if result['outcome'] == 'win':
+            self.win_turns.append(result['turns'])
+        for key, value in result['damage'].items():
+            self.damage_total[key] += value
+            self.damage_seen[key] += 1
+
+    @property
+    def win_rate(self):
+        return self.outcomes['win'] / self.n if self.n else 0.0
+
+    @staticmethod
+    def _percentiles(values, points=(10, 50, 90)):
+        if not values:
+            return {}
+        ordered = sorted(values)
+        last = len(ordered) - 1
+        return {f'p{p}': ordered[round(last * p / 100)] for p in points}
+
+    def summary(self):
+        return {
+            'overrides': self.overrides,
+            'runs': self.n,
+            'win_rate': self.win_rate,
+            'outcomes': dict(self.outcomes),
+            'turns': self._percentiles(self.turns),
+            'win_turns': self._percentiles(self.win_turns),
+            'turn_histogram': self.histogram(self.turns),
+            'damage_per_stage': {k: self.damage_total[k] / self.damage_seen[k]
+                                 for k in sorted(self.damage_seen)},
+        }
+
+    @staticmethod
+    def histogram(values, bins=10):
+        if not values:
+            return []
+        lo, hi = min(values), max(values)
+        width = max(1, -(-(hi - lo + 1) // bins))
+        counts = Counter((v - lo) // width for v in values)
+        return [[lo + b * width, lo + (b + 1) * width - 1, counts[b]] for b in sorted(counts)]
+
+    def status_line(self):
+        label = _format_overrides(self.overrides)
+        t = self._percentiles(self.turns)
+        return (f"{label:<32} runs={self.n:<6} win={self.win_rate:6.1%} "
+                f"turns p50={t.get('p50', '-')} p90={t.get('p90', '-')}")
+
+
+def _format_overrides(overrides):
+    return ', '.join(f'{k}={v}' for k, v in sorted(overrides.items())) or '(defaults)'
+
+
+def _parse_value(text):
+    # Unit stats live in int32 EntityStore columns: a 2.7 would run as 2
+    try:
+        return int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"game parameters are integers, got {text.strip()!r}") from None
+
+
+def parse_assignments(items, multi=False):
+    """Parse NAME=VALUE (or NAME=v1,v2 when multi) strings into a dict."""
+    out = {}
+    for item in items or []:
+        if '=' not in item:
+            raise argparse.ArgumentTypeError(f"Expected NAME=VALUE, got {item!r}")
+        name, value = item.split('=', 1)
+        name = name.strip().upper()
+        if multi:
+            out[name] = [_parse_value(v) for v in value.split(',') if v.strip()]
+        else:
+            out[name] = _parse_value(value)
+    return out
+
+
+def assignment_arg(multi=False):
+    """argparse type that checks a NAME=VALUE (NAME=v1,v2 when multi) argument.
+
+    The string itself is kept for parse_assignments; a bad value is
+    reported as a usage error instead of a traceback.
+    """
+    def check(text):
+        parse_assignments([text], multi)
+        return text
+    check.__name__ = 'NAME=VALUE'
+    return check
+
+
+def expand_configs(base, sweep):
+    """Cartesian product of sweep values on top of the base overrides."""
+    if not sweep:
+        return [dict(base)]
+    names = sorted(sweep)
+    configs = []
+    for values in itertools.product(*(sweep[n] for n in names)):
+        cfg = dict(base)
+        cfg.update(zip(names, values))
+        configs.append(cfg)
+    return configs
+
+
+def run_simulations(configs, runs, policy='aggressive', hunts=3, inference=None,
+                    max_turns=DEFAULT_MAX_TURNS, seed=0, workers=None,
+                    report_every=0, out=sys.stdout, record_dir=None, shm=False,
+                    ring_capacity=1024, fuzzy_params=None):
+    """Run `runs` runs for every config on a process pool.
+
+    Seeds are shared across configs (common random numbers), so sweeps
+    compare parameter sets on the same shuffles.
+
+    With `shm`, results come back through per-worker shared-memory rings of
+    `ring_capacity` records (see sim.shm_results) instead of pickled dicts.
+
+    `fuzzy_params` (fuzzy_logic.params format) are applied in every worker;
+    by default the ones this process uses once apply_params was called.
+
+    Returns:
+        List of RunAggregate (RecordAggregate with `shm`), one per config,
+        in config order.
+    """
+    aggregates = [RunAggregate(cfg) for cfg in configs]
+    if fuzzy_params is None and fuzzy_logic.params_version:
+        fuzzy_params = fuzzy_logic.params
+    kwargs = [{'overrides': cfg, 'policy': policy, 'hunts': hunts, 'inference': inference,
+               'max_turns': max_turns, 'fuzzy_params': fuzzy_params} for cfg in configs]
+    if record_dir:
+        os.makedirs(record_dir, exist_ok=True)
+        for i, kw in enumerate(kwargs):
+            kw['record_dir'] = os.path.join(record_dir, f'config_{i}') if len(configs) > 1 else record_dir
+            os.makedirs(kw['record_dir'], exist_ok=True)
+    tasks = [(i, seed + r, kwargs[i]) for r in range(runs) for i in range(len(configs))]
+    workers = workers or os.cpu_count() or 1
+    if shm:
+        return _run_shared(configs, tasks, workers, ring_capacity, report_every, out)
+    chunksize = max(1, len(tasks) // (workers * 16))
+    done = 0
+    started = time.perf_counter()
+
+    if workers == 1:
+        results = map(_run_task, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers)
+        results = pool.imap_unordered(_run_task, tasks, chunksize)
+    try:
+        for index, result in results:
+            aggregates[index].add(result)
+            done += 1
+            if report_every and done % report_every == 0:
+                _report(aggregates, done, len(tasks), started, out)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return aggregates
+
+
+def _report(aggregates, done, total, started, out):
+    rate = done / max(1e-9, time.perf_counter() - started)
+    print(f"[{done}/{total} runs, {rate:.0f} runs/s]", file=out)
+    for agg in aggregates:
+        print("  " + agg.status_line(), file=out)
+
+
+def _run_shared(configs, tasks, workers, ring_capacity, report_every, out):
+    """run_simulations over shared-memory result rings, one per worker.
+
+    Tasks are dealt round-robin to `workers` processes. The parent polls
+    every ring, splits drained records by config into the aggregates and,
+    once all workers have closed their rings, does a last drain and merge.
+    """
+    from sim.shm_results import ResultRing, RecordAggregate
+
+    aggregates = [RecordAggregate(cfg) for cfg in configs]
+    workers = max(1, min(workers, len(tasks)))
+    rings = [ResultRing(ring_capacity) for _ in range(workers)]
+    procs = [multiprocessing.Process(target=_ring_worker, args=(ring, tasks[k::workers]), daemon=True)
+             for k, ring in enumerate(rings)]
+    done = 0
+    next_report = report_every
+    started = time.perf_counter()
+    try:
+        for proc in procs:
+            proc.start()
+        while True:
+            # read the flags first: records written before close() are drained below
+            finished = all(ring.closed for ring in rings)
+            got = 0
+            for ring in rings:
+                records = ring.drain()
+                if not len(records):
+                    continue
+                got += len(records)
+                for index in np.unique(records['config']):
+                    aggregates[index].add_records(records[records['config'] == index])
+            done += got
+            if report_every and done >= next_report:
+                _report(aggregates, done, len(tasks), started, out)
+                next_report = (done // report_every + 1) * report_every
+            if finished:
+                break
+            if not got:
+                for k, proc in enumerate(procs):
+                    if proc.exitcode not in (None, 0):
+                        raise RuntimeError(f"Simulation worker {k} exited with code {proc.exitcode}")
+                time.sleep(0.002)
+        for proc in procs:
+            proc.join()
+        for agg in aggregates:
+            agg.records  # final merge of the drained chunks
+        stalls = sum(ring.stalls for ring in rings)
+        if stalls:
+            print(f"[workers waited {stalls} times on full result rings]", file=out)
+    finally:
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+                proc.join()
+        for ring in rings:
+            ring.release()
+    return aggregates
+
+
+# heal ratios of the scripted policies the vector simulator can replay
+VECTOR_POLICIES = {'aggressive': 0.4, 'cautious': 0.6}
+
+
+def run_vectorized(configs, runs, policy='aggressive', hunts=3, inference=None,
+                   max_turns=DEFAULT_MAX_TURNS, seed=0):
+    """Same as run_simulations, but all runs of a config advance in lockstep.
+
+    Damage is keyed by battle kind only ("hunt", "miniboss", "boss") and,
+    as in scalar runs, averaged over the runs that reached that kind.
+    """
+    from engine.params import game_params
+    from sim.vector_sim import play_runs
+
+    if policy not in VECTOR_POLICIES:
+        raise ValueError(f"Vector simulation supports {', '.join(VECTOR_POLICIES)}, not {policy!r}")
+    aggregates = []
+    for cfg in configs:
+        agg = RunAggregate(cfg)
+        res = play_runs(runs, hunts, game_params(cfg), inference, VECTOR_POLICIES[policy],
+                        seed, max_turns)
+        kinds = [k[len('damage_'):] for k in res if k.startswith('damage_')]
+        for i in range(runs):
+            agg.add({'outcome': res['outcome'][i], 'turns': int(res['turns'][i]),
+                     'damage': {k: int(res[f'damage_{k}'][i]) for k in kinds
+                                if res[f'reached_{k}'][i]}})
+        aggregates.append(agg)
+    return aggregates
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Headless Monte Carlo balance runner.")
+    parser.add_argument('--runs', type=int, default=100, help="runs per parameter set")
+    parser.add_argument('--workers', type=int, default=None, help="pool size (default: CPU count)")
+    parser.add_argument('--policy', default='aggressive',
+                        help=f"player policy: {', '.join(POLICIES)} or module:function")
+    parser.add_argument('--hunts', type=int, default=3, help="hunts before the miniboss")
+    parser.add_argument('--inference', choices=['mamdani', 'sugeno', 'tsukamoto', 'fallback'],
+                        default=None, help="enemy fuzzy scorer (default: mamdani)")
+    parser.add_argument('--max-turns', type=int, default=DEFAULT_MAX_TURNS,
+                        help="per-battle turn cap, counted as 'timeout'")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first run")
+    parser.add_argument('--set', dest='overrides', action='append', metavar='NAME=VALUE',
+                        type=assignment_arg(), help="override a config value for every run")
+    parser.add_argument('--sweep', action='append', metavar='NAME=V1,V2,...',
+                        type=assignment_arg(multi=True),
+                        help="try each value (cartesian product across --sweep flags)")
+    parser.add_argument('--report-every', type=int, default=None,
+                        help="print aggregates every N finished runs (default 100, 0 = only at the end)")
+    parser.add_argument('--vector', action='store_true',
+                        help="use the lockstep NumPy simulator (aggressive/cautious only)")
+    parser.add_argument('--shm', action='store_true',
+                        help="collect results through shared-memory rings instead of pickling")
+    parser.add_argument('--record', dest='record_dir', metavar='DIR',
+                        help="write every run as a binary replay into DIR")
+    parser.add_argument('--fuzzy-params', metavar='FILE',
+                        help="fuzzy membership parameters written by run_tune.py")
+    parser.add_argument('--json', dest='json_path', help="write final aggregates to this file")
+    return parser
+
+
+def main(argv=None):
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.vector:
+        # the vector simulator plays every run in this process, without records
+        pool_only = {'--workers': args.workers, '--report-every': args.report_every,
+                     '--shm': args.shm or None, '--record': args.record_dir}
+        used = [flag for flag, value in pool_only.items() if value is not None]
+        if used:
+            parser.error(f"{', '.join(used)} cannot be used with --vector")
+    if args.fuzzy_params:
+        fuzzy_logic.load_params(args.fuzzy_params)  # run_simulations sends them to the workers
+    configs = expand_configs(parse_assignments(args.overrides),
+                             parse_assignments(args.sweep, multi=True))
+    if args.vector:
+        aggregates = run_vectorized(configs, args.runs, policy=args.policy, hunts=args.hunts,
+                                    inference=args.inference, max_turns=args.max_turns,
+                                    seed=args.seed)
+    else:
+        aggregates = run_simulations(configs, args.runs, policy=args.policy, hunts=args.hunts,
+                                     inference=args.inference, max_turns=args.max_turns,
+                                     seed=args.seed, workers=args.workers,
+                                     report_every=100 if args.report_every is None else args.report_every,
+                                     record_dir=args.record_dir,
+                                     shm=args.shm)
+    print("Final results:")
+    for agg in aggregates:
+        s = agg.summary()
+        print("  " + agg.status_line())
+        print(f"    outcomes: {s['outcomes']}")
+        print(f"    damage per stage: " + ', '.join(f"{k}={v:.1f}" for k, v in s['damage_per_stage'].items()))
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump([agg.summary() for agg in aggregates], f, indent=2)
+        print(f"✓ Wrote {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
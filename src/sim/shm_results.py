@@ -0,0 +1,211 @@
+"""Shared-memory result rings for the simulation runner.
+
+Instead of pickling a result dict per run back through a pool pipe, every
+worker owns one single-producer / single-consumer ring in
+multiprocessing.shared_memory and writes each finished run as one
+fixed-layout NumPy record. The parent drains all rings incrementally into
+RecordAggregate arrays and merges them once the workers are done.
+
+Ring layout (one SharedMemory block):
+    header   HEADER_FIELDS int64 counters (write, read, closed, stalls)
+    records  `capacity` RECORD_DTYPE slots, slot = counter % capacity
+
+Only the worker advances `write` and only the parent advances `read`, so
+neither needs a lock. A worker finding the ring full sleeps until the
+parent catches up (backpressure) and counts the stall.
+"""
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from engine.actions import PLAYER_ACTIONS
+from engine.run_state import HUNT_STAGES
+from sim.runner import RunAggregate
+
+OUTCOMES = ('win', 'defeat', 'escape', 'timeout')
+BATTLE_KINDS = ('hunt', 'miniboss', 'boss')
+# "kind:Enemy" damage keys of play_run, one fixed column each
+STAGE_KEYS = tuple(f'hunt:{t}' for t in sorted(set(HUNT_STAGES))) + ('miniboss:Enderman', 'boss:Boss')
+
+RECORD_DTYPE = np.dtype([
+    ('config', np.uint16),
+    ('seed', np.int64),
+    ('outcome', np.uint8),
+    ('ended_at', np.uint8),
+    ('battles', np.uint8),
+    ('turns', np.int32),
+    ('level', np.int16),
+    ('hp', np.int32),
+    ('actions', np.int32, (len(PLAYER_ACTIONS),)),
+    ('damage', np.int32, (len(STAGE_KEYS),)),
+])
+
+WRITE, READ, CLOSED, STALLS = range(4)
+HEADER_FIELDS = 4
+HEADER_BYTES = 64  # one cache line, keeps the records aligned
+
+
+def encode_result(index, result):
+    """Pack a play_run result dict for config `index` into a record tuple.
+
+    Damage under a key outside STAGE_KEYS is dropped; a stage the run did
+    not reach is stored as -1.
+    """
+    actions = result.get('actions', {})
+    damage = result['damage']
+    return (index, result['seed'], OUTCOMES.index(result['outcome']),
+            BATTLE_KINDS.index(result['ended_at']), result['battles'], result['turns'],
+            result['level'], result.get('hp', 0),
+            [actions.get(k, 0) for k in PLAYER_ACTIONS],
+            [damage.get(k, -1) for k in STAGE_KEYS])
+
+
+class ResultRing:
+    """Fixed-capacity ring of RECORD_DTYPE records in shared memory.
+
+    Args:
+        capacity: Number of record slots.
+        name: Attach to an existing ring instead of creating one.
+    """
+
+    def __init__(self, capacity=1024, name=None):
+        self.capacity = capacity
+        size = HEADER_BYTES + capacity * RECORD_DTYPE.itemsize
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.header = np.ndarray((HEADER_FIELDS,), np.int64, buffer=self.shm.buf)
+        self.records = np.ndarray((capacity,), RECORD_DTYPE, buffer=self.shm.buf, offset=HEADER_BYTES)
+        if self.owner:
+            self.header[:] = 0
+
+    def __reduce__(self):
+        # spawn-started workers attach by name; forked ones inherit the mapping
+        return ResultRing, (self.capacity, self.shm.name)
+
+    def __len__(self):
+        return int(self.header[WRITE] - self.header[READ])
+
+    @property
+    def closed(self):
+        return bool(self.header[CLOSED])
+
+    @property
+    def stalls(self):
+        return int(self.header[STALLS])
+
+    # ----- producer side (worker)
+    def put(self, record, poll=0.0005):
+        """Write one record, waiting while the ring is full."""
+        write = int(self.header[WRITE])
+        while write - int(self.header[READ]) >= self.capacity:
+            self.header[STALLS] += 1
+            time.sleep(poll)
+        self.records[write % self.capacity] = record
+        self.header[WRITE] = write + 1  # publish only after the slot is written
+
+    def close(self):
+        """Mark the producer as finished."""
+        self.header[CLOSED] = 1
+
+    # ----- consumer side (parent)
+    def drain(self):
+        """Copy out every published record and free their slots.
+
+        Returns:
+            RECORD_DTYPE array, possibly empty.
+        """
+        read = int(self.header[READ])
+        write = int(self.header[WRITE])
+        if write == read:
+            return np.empty(0, RECORD_DTYPE)
+        out = self.records[np.arange(read, write) % self.capacity].copy()
+        self.header[READ] = write
+        return out
+
+    def release(self):
+        """Unmap the block; the creating process also removes it."""
+        self.header = self.records = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class RecordAggregate(RunAggregate):
+    """RunAggregate over RECORD_DTYPE arrays instead of per-run dicts.
+
+    Record chunks are appended as they are drained and merged into one
+    array on first use, so summary() and status_line() give the same
+    numbers RunAggregate would for the same runs.
+    """
+
+    def __init__(self, overrides):
+        self.overrides = dict(overrides)
+        self._chunks = []
+        self._merged = np.empty(0, RECORD_DTYPE)
+
+    def add_records(self, records):
+        if len(records):
+            self._chunks.append(records)
+
+    def add(self, result):
+        self.add_records(np.array([encode_result(0, result)], RECORD_DTYPE))
+
+    @property
+    def records(self):
+        """All records so far, merged into one array."""
+        if self._chunks:
+            self._merged = np.concatenate([self._merged] + self._chunks)
+            self._chunks = []
+        return self._merged
+
+    @property
+    def n(self):
+        return len(self.records)
+
+    def _outcome_mask(self, name):
+        return self.records['outcome'] == OUTCOMES.index(name)
+
+    @property
+    def outcomes(self):
+        counts = np.bincount(self.records['outcome'], minlength=len(OUTCOMES))
+        return {name: int(c) for name, c in zip(OUTCOMES, counts) if c}
+
+    @property
+    def win_rate(self):
+        return int(self._outcome_mask('win').sum()) / self.n if self.n else 0.0
+
+    @property
+    def turns(self):
+        return self.records['turns'].tolist()
+
+    @property
+    def win_turns(self):
+        return self.records['turns'][self._outcome_mask('win')].tolist()
+
+    @property
+    def damage_total(self):
+        totals = np.maximum(self.records['damage'], 0).sum(axis=0)
+        return {k: int(v) for k, v, n in zip(STAGE_KEYS, totals, self._reached()) if n}
+
+    @property
+    def damage_seen(self):
+        # runs that reached each stage (unreached ones hold -1)
+        return {k: int(n) for k, n in zip(STAGE_KEYS, self._reached()) if n}
+
+    def _reached(self):
+        return (self.records['damage'] >= 0).sum(axis=0)
+
+    def action_totals(self):
+        """Player actions per type, summed over all runs."""
+        return {k: int(v) for k, v in zip(PLAYER_ACTIONS, self.records['actions'].sum(axis=0))}
+
+    def summary(self):
+        out = super().summary()
+        out['hp_left'] = self._percentiles(self.records['hp'].tolist())
+        out['actions'] = self.action_totals()
+        return out
@@ -0,0 +1,335 @@
+"""Parallel CMA-ES tuning of the fuzzy membership parameters.
+
+The membership breakpoints and Tsukamoto constants of ai/fuzzy_logic.py
+(fuzzy_logic.DEFAULT_PARAMS) are flattened into one vector. CMA-ES samples
+candidate vectors; each one is repaired into valid parameters (clipped to
+its universe, rounded to whole units, breakpoints sorted) and scored by
+playing headless runs on a process pool. The loss is the squared distance
+of the candidate's win rate and mean run length from the targets.
+
+Evaluations are cached by (settings, parameters), in memory and optionally
+in a JSON-lines file, so repeated or converged candidates cost nothing and
+an interrupted tuning can be resumed. The best parameter set is written as
+a file fuzzy_logic.load_params() reads (the game loads FUZZY_PARAMS_FILE).
+
+Example:
+    python run_tune.py --target-win 0.5 --set PLAYER_MAX_HP=80 --generations 30
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from ai import fuzzy_logic
+from config import FUZZY_PARAMS_FILE
+from engine.params import game_params
+from sim.runner import DEFAULT_MAX_TURNS, VECTOR_POLICIES, assignment_arg, parse_assignments, play_run
+
+BOUNDS = {'hp': (0, 100), 'mana': (0, 100), 'cd': (0, 10), 'action': (0, 100)}
+TSUKAMOTO_BOUNDS = (0, 100)
+
+
+class ParamSpace:
+    """Maps fuzzy parameter dicts to vectors in [0, 1]^n and back.
+
+    Args:
+        names: Parameter names to tune (default: all of DEFAULT_PARAMS);
+            the others keep their default values.
+    """
+
+    def __init__(self, names=None):
+        self.names = list(names or fuzzy_logic.DEFAULT_PARAMS)
+        lo, hi, self.slices = [], [], {}
+        for name in self.names:
+            size = len(fuzzy_logic.DEFAULT_PARAMS[name])
+            if name in fuzzy_logic.MEMBERSHIPS:
+                low, high = BOUNDS[fuzzy_logic.MEMBERSHIPS[name][1]]
+            else:
+                low, high = TSUKAMOTO_BOUNDS
+            self.slices[name] = slice(len(lo), len(lo) + size)
+            lo += [low] * size
+            hi += [high] * size
+        self.lo = np.array(lo, dtype=float)
+        self.hi = np.array(hi, dtype=float)
+
+    def __len__(self):
+        return len(self.lo)
+
+    def encode(self, params):
+        """Parameter dict -> normalized vector."""
+        raw = np.concatenate([np.asarray(params[n], dtype=float) for n in self.names])
+        return (raw - self.lo) / (self.hi - self.lo)
+
+    def decode(self, x):
+        """Normalized vector -> valid parameter dict (the repair step)."""
+        raw = np.rint(self.lo + np.clip(x, 0.0, 1.0) * (self.hi - self.lo))
+        out = {}
+        for name in self.names:
+            values = raw[self.slices[name]]
+            if name in fuzzy_logic.MEMBERSHIPS:
+                values = np.sort(values)
+            out[name] = [int(v) for v in values]
+        return out
+
+
+class CMAES:
+    """Minimal (mu/mu_w, lambda)-CMA-ES with rank-one and rank-mu updates.
+
+    Args:
+        x0: Initial mean.
+        sigma: Initial step size.
+        popsize: Candidates per generation (default 4 + 3 ln n).
+        seed: Sampling seed.
+    """
+
+    def __init__(self, x0, sigma, popsize=None, seed=0):
+        n = self.n = len(x0)
+        self.mean = np.array(x0, dtype=float)
+        self.sigma = sigma
+        self.popsize = popsize or 4 + int(3 * math.log(n))
+        self.mu = self.popsize // 2
+        w = math.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+        self.weights = w / w.sum()
+        self.mueff = 1.0 / np.sum(self.weights ** 2)
+        self.cc = (4 + self.mueff / n) / (n + 4 + 2 * self.mueff / n)
+        self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+        self.c1 = 2 / ((n + 1.3) ** 2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((n + 2) ** 2 + self.mueff))
+        self.damps = 1 + 2 * max(0.0, math.sqrt((self.mueff - 1) / (n + 1)) - 1) + self.cs
+        self.chi_n = math.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n * n))
+        self.pc = np.zeros(n)
+        self.ps = np.zeros(n)
+        self.C = np.eye(n)
+        self.B = np.eye(n)
+        self.D = np.ones(n)
+        self.inv_sqrt_c = np.eye(n)
+        self.generation = 0
+        self.rng = np.random.default_rng(seed)
+
+    def ask(self):
+        """Sample one generation: array of shape (popsize, n)."""
+        z = self.rng.standard_normal((self.popsize, self.n))
+        return self.mean + self.sigma * (z * self.D) @ self.B.T
+
+    def tell(self, xs, losses):
+        """Update the distribution from the candidates `xs` and their losses."""
+        n = self.n
+        best = np.asarray(xs)[np.argsort(losses)[:self.mu]]
+        old = self.mean
+        self.mean = self.weights @ best
+        y = (self.mean - old) / self.sigma
+        self.ps = (1 - self.cs) * self.ps + math.sqrt(self.cs * (2 - self.cs) * self.mueff) * (self.inv_sqrt_c @ y)
+        ps_norm = np.linalg.norm(self.ps)
+        hsig = ps_norm / math.sqrt(1 - (1 - self.cs) ** (2 * (self.generation + 1))) / self.chi_n < 1.4 + 2 / (n + 1)
+        self.pc = (1 - self.cc) * self.pc + hsig * math.sqrt(self.cc * (2 - self.cc) * self.mueff) * y
+        steps = (best - old) / self.sigma
+        self.C = ((1 - self.c1 - self.cmu) * self.C
+                  + self.c1 * (np.outer(self.pc, self.pc) + (1 - hsig) * self.cc * (2 - self.cc) * self.C)
+                  + self.cmu * (steps.T * self.weights) @ steps)
+        self.sigma *= math.exp((self.cs / self.damps) * (ps_norm / self.chi_n - 1))
+        self.generation += 1
+
+        self.C = np.triu(self.C) + np.triu(self.C, 1).T
+        d2, self.B = np.linalg.eigh(self.C)
+        self.D = np.sqrt(np.maximum(d2, 1e-20))
+        self.inv_sqrt_c = self.B @ np.diag(1 / self.D) @ self.B.T
+
+
+def _evaluate_chunk(task):
+    """Pool entry point: play runs seed..seed+n-1 with one parameter set.
+
+    Returns:
+        (candidate index, wins, runs, sum of run turns, sum of damage taken)
+    """
+    index, params, settings, seed, n = task
+    fuzzy_logic.apply_params(params)
+    overrides = settings['overrides']
+    if settings['policy'] in VECTOR_POLICIES:
+        from sim.vector_sim import play_runs
+        res = play_runs(n, settings['hunts'], game_params(overrides), settings['inference'],
+                        VECTOR_POLICIES[settings['policy']], seed, settings['max_turns'])
+        damage = sum(int(v.sum()) for k, v in res.items() if k.startswith('damage_'))
+        return index, int((res['outcome'] == 'win').sum()), n, int(res['turns'].sum()), damage
+    wins = turns = damage = 0
+    for s in range(seed, seed + n):
+        result = play_run(s, overrides, settings['policy'], settings['hunts'],
+                          settings['inference'], settings['max_turns'])
+        wins += result['outcome'] == 'win'
+        turns += result['turns']
+        damage += sum(result['damage'].values())
+    return index, wins, n, turns, damage
+
+
+class FuzzyTuner:
+    """CMA-ES over a ParamSpace with cached, pooled evaluations.
+
+    Args:
+        space: The ParamSpace to search.
+        target_win: Desired player win rate (0..1).
+        target_turns: Desired mean turns per run (0 ignores run length).
+        runs: Runs per evaluation; seeds are shared by all candidates.
+        chunk: Runs per pool task.
+        cache_path: Optional JSON-lines file of past evaluations.
+        Other keyword arguments are run settings as in sim.runner.
+    """
+
+    def __init__(self, space, target_win=0.5, target_turns=0, runs=200, overrides=None,
+                 policy='aggressive', hunts=3, inference=None, max_turns=DEFAULT_MAX_TURNS,
+                 seed=0, workers=None, chunk=100, cache_path=None, out=sys.stdout):
+        self.space = space
+        self.target_win = target_win
+        self.target_turns = target_turns
+        self.runs = runs
+        self.seed = seed
+        self.chunk = max(1, chunk)
+        self.settings = {'overrides': dict(overrides or {}), 'policy': policy, 'hunts': hunts,
+                         'inference': inference, 'max_turns': max_turns}
+        self.workers = workers or os.cpu_count() or 1
+        self.out = out
+        self.cache = {}
+        self.cache_path = cache_path
+        self.hits = 0
+        if cache_path and os.path.isfile(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self.cache[entry['key']] = entry['stats']
+
+    def _key(self, params):
+        return json.dumps([self.settings, self.runs, self.seed, params], sort_keys=True)
+
+    def loss(self, stats):
+        loss = (stats['win_rate'] - self.target_win) ** 2
+        if self.target_turns:
+            loss += ((stats['mean_turns'] - self.target_turns) / self.target_turns) ** 2
+        return loss
+
+    def evaluate(self, candidates, pool=None):
+        """Stats dicts for a list of parameter dicts, from cache or the pool."""
+        keys = [self._key(p) for p in candidates]
+        todo = {}
+        for key, params in zip(keys, candidates):
+            if key in self.cache:
+                self.hits += 1
+            elif key not in todo:
+                todo[key] = params
+        tasks = [(key, params, self.settings, self.seed + start, min(self.chunk, self.runs - start))
+                 for key, params in todo.items() for start in range(0, self.runs, self.chunk)]
+        if pool:
+            results = pool.imap_unordered(_evaluate_chunk, tasks)
+        else:
+            # played in this process: put its fuzzy parameters back afterwards
+            previous = {k: list(v) for k, v in fuzzy_logic.params.items()}
+            try:
+                results = [_evaluate_chunk(task) for task in tasks]
+            finally:
+                fuzzy_logic.apply_params(previous)
+        totals = {key: [0, 0, 0, 0] for key in todo}
+        for key, *sums in results:
+            totals[key] = [a + b for a, b in zip(totals[key], sums)]
+        new = []
+        for key, (wins, runs, turns, damage) in totals.items():
+            stats = {'win_rate': wins / runs, 'mean_turns': turns / runs, 'mean_damage': damage / runs}
+            self.cache[key] = stats
+            new.append({'key': key, 'stats': stats})
+        if new and self.cache_path:
+            with open(self.cache_path, 'a', encoding='utf-8') as f:
+                for entry in new:
+                    f.write(json.dumps(entry) + '\n')
+        return [self.cache[k] for k in keys]
+
+    def run(self, generations=20, sigma=0.1, popsize=None, minutes=None):
+        """Search from the current defaults.
+
+        Returns:
+            Dict with 'params', 'loss', 'stats' and 'baseline' (stats of
+            the default parameters).
+        """
+        defaults = {n: fuzzy_logic.DEFAULT_PARAMS[n] for n in self.space.names}
+        es = CMAES(self.space.encode(defaults), sigma, popsize, self.seed)
+        deadline = time.perf_counter() + minutes * 60 if minutes else None
+        started = time.perf_counter()
+        pool = multiprocessing.Pool(self.workers) if self.workers > 1 else None
+        try:
+            baseline = self.evaluate([self.space.decode(es.mean)], pool)[0]
+            best = {'params': self.space.decode(es.mean), 'loss': self.loss(baseline), 'stats': baseline}
+            print(f"[baseline] loss={best['loss']:.4f} {_format_stats(baseline)}", file=self.out)
+            for gen in range(generations):
+                xs = es.ask()
+                candidates = [self.space.decode(x) for x in xs]
+                stats = self.evaluate(candidates, pool)
+                losses = [self.loss(s) for s in stats]
+                es.tell(xs, losses)
+                i = int(np.argmin(losses))
+                if losses[i] < best['loss']:
+                    best = {'params': candidates[i], 'loss': losses[i], 'stats': stats[i]}
+                print(f"[gen {gen + 1}/{generations}] loss={best['loss']:.4f} {_format_stats(best['stats'])} "
+                      f"sigma={es.sigma:.3f} cached={self.hits} "
+                      f"({time.perf_counter() - started:.1f}s)", file=self.out)
+                if deadline and time.perf_counter() > deadline:
+                    break
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        best['baseline'] = baseline
+        return best
+
+
+def _format_stats(stats):
+    return (f"win={stats['win_rate']:6.1%} turns={stats['mean_turns']:.1f} "
+            f"damage={stats['mean_damage']:.1f}")
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="CMA-ES tuning of the fuzzy membership parameters.")
+    parser.add_argument('--target-win', type=float, default=0.5, help="desired player win rate")
+    parser.add_argument('--target-turns', type=float, default=0,
+                        help="desired mean turns per run (0 = ignore)")
+    parser.add_argument('--runs', type=int, default=200, help="runs per evaluation")
+    parser.add_argument('--generations', type=int, default=20)
+    parser.add_argument('--minutes', type=float, default=None, help="stop after this long")
+    parser.add_argument('--sigma', type=float, default=0.1, help="initial step (fraction of range)")
+    parser.add_argument('--popsize', type=int, default=None)
+    parser.add_argument('--params', default=None, metavar='NAME,NAME',
+                        help=f"parameters to tune (default: all of {', '.join(fuzzy_logic.DEFAULT_PARAMS)})")
+    parser.add_argument('--policy', default='aggressive',
+                        help="player policy; aggressive/cautious use the vector simulator")
+    parser.add_argument('--hunts', type=int, default=3)
+    parser.add_argument('--inference', choices=['mamdani', 'sugeno', 'tsukamoto', 'fallback'], default=None)
+    parser.add_argument('--max-turns', type=int, default=DEFAULT_MAX_TURNS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--set', dest='overrides', action='append', metavar='NAME=VALUE',
+                        type=assignment_arg(), help="game config override for every run")
+    parser.add_argument('--workers', type=int, default=None, help="pool size (default: CPU count)")
+    parser.add_argument('--chunk', type=int, default=100, help="runs per pool task")
+    parser.add_argument('--cache', dest='cache_path', default=None, help="JSON-lines evaluation cache")
+    parser.add_argument('--out', default=FUZZY_PARAMS_FILE, help="where to write the best parameters")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    names = [n.strip() for n in args.params.split(',')] if args.params else None
+    for name in names or []:
+        if name not in fuzzy_logic.DEFAULT_PARAMS:
+            raise SystemExit(f"✗ Unknown fuzzy parameter: {name}")
+    tuner = FuzzyTuner(ParamSpace(names), args.target_win, args.target_turns, args.runs,
+                       parse_assignments(args.overrides), args.policy, args.hunts, args.inference,
+                       args.max_turns, args.seed, args.workers, args.chunk, args.cache_path)
+    best = tuner.run(args.generations, args.sigma, args.popsize, args.minutes)
+    print(f"Best: loss={best['loss']:.4f} {_format_stats(best['stats'])}")
+    print(f"Defaults: {_format_stats(best['baseline'])}")
+    fuzzy_logic.save_params(args.out, best['params'], loss=best['loss'], stats=best['stats'],
+                            baseline=best['baseline'], settings=tuner.settings,
+                            target={'win_rate': args.target_win, 'mean_turns': args.target_turns})
+    print(f"✓ Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
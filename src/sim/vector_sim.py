@@ -0,0 +1,449 @@
+"""Lockstep structure-of-arrays simulator for many independent battles.
+
+N staged single-enemy battles (hunts, miniboss, boss) are held as parallel
+NumPy arrays and advanced one turn at a time with masked updates. The rules
+mirror BattleEngine.end_turn / enemy_action, including the influence-map
+movement: every movement choice depends only on the (player, enemy) tile
+pair, so it is tabulated once per grid by calling the scalar helpers.
+
+Player actions are small integers (also used by sim.env):
+    ACTION_END                  end the turn
+    ACTION_HEAL                 heal
+    ACTION_ATTACK + d           attack the tile in direction DIRECTIONS[d]
+    ACTION_MOVE + y*grid_w + x  move to tile (x, y)
+An action that BattleEngine would reject is treated as ACTION_END.
+"""
+import random
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from config import GRID_W, GRID_H, MAP_BLOCKED_TILES
+from ai import fuzzy_logic
+from ai.fuzzy_batch import batch_action_scores
+from ai.influence_maps import InfluenceMaps, DIRECTIONS
+from engine.grid import bfs_reachable, find_player_spawn, find_enemy_spawn
+from engine.params import game_params, default_player_stats
+from engine.run_state import HUNT_STAGES
+from entities.registry import ENEMY_ARCHETYPES
+
+# built-in types with fixed codes; types added with register_archetype
+# follow in registration order (see type_codes)
+ENEMY_TYPES = ('Zombie', 'Skeleton', 'Enderman', 'Boss')
+ZOMBIE, SKELETON, ENDERMAN, BOSS = range(len(ENEMY_TYPES))
+# heal-priority thresholds per type; types that never heal get unreachable ones
+_NO_HEAL = (-1, 1 << 30)
+
+ACTION_END = 0
+ACTION_HEAL = 1
+ACTION_ATTACK = 2
+ACTION_MOVE = ACTION_ATTACK + len(DIRECTIONS)
+
+OUTCOME_NONE, OUTCOME_VICTORY, OUTCOME_DEFEAT, OUTCOME_ESCAPE = range(4)
+OUTCOME_NAMES = {OUTCOME_NONE: 'timeout', OUTCOME_VICTORY: 'victory',
+                 OUTCOME_DEFEAT: 'defeat', OUTCOME_ESCAPE: 'escape'}
+
+BEHAVIORS = ('MOVE_RETREAT', 'MOVE_CLOSE', 'RANGED_ATTACK', 'TELEPORT_FAR', 'TELEPORT_CLOSE', 'WAIT')
+B_RETREAT, B_CLOSE, B_RANGED, B_TELE_FAR, B_TELE_CLOSE, B_WAIT = range(len(BEHAVIORS))
+
+
+
+def type_codes():
+    """{type name: code} for every registered enemy type, built-ins first."""
+    assert tuple(ENEMY_ARCHETYPES)[:len(ENEMY_TYPES)] == ENEMY_TYPES
+    return {name: i for i, name in enumerate(ENEMY_ARCHETYPES)}
+
+
+def _behavior_code(score, etype):
+    behavior = fuzzy_logic.map_fuzzy_score_to_behavior(score, etype)
+    return BEHAVIORS.index(behavior) if behavior in BEHAVIORS else B_WAIT
+
+class GridTables:
+    """Per-grid lookup tables indexed by flat tile index (y * grid_w + x).
+
+    Movement tables hold the target tile or -1 for every (player, enemy)
+    tile pair; `reach[p, e]` is the player's MOVE mask with the enemy on e.
+    """
+
+    def __init__(self, grid_w, grid_h, blocked_tiles, move_range):
+        self.grid_w, self.grid_h = grid_w, grid_h
+        n = grid_w * grid_h
+        self.n_tiles = n
+        tiles = [(i % grid_w, i // grid_w) for i in range(n)]
+        self.xs = np.array([t[0] for t in tiles], dtype=np.int32)
+        self.ys = np.array([t[1] for t in tiles], dtype=np.int32)
+        self.passable = np.array([t not in blocked_tiles for t in tiles])
+        self.manhattan = (np.abs(self.xs[:, None] - self.xs[None, :])
+                          + np.abs(self.ys[:, None] - self.ys[None, :])).astype(np.int32)
+
+        self.toward = np.full((n, n), -1, dtype=np.int32)
+        self.away = np.full((n, n), -1, dtype=np.int32)
+        self.tele_close = np.full((n, n), -1, dtype=np.int32)
+        self.tele_far = np.full((n, n), -1, dtype=np.int32)
+        self.approach = np.full((n, n), -1, dtype=np.int32)
+        self.reach = np.zeros((n, n, n), dtype=bool)
+
+        def idx(tile):
+            return -1 if tile is None else tile[1] * grid_w + tile[0]
+
+        open_tiles = [i for i in range(n) if self.passable[i]]
+        for p in open_tiles:
+            for e in open_tiles:
+                ppos, epos = tiles[p], tiles[e]
+                occupied = {ppos, epos}
+                maps = InfluenceMaps(ppos, [epos], grid_w, grid_h, blocked_tiles)
+                self.toward[p, e] = idx(maps.step_toward(epos, occupied))
+                self.away[p, e] = idx(maps.step_away(epos, occupied))
+                self.tele_close[p, e] = idx(maps.teleport_close(occupied))
+                self.tele_far[p, e] = idx(maps.teleport_far(occupied))
+
+                reachable = bfs_reachable(ppos, move_range, {epos}, grid_w, grid_h, blocked_tiles)
+                reachable.discard(ppos)  # moving onto yourself is rejected
+                reachable.discard(epos)
+                for t in reachable:
+                    self.reach[p, e, idx(t)] = True
+                # sim.policies._approach_tile: first sorted tile strictly closer
+                best, best_d = None, abs(ppos[0] - epos[0]) + abs(ppos[1] - epos[1])
+                for t in sorted(reachable | ({ppos} if ppos != epos else set())):
+                    d = abs(t[0] - epos[0]) + abs(t[1] - epos[1])
+                    if d < best_d:
+                        best, best_d = t, d
+                self.approach[p, e] = idx(best)
+
+        # direction index from player tile to an adjacent enemy tile
+        self.direction = np.full((n, n), -1, dtype=np.int8)
+        for p in range(n):
+            for d, (dx, dy) in enumerate(DIRECTIONS):
+                x, y = tiles[p][0] + dx, tiles[p][1] + dy
+                if 0 <= x < grid_w and 0 <= y < grid_h:
+                    self.direction[p, y * grid_w + x] = d
+        self.step = np.array([dy * grid_w + dx for dx, dy in DIRECTIONS], dtype=np.int32)
+
+        self.player_spawn = idx(find_player_spawn(grid_w, grid_h, blocked_tiles))
+        self.enemy_spawn = idx(find_enemy_spawn(grid_w, grid_h, blocked_tiles))
+
+
+@lru_cache(maxsize=4)
+def grid_tables(grid_w=GRID_W, grid_h=GRID_H, blocked_tiles=MAP_BLOCKED_TILES, move_range=2):
+    """Build (once per process) the lookup tables for a grid."""
+    return GridTables(grid_w, grid_h, frozenset(blocked_tiles), move_range)
+
+
+class VectorBattleSim:
+    """N independent staged battles advanced in lockstep.
+
+    Unit state lives in flat arrays: p_* for players and e_* for the single
+    enemy of each battle; `done` masks battles that have finished.
+    """
+
+    def __init__(self, n, params=None, inference=None, tables=None):
+        self.n = n
+        self.params = params or game_params()
+        self.inference = inference
+        self.tables = tables or grid_tables()
+        p = self.params
+        # per-type tables over the types registered now, indexed by code
+        self.type_codes = type_codes()
+        archs = [ENEMY_ARCHETYPES[t] for t in self.type_codes]
+        self.type_hp = np.array([p.get(f'{a.stat_key}_HP', a.hp) for a in archs], dtype=np.int64)
+        self.type_atk = np.array([p.get(f'{a.stat_key}_ATK', a.atk) for a in archs], dtype=np.int64)
+        self.type_mana = np.array([p.get(f'{a.stat_key}_MANA', a.mana) for a in archs], dtype=np.int64)
+        self.uses_mana = np.array([a.uses_mana for a in archs])
+        self.heal_hp, self.heal_mana = np.array([a.heal_at or _NO_HEAL for a in archs]).T
+        # [type, strength] -> behaviour code, read from the scalar mapping so the
+        # two can never drift apart (weak < 40 <= mid < 70 <= strong)
+        self.behavior_table = np.array([[_behavior_code(score, a.name) for score in (0, 40, 70)]
+                                        for a in archs], dtype=np.int8)
+        self.reset([['Zombie']] * n)
+
+    # ------------------------------------------------------------------ setup
+
+    def reset(self, stages, player_stats=None):
+        """Start new battles.
+
+        Args:
+            stages: List (length n) of enemy type name lists, or an int array
+                of type_codes() codes shaped (n, max_stages) padded with -1.
+            player_stats: Stats dict shared by all battles, or a dict of
+                arrays (keys as Player.get_default_stats), or None for defaults.
+        """
+        n = self.n
+        table = self._stage_table(stages)
+        self.stages = np.full((n, table.shape[1]), -1, dtype=np.int8)
+        self.n_stages = np.zeros(n, dtype=np.int64)
+        self.stage_index = np.zeros(n, dtype=np.int32)
+        self.p_pos = np.zeros(n, dtype=np.int32)
+        self.p_hp = np.zeros(n, dtype=np.int64)
+        self.p_max_hp = np.zeros(n, dtype=np.int64)
+        self.p_atk = np.zeros(n, dtype=np.int64)
+        self.p_mana = np.zeros(n, dtype=np.int64)
+        self.p_max_mana = np.zeros(n, dtype=np.int64)
+        self.e_type = np.zeros(n, dtype=np.int8)
+        self.e_pos = np.zeros(n, dtype=np.int32)
+        self.e_hp = np.zeros(n, dtype=np.int64)
+        self.e_max_hp = np.zeros(n, dtype=np.int64)
+        self.e_atk = np.zeros(n, dtype=np.int64)
+        self.e_mana = np.zeros(n, dtype=np.int64)
+        self.e_alive = np.zeros(n, dtype=bool)
+        self.turn_count = np.zeros(n, dtype=np.int32)
+        self.run_turns = np.zeros(n, dtype=np.int32)  # total_run_turns delta
+        self.damage_taken = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self.outcome = np.zeros(n, dtype=np.int8)
+        self.turns_simulated = 0
+        self.reset_rows(np.ones(n, dtype=bool), table, player_stats)
+
+    def _stage_table(self, stages):
+        if isinstance(stages, np.ndarray):
+            return stages.astype(np.int8)
+        width = max(len(s) for s in stages)
+        table = np.full((len(stages), width), -1, dtype=np.int8)
+        for i, s in enumerate(stages):
+            table[i, :len(s)] = [self.type_codes.get(t, ZOMBIE) for t in s]
+        return table
+
+    def reset_rows(self, mask, stages, player_stats=None):
+        """Restart only the battles in `mask`, leaving the others as they are.
+
+        Args:
+            mask: Bool array (n,) of battles to restart.
+            stages: Stage lists or code table with one row per restarted
+                battle (at most as many stages as the first reset).
+            player_stats: As for reset; array values are indexed by battle.
+        """
+        table = self._stage_table(stages)
+        rows = np.flatnonzero(mask)
+        self.stages[rows] = -1
+        self.stages[rows, :table.shape[1]] = table
+        self.n_stages[rows] = (table >= 0).sum(axis=1)
+        self.stage_index[rows] = 0
+
+        stats = player_stats or default_player_stats(self.params)
+        def col(key):
+            return np.broadcast_to(np.asarray(stats[key], dtype=np.int64), (self.n,))[rows]
+        self.p_pos[rows] = self.tables.player_spawn
+        self.p_hp[rows] = col('hp')
+        self.p_max_hp[rows] = col('max_hp')
+        self.p_atk[rows] = col('atk')
+        self.p_mana[rows] = col('mana')
+        self.p_max_mana[rows] = col('max_mana')
+        # boss damage boost
+        self.p_atk[rows] += np.where((table == BOSS).any(axis=1), 5, 0)
+
+        self._spawn(mask)
+        self.turn_count[rows] = 0
+        self.run_turns[rows] = 0
+        self.damage_taken[rows] = 0
+        self.done[rows] = False
+        self.outcome[rows] = OUTCOME_NONE
+
+    def _spawn(self, mask):
+        etype = self.stages[mask, self.stage_index[mask]]
+        self.e_type[mask] = etype
+        self.e_pos[mask] = self.tables.enemy_spawn
+        self.e_hp[mask] = self.e_max_hp[mask] = self.type_hp[etype]
+        self.e_atk[mask] = self.type_atk[etype]
+        self.e_mana[mask] = self.type_mana[etype]
+        self.e_alive[mask] = True
+
+    # ----------------------------------------------------------------- policy
+
+    def scripted_actions(self, heal_ratio=0.4):
+        """Vectorized sim.policies.aggressive (heal_ratio 0.6 = cautious)."""
+        t = self.tables
+        heal = ((self.p_hp < self.p_max_hp) & (self.p_hp <= self.p_max_hp * heal_ratio)
+                & (self.p_mana >= self.params['PLAYER_HEAL_COST']))
+        direction = t.direction[self.p_pos, self.e_pos]
+        adjacent = self.e_alive & (direction >= 0)
+        approach = t.approach[self.p_pos, self.e_pos]
+        return np.where(heal, ACTION_HEAL,
+               np.where(adjacent, ACTION_ATTACK + direction,
+               np.where(approach >= 0, ACTION_MOVE + approach, ACTION_END))).astype(np.int32)
+
+    # ------------------------------------------------------------------- step
+
+    def step(self, actions):
+        """Apply one player action per battle, then the enemy phase."""
+        t = self.tables
+        p = self.params
+        live = ~self.done
+        actions = np.asarray(actions, dtype=np.int32)
+
+        # --- player phase
+        heal = live & (actions == ACTION_HEAL) & (self.p_mana >= p['PLAYER_HEAL_COST'])
+        self.p_hp[heal] = np.minimum(self.p_max_hp[heal], self.p_hp[heal] + p['PLAYER_HEAL_AMOUNT'])
+        self.p_mana[heal] -= p['PLAYER_HEAL_COST']
+
+        attack = live & (actions >= ACTION_ATTACK) & (actions < ACTION_MOVE)
+        if attack.any():
+            d = np.clip(actions - ACTION_ATTACK, 0, len(DIRECTIONS) - 1)
+            hit = attack & self.e_alive & (t.direction[self.p_pos, self.e_pos] == d)
+            self.e_hp[hit] -= self.p_atk[hit]
+            killed = hit & (self.e_hp <= 0)
+            self.e_alive[killed] = False
+            self.p_atk[killed] += 1  # increment player damage on enemy defeat
+
+        move = live & (actions >= ACTION_MOVE) & (actions < ACTION_MOVE + t.n_tiles)
+        if move.any():
+            tile = np.clip(actions - ACTION_MOVE, 0, t.n_tiles - 1)
+            ok = move & t.reach[self.p_pos, self.e_pos, tile]
+            self.p_pos[ok] = tile[ok]
+
+        # --- end turn
+        self.turn_count[live] += 1
+        self.run_turns[live] += 1
+        self.turns_simulated += int(live.sum())
+
+        escape = (live & (self.turn_count >= p['ENDERMAN_ESCAPE_TURN'])
+                  & self.e_alive & (self.e_type == ENDERMAN))
+        self.e_alive[escape] = False
+        self.outcome[escape] = OUTCOME_ESCAPE
+        self.done |= escape
+        live &= ~escape
+
+        acting = live & self.e_alive
+        if acting.any():
+            self._enemy_phase(np.flatnonzero(acting))
+
+        # --- resolve
+        defeat = live & (self.p_hp <= 0)
+        self.outcome[defeat] = OUTCOME_DEFEAT
+        self.done |= defeat
+        cleared = live & ~defeat & ~self.e_alive
+        advance = cleared & (self.stage_index < self.n_stages - 1)
+        if advance.any():
+            self.stage_index[advance] += 1
+            self._spawn(advance)
+        victory = cleared & ~advance
+        self.run_turns[victory] -= 1  # Refund the killing blow turn
+        self.outcome[victory] = OUTCOME_VICTORY
+        self.done |= victory
+
+    def _enemy_phase(self, idx):
+        """Fuzzy decision and masked effects for the enemies in `idx`."""
+        t = self.tables
+        p = self.params
+        pp, ep = self.p_pos[idx], self.e_pos[idx]
+        etype = self.e_type[idx]
+        hp_p = (100 * self.p_hp[idx]) // np.maximum(1, self.p_max_hp[idx])
+        hp_b = (100 * self.e_hp[idx]) // np.maximum(1, self.e_max_hp[idx])
+        mana_p = self.p_mana[idx]
+        mana_b = self.e_mana[idx]
+        dist = t.manhattan[pp, ep]
+
+        # heal-priority interrupt (fuzzy_logic.heal_priority_check)
+        heal = (hp_b <= self.heal_hp[etype]) & (mana_b >= self.heal_mana[etype])
+        melee = ~heal & (dist == 1)
+        rest = ~heal & ~melee
+
+        behavior = np.full(len(idx), B_WAIT, dtype=np.int8)
+        if rest.any():
+            r = np.flatnonzero(rest)
+            scores = batch_action_scores(self.uses_mana[etype[r]], hp_p[r], hp_b[r], mana_p[r], mana_b[r],
+                                         np.zeros(len(r)), self.inference)
+            strength = np.where(scores < 40, 0, np.where(scores < 70, 1, 2))
+            behavior[r] = self.behavior_table[etype[r], strength]
+
+        ranged_hit = rest & (behavior == B_RANGED) & (dist <= 2)
+        hits = melee | ranged_hit
+        dmg = np.where(hits, self.e_atk[idx], 0)
+        self.p_hp[idx] -= dmg
+        self.damage_taken[idx] += dmg
+
+        can_heal = heal & (mana_b >= p['ENEMY_HEAL_COST'])
+        h = idx[can_heal]
+        self.e_hp[h] = np.minimum(self.e_max_hp[h], self.e_hp[h] + p['ENEMY_HEAL_AMOUNT'])
+        self.e_mana[h] -= p['ENEMY_HEAL_COST']
+
+        target = np.full(len(idx), -1, dtype=np.int32)
+        close = rest & ((behavior == B_CLOSE) | ((behavior == B_RANGED) & (dist > 2)))
+        target = np.where(close, t.toward[pp, ep], target)
+        target = np.where(rest & (behavior == B_RETREAT), t.away[pp, ep], target)
+        target = np.where(rest & (behavior == B_TELE_CLOSE), t.tele_close[pp, ep], target)
+        target = np.where(rest & (behavior == B_TELE_FAR), t.tele_far[pp, ep], target)
+        moved = target >= 0
+        self.e_pos[idx[moved]] = target[moved]
+
+    def run(self, policy=None, max_turns=200):
+        """Step until every battle is done or hits `max_turns` (timeout)."""
+        policy = policy or (lambda sim: sim.scripted_actions())
+        while not self.done.all():
+            self.step(policy(self))
+            capped = ~self.done & (self.turn_count >= max_turns)
+            self.done |= capped  # outcome stays OUTCOME_NONE
+        return self.outcome
+
+
+def play_runs(n, hunts=3, params=None, inference=None, heal_ratio=0.4, seed=0,
+              max_turns=200):
+    """Vectorized counterpart of sim.runner.play_run for n runs (seeds seed..seed+n-1).
+
+    Returns:
+        Dict of arrays: 'outcome' (name per run), 'turns', 'level',
+        'ended_at' and per battle kind 'damage_<kind>' and 'reached_<kind>'
+        (True for runs that fought a battle of that kind).
+    """
+    params = params or game_params()
+    rngs = [random.Random(seed + i) for i in range(n)]
+    stats = {k: np.full(n, v, dtype=np.int64) for k, v in default_player_stats(params).items()}
+    turns = np.zeros(n, dtype=np.int64)
+    alive = np.ones(n, dtype=bool)
+    outcome = np.array(['win'] * n, dtype=object)
+    ended_at = np.array([None] * n, dtype=object)
+    damage = {}
+    reached = {}
+    sim = VectorBattleSim(n, params, inference)
+
+    schedule = [('hunt', 1)] * hunts + [('miniboss', 3), ('boss', 0)]
+    for kind, reward in schedule:
+        if kind == 'hunt':
+            stages = []
+            for r in rngs:
+                order = list(HUNT_STAGES)
+                r.shuffle(order)
+                stages.append(order)
+        else:
+            stages = [['Enderman' if kind == 'miniboss' else 'Boss']] * n
+        sim.reset(stages, stats)
+        sim.done[~alive] = True
+        sim.run(lambda s: s.scripted_actions(heal_ratio), max_turns)
+
+        ended_at[alive] = kind
+        reached[kind] = reached.get(kind, False) | alive
+        turns[alive] += sim.run_turns[alive]
+        damage[kind] = damage.get(kind, 0) + np.where(alive, sim.damage_taken, 0)
+        won = alive & (sim.outcome == OUTCOME_VICTORY)
+        lost = alive & ~won
+        outcome[lost] = [OUTCOME_NAMES[o] for o in sim.outcome[lost]]
+        # RunState.update_player_state + level_up for winners
+        stats['hp'] = np.where(alive, sim.p_hp, stats['hp'])
+        stats['mana'] = np.where(alive, sim.p_mana, stats['mana'])
+        stats['level'][won] += reward
+        stats['atk'][won] += 5 * reward
+        stats['max_hp'][won] += 10 * reward
+        stats['hp'][won] = stats['max_hp'][won]
+        stats['mana'][won] = stats['max_mana'][won]
+        alive = won
+
+    result = {'outcome': outcome, 'turns': turns, 'level': stats['level'], 'ended_at': ended_at}
+    for kind, values in damage.items():
+        result[f'damage_{kind}'] = values
+        result[f'reached_{kind}'] = reached[kind]
+    return result
+
+
+def benchmark(n=10000, inference='sugeno', max_turns=200):
+    """Time a batch of hunt battles; returns simulated turns per second."""
+    sim = VectorBattleSim(n, inference=inference)
+    rng = random.Random(0)
+    stages = []
+    for _ in range(n):
+        order = list(HUNT_STAGES)
+        rng.shuffle(order)
+        stages.append(order)
+    sim.reset(stages)
+    started = time.perf_counter()
+    sim.run(max_turns=max_turns)
+    elapsed = time.perf_counter() - started
+    return sim.turns_simulated / max(1e-9, elapsed)
@@ -1,12 +1,43 @@
+"""Clickable button drawn in retained mode."""
 import pygame
 
+from ui.text_cache import render_text, sys_font
+
+BORDER_COLOR = (200, 200, 200)
+DISABLED_COLORS = ((60, 60, 60), (100, 100, 100), (100, 100, 100))  # background, border, text
+TOOLTIP_COLORS = ((50, 50, 50), (200, 200, 150), (255, 255, 200))  # background, border, text
+
+
 class Button:
+    """A button whose looks are rendered once and then only blitted.
+
+    The normal, hover and disabled faces and the tooltip box are built the
+    first time they are shown, and again only when the text, tooltip or
+    size changes. `dirty` is True from a change of look (hover, enabled,
+    text, tooltip, position) until the next draw(); WidgetGroup redraws
+    only dirty buttons. `callback` is called on a left click while the
+    button is enabled.
+
+    Args:
+        text: Label.
+        center_pos: Centre of the button.
+        size: (width, height).
+        callback: Called without arguments when clicked.
+        font: Font of the label.
+        bg_color: Background colour.
+        hover_color: Background colour under the mouse.
+        text_color: Label colour.
+        tooltip: Text shown above the button under the mouse, or ''.
+        disabled_tooltip: Tooltip while disabled; defaults to `tooltip`.
+        tooltip_font: Font of the tooltip; defaults to a 20 px system font.
+    """
+
     def __init__(self, text, center_pos, size, callback, font,
-                 bg_color=(70,70,70), hover_color=(100,100,100), text_color=(255,255,255)):
-        
-        self.text = text
+                 bg_color=(70,70,70), hover_color=(100,100,100), text_color=(255,255,255),
+                 tooltip='', disabled_tooltip=None, tooltip_font=None):
         self.callback = callback
         self.font = font
+        self.tooltip_font = tooltip_font or sys_font(20)
 
         self.rect = pygame.Rect(0, 0, *size)
         self.rect.center = center_pos
@@ -15,20 +46,168 @@ class Button:
         self.hover_color = hover_color
         self.text_color = text_color
 
+        self._text = text
+        self._tooltip = tooltip
+        self._disabled_tooltip = disabled_tooltip
         self._is_hovered = False
-        self.text_surface = self.font.render(text, True, text_color)
-        self.text_rect = self.text_surface.get_rect(center=self.rect.center)
+        self._enabled = True
+        self._faces = {}  # 'normal' / 'hover' / 'disabled' -> Surface of _faces_size
+        self._faces_size = None
+        self._tooltip_image = None  # (text, Surface)
+        self._drawn_rect = None
+        self._dirty = True
+
+    # ----- state
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, text):
+        if text != self._text:
+            self._text = text
+            self._faces.clear()
+            self._dirty = True
+
+    @property
+    def tooltip(self):
+        return self._tooltip
+
+    @tooltip.setter
+    def tooltip(self, text):
+        if text != self._tooltip:
+            self._tooltip = text
+            self._dirty = True
+
+    @property
+    def disabled_tooltip(self):
+        return self._disabled_tooltip
+
+    @disabled_tooltip.setter
+    def disabled_tooltip(self, text):
+        if text != self._disabled_tooltip:
+            self._disabled_tooltip = text
+            self._dirty = True
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, enabled):
+        if enabled != self._enabled:
+            self._enabled = enabled
+            self._dirty = True
+
+    @property
+    def hovered(self):
+        return self._is_hovered
+
+    @property
+    def dirty(self):
+        """True if the button looks different from its last draw()."""
+        return self._dirty or self.rect != self._drawn_rect
+
+    def place(self, center, size=None):
+        """Move the button to `center`, resized to `size` if given."""
+        if size is not None:
+            self.rect.size = size
+        self.rect.center = center
+
+    # ----- looks
+
+    @property
+    def state(self):
+        """'disabled', 'hover' or 'normal'."""
+        if not self._enabled:
+            return 'disabled'
+        return 'hover' if self._is_hovered else 'normal'
+
+    @property
+    def image(self):
+        """The face for the current state, the size of `rect`."""
+        if self.rect.size != self._faces_size:
+            self._faces.clear()
+            self._faces_size = self.rect.size
+        state = self.state
+        face = self._faces.get(state)
+        if face is None:
+            face = self._faces[state] = self._render_face(state)
+        return face
+
+    def _render_face(self, state):
+        if state == 'disabled':
+            bg, border, text_color = DISABLED_COLORS
+        else:
+            bg = self.hover_color if state == 'hover' else self.bg_color
+            border, text_color = BORDER_COLOR, self.text_color
+        face = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        box = face.get_rect()
+        pygame.draw.rect(face, bg, box, border_radius=8)
+        pygame.draw.rect(face, border, box, 2, border_radius=8)
+        label = render_text(self.font, self._text, True, text_color)
+        face.blit(label, label.get_rect(center=box.center))
+        return face
+
+    @property
+    def current_tooltip(self):
+        """Tooltip text for the current state ('' for none)."""
+        if not self._enabled and self._disabled_tooltip is not None:
+            return self._disabled_tooltip
+        return self._tooltip
+
+    @property
+    def tooltip_image(self):
+        """The tooltip box for the current state, or None without a tooltip."""
+        text = self.current_tooltip
+        if not text:
+            return None
+        if self._tooltip_image is None or self._tooltip_image[0] != text:
+            self._tooltip_image = (text, self._render_tooltip(text))
+        return self._tooltip_image[1]
+
+    @property
+    def tooltip_rect(self):
+        """Where tooltip_image goes: centred just above the button."""
+        image = self.tooltip_image
+        if image is None:
+            return None
+        return image.get_rect(midbottom=(self.rect.centerx, self.rect.top - 2))
+
+    def _render_tooltip(self, text):
+        bg, border, text_color = TOOLTIP_COLORS
+        label = render_text(self.tooltip_font, text, True, text_color)
+        box = label.get_rect().inflate(10, 6)
+        box.topleft = (0, 0)
+        image = pygame.Surface(box.size, pygame.SRCALPHA)
+        pygame.draw.rect(image, bg, box, border_radius=4)
+        pygame.draw.rect(image, border, box, 1, border_radius=4)
+        image.blit(label, (5, 3))
+        return image
+
+    # ----- input and drawing
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEMOTION:
-            self._is_hovered = self.rect.collidepoint(event.pos)
+            hovered = self.rect.collidepoint(event.pos)
+            if hovered != self._is_hovered:
+                self._is_hovered = hovered
+                self._dirty = True
 
         elif event.type == pygame.MOUSEBUTTONDOWN:
-            if event.button == 1 and self.rect.collidepoint(event.pos):
+            if event.button == 1 and self._enabled and self.rect.collidepoint(event.pos):
                 self.callback()
 
     def draw(self, surface):
-        color = self.hover_color if self._is_hovered else self.bg_color
-        pygame.draw.rect(surface, color, self.rect, border_radius=8)
-        pygame.draw.rect(surface, (200,200,200), self.rect, 2, border_radius=8)
-        surface.blit(self.text_surface, self.text_rect)
\ No newline at end of file
+        """Blit the current face; returns the drawn Rect."""
+        self._dirty = False
+        self._drawn_rect = self.rect.copy()
+        return surface.blit(self.image, self.rect)
+
+    def draw_tooltip(self, surface):
+        """Blit the tooltip if the button has one; returns its Rect or None."""
+        image = self.tooltip_image
+        if image is None:
+            return None
+        return surface.blit(image, self.tooltip_rect)
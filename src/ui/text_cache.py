@@ -0,0 +1,172 @@
+"""Shared cache of rendered text for UI that is drawn every frame.
+
+Font.render allocates a new surface on every call. render_text() keeps
+the results in one LRU cache keyed by (font, text, color, antialias), so
+a label drawn at 60 FPS is rendered once. Values that change all the time
+(turn, HP and mana counters, FPS) would churn that cache instead: those go
+through GlyphStrip, which renders each character of a font and colour
+once and lays the glyphs out side by side. draw_fields() combines both for
+HUD lines like "HP: 17/25 | Mana: 40". sys_font() shares font objects so
+the cache keys of rebuilt screens stay the same.
+
+Cached surfaces are shared: blit them, never draw on them.
+"""
+from collections import OrderedDict
+
+import pygame
+
+from config import TEXT_CACHE_MAX_BYTES
+
+
+def _surface_bytes(surface):
+    return surface.get_pitch() * surface.get_height()
+
+
+class TextCache:
+    """LRU cache of Font.render results, capped by their pixel memory.
+
+    Args:
+        max_bytes: Surface memory the cache may hold; the least recently
+            used texts are dropped beyond it.
+    """
+
+    def __init__(self, max_bytes=TEXT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def render(self, font, text, antialias, color):
+        """Like font.render(text, antialias, color), from the cache when possible."""
+        key = (font, text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        self.bytes += _surface_bytes(surface)
+        while self.bytes > self.max_bytes and len(self._surfaces) > 1:
+            _, old = self._surfaces.popitem(last=False)
+            self.bytes -= _surface_bytes(old)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+        self.bytes = 0
+
+
+class GlyphStrip:
+    """The characters of one font and colour, each rendered once.
+
+    draw() places glyphs side by side, so a counter that changes every
+    frame creates no surfaces. Characters outside `chars` are rendered the
+    first time they are used. Glyphs are not kerned; digits, which most
+    fonts give equal widths, look the same as in a rendered string.
+
+    Args:
+        font: pygame Font.
+        color: Text colour.
+        chars: Characters to render up front.
+        antialias: As for Font.render.
+    """
+
+    def __init__(self, font, color, chars='0123456789/.:-+% ', antialias=True):
+        self.font = font
+        self.color = tuple(color)
+        self.antialias = antialias
+        self.height = font.get_height()
+        self._glyphs = {}
+        for ch in chars:
+            self._glyph(ch)
+
+    def _glyph(self, ch):
+        glyph = self._glyphs.get(ch)
+        if glyph is None:
+            glyph = self._glyphs[ch] = self.font.render(ch, self.antialias, self.color)
+        return glyph
+
+    def width(self, text):
+        """Width in pixels of `text` drawn by draw()."""
+        return sum(self._glyph(ch).get_width() for ch in text)
+
+    def draw(self, surface, text, pos):
+        """Draw `text` with its top-left at `pos`; returns the drawn Rect."""
+        x, y = pos
+        batch = []
+        for ch in text:
+            glyph = self._glyph(ch)
+            batch.append((glyph, (x, y)))
+            x += glyph.get_width()
+        surface.blits(batch, doreturn=False)
+        return pygame.Rect(pos[0], y, x - pos[0], self.height)
+
+
+_cache = TextCache()
+_strips = {}
+_fonts = {}
+
+
+def sys_font(size, name=None):
+    """pygame.font.SysFont(name, size), created once and shared.
+
+    Screens that are rebuilt (every battle is a new scene) keep hitting
+    the same cache entries when they take their fonts from here.
+    """
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.SysFont(name, size)
+    return font
+
+
+def text_cache():
+    """The TextCache shared by all screens."""
+    return _cache
+
+
+def render_text(font, text, antialias, color):
+    """font.render through the shared TextCache."""
+    return _cache.render(font, text, antialias, color)
+
+
+def glyph_strip(font, color, antialias=True):
+    """The shared GlyphStrip for `font` and `color`."""
+    key = (font, tuple(color), antialias)
+    strip = _strips.get(key)
+    if strip is None:
+        strip = _strips[key] = GlyphStrip(font, color, antialias=antialias)
+    return strip
+
+
+def measure_fields(font, fields, color, antialias=True):
+    """(width, height) of draw_fields' output."""
+    strip = glyph_strip(font, color, antialias)
+    width = sum(strip.width(str(value)) for _, value in fields)
+    width += sum(render_text(font, label, antialias, color).get_width() for label, _ in fields if label)
+    return width, font.get_height()
+
+
+def draw_fields(surface, font, fields, color, pos, antialias=True):
+    """Draw (label, value) pairs side by side, e.g. (('HP: ', '17/25'),).
+
+    Labels come from the shared TextCache and values from a GlyphStrip.
+
+    Returns:
+        The drawn Rect.
+    """
+    strip = glyph_strip(font, color, antialias)
+    x, y = pos
+    for label, value in fields:
+        if label:
+            text = render_text(font, label, antialias, color)
+            surface.blit(text, (x, y))
+            x += text.get_width()
+        x = strip.draw(surface, str(value), (x, y)).right
+    return pygame.Rect(pos[0], y, x - pos[0], font.get_height())
@@ -0,0 +1,99 @@
+"""Retained-mode drawing of a screen's buttons."""
+
+
+class WidgetGroup:
+    """Buttons (ui.button.Button) drawn over a background that does not change.
+
+    draw() touches only what changed since the last call: dirty buttons
+    and the tooltip of the hovered button when it appears, moves or goes.
+    Whatever it uncovers is restored from the background and the buttons
+    and tooltip overlapping it are blitted again, so stacking stays right.
+    Only the first hovered button with a tooltip shows it.
+
+    Args:
+        widgets: The buttons, in drawing order.
+    """
+
+    def __init__(self, widgets=()):
+        self.widgets = list(widgets)
+        self._tooltip = None  # (Surface, Rect) on screen
+        self._drawn = {}  # widget -> Rect it was last drawn at
+        self._full = True
+
+    def __iter__(self):
+        return iter(self.widgets)
+
+    def invalidate(self):
+        """Draw everything on the next draw(), e.g. after the screen was covered."""
+        self._full = True
+
+    def handle_event(self, event):
+        for widget in self.widgets:
+            widget.handle_event(event)
+
+    def tooltip(self):
+        """(Surface, Rect) of the tooltip to show, or None."""
+        for widget in self.widgets:
+            if widget.hovered:
+                image = widget.tooltip_image
+                if image is not None:
+                    return image, widget.tooltip_rect
+        return None
+
+    def draw_all(self, surface):
+        """Draw every button and the tooltip, for screens redrawn every frame."""
+        self._full = False
+        for widget in self.widgets:
+            self._drawn[widget] = widget.draw(surface)
+        self._tooltip = self.tooltip()
+        if self._tooltip is not None:
+            surface.blit(*self._tooltip)
+
+    def draw(self, surface, background):
+        """Redraw what changed over `background`, a surface the size of `surface`.
+
+        After invalidate() the whole background is blitted first.
+
+        Returns:
+            List of the rects that were drawn; [surface rect] after
+            invalidate() and [] when nothing changed.
+        """
+        if self._full:
+            surface.blit(background, (0, 0))
+            self.draw_all(surface)
+            return [surface.get_rect()]
+        tooltip = self.tooltip()
+        regions = []
+        for widget in self.widgets:
+            if widget.dirty:
+                old = self._drawn.get(widget)
+                if old is not None and old != widget.rect:
+                    regions.append(old)
+                regions.append(widget.rect.copy())
+        if tooltip != self._tooltip:
+            for shown in (self._tooltip, tooltip):
+                if shown is not None:
+                    regions.append(shown[1])
+        if not regions:
+            return []
+        self._tooltip = tooltip
+
+        # A button drawn again covers its whole rect, so the region grows
+        # to every button it overlaps, and the buttons those overlap
+        redraw = []
+        grown = True
+        while grown:
+            grown = False
+            for widget in self.widgets:
+                if widget not in redraw and widget.rect.collidelist(regions) != -1:
+                    redraw.append(widget)
+                    regions.append(widget.rect.copy())
+                    grown = True
+        for region in regions:
+            surface.blit(background, region, region)
+        for widget in self.widgets:
+            if widget in redraw:
+                self._drawn[widget] = widget.draw(surface)
+        if tooltip is not None and tooltip[1].collidelist(regions) != -1:
+            surface.blit(*tooltip)
+        return regions